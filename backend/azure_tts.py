@@ -1,58 +1,189 @@
 # backend/azure_tts_streaming.py
 import os
-import azure.cognitiveservices.speech as speechsdk
+import time
 from dotenv import load_dotenv
+from xml.sax.saxutils import escape, quoteattr
+from src.TTS.synthesizer_pool import DEFAULT_FRAME_BYTES, create_pool_from_env
+from src.TTS.local_tts import get_local_tts_pool
+from src.TTS.tts_cache import create_cache_from_env
+from src.Utils.structured_log import log
 
 load_dotenv()
 
-SPEECH_KEY = os.environ["AZURE_SPEECH_KEY"]
-SPEECH_REGION = os.environ["AZURE_SPEECH_REGION"]
+_default_pool = None
 
-def stream_tts_audio(text):
+
+def get_synthesizer_pool():
     """
-    Generate TTS audio and return complete audio data.
-    Optimized for speed with lower quality audio format.
+    Return the per-worker synthesizer pool, creating it on first use. Azure
+    credentials are read when the first synthesizer is built (during warm-up),
+    so a missing key shows up in /readyz instead of crashing the import.
     """
-    speech_config = speechsdk.SpeechConfig(subscription=SPEECH_KEY, region=SPEECH_REGION)
-    
-    # Use lower bitrate for faster generation
-    speech_config.set_speech_synthesis_output_format(
-        speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = create_pool_from_env()
+    return _default_pool
+
+
+# Voice settings; part of every cache key since they change the audio
+VOICE_NAME = os.environ.get("TTS_VOICE", "en-US-DavisNeural")
+VOICE_STYLE = os.environ.get("TTS_STYLE", "friendly")
+SPEAKING_RATE = os.environ.get("TTS_RATE", "+15%")
+OUTPUT_FORMAT = "audio-16khz-32kbitrate-mono-mp3"
+
+# Local (Piper) tier: short phrases and/or fallback when the remote pool can't start a phrase
+TTS_LOCAL_MAX_CHARS = int(os.environ.get("TTS_LOCAL_MAX_CHARS", "0"))
+TTS_LOCAL_FALLBACK = os.environ.get("TTS_LOCAL_FALLBACK", "0") == "1"
+LOCAL_CACHE_VOICE = ("local", os.environ.get("LOCAL_TTS_MODEL", ""), "", OUTPUT_FORMAT)
+
+# Fixed prompts worth synthesizing once at startup (TTS_PREWARM_FILE adds deployment-specific ones)
+DEFAULT_PREWARM_PROMPTS = [
+    "Sorry, I didn't catch that. Could you say it again?",
+    "Thank you for your time today.",
+]
+
+_default_cache = None
+
+
+def get_tts_cache():
+    """Return the per-worker phrase cache, creating it on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = create_cache_from_env()
+    return _default_cache
+
+
+def build_ssml(text, voice=VOICE_NAME, style=VOICE_STYLE, rate=SPEAKING_RATE):
+    """Wrap `text` (XML-escaped) in the voice/style/prosody SSML used for every utterance."""
+    return (
+        "<speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' "
+        "xmlns:mstts='https://www.w3.org/2001/mstts' xml:lang='en-US'>"
+        f"<voice name={quoteattr(voice)}>"
+        f"<mstts:express-as style={quoteattr(style)}>"
+        f"<prosody rate={quoteattr(rate)}>{escape(text)}</prosody>"
+        "</mstts:express-as>"
+        "</voice>"
+        "</speak>"
     )
 
-    synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
-
-    # 🔹 Build SSML for speed and style
-    ssml = f"""
-        <speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis'
-            xmlns:mstts='https://www.w3.org/2001/mstts' xml:lang='en-US'>
-        <voice name='en-US-DavisNeural'>
-            <mstts:express-as style='friendly'>
-            <prosody rate='+15%'>
-                Hi Rohit, nice to meet you. 
-                <break time='200ms'/> 
-                I'm Kavita, and I'll be conducting this interview today. 
-                <break time='250ms'/> 
-                Let's get started. 
-                <break time='200ms'/> 
-                Can you please tell me a little bit about your educational background? 
-                Where did you start your academic journey?
-            </prosody>
-            </mstts:express-as>
-        </voice>
-        </speak>
-        """
-
-    # 🔹 Use the SSML synthesis method
-    result = synthesizer.speak_ssml_async(ssml).get()
-    
-    if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-        yield result.audio_data
-    elif result.reason == speechsdk.ResultReason.Canceled:
-        cancellation_details = result.cancellation_details
-        error_msg = f"TTS canceled: {cancellation_details.reason}"
-        if cancellation_details.reason == speechsdk.CancellationReason.Error:
-            error_msg += f" - {cancellation_details.error_details}"
-        raise Exception(error_msg)
-    else:
-        raise Exception(f"TTS failed: {result.reason}")
+
+def _cached_frames(audio, frame_bytes):
+    try:
+        with memoryview(audio) as view:
+            for offset in range(0, len(view), frame_bytes):
+                yield bytes(view[offset:offset + frame_bytes])
+    finally:
+        if hasattr(audio, "close"):
+            audio.close()  # disk-tier hits are mmaps
+
+
+def _cached_or_synthesized(text, cache_voice, synthesize, cache, frame_bytes, cancel, pin=False):
+    """
+    Serve `text` from the cache (keyed on `cache_voice`, the settings that
+    shape the audio), else stream it from synthesize() and cache the result
+    once the phrase has been synthesized completely, if it is short enough
+    to be worth caching or `pin`ned.
+    """
+    key = cache.key(text, *cache_voice)
+    audio = cache.get(key)
+    if audio is not None:
+        for frame in _cached_frames(audio, frame_bytes):
+            if cancel and cancel.cancelled:
+                return
+            yield frame
+        return
+
+    produced = [] if pin or cache.cacheable(text) else None
+    for frame in synthesize():
+        if cancel and cancel.cancelled:
+            return
+        if produced is not None:
+            produced.append(frame)
+        yield frame
+
+    # Only complete, uncancelled synthesis is cached (a truncated phrase must never be replayed)
+    if produced and not (cancel and cancel.cancelled):
+        cache.put(key, b"".join(produced))
+
+
+def _remote_frames(ssml, pool, frame_bytes, cancel):
+    started = time.perf_counter()
+    # 🔹 Stream frames from a pooled synthesizer as they arrive
+    with pool.borrow() as synthesizer:
+        frames = synthesizer.stream(ssml, frame_bytes=frame_bytes)
+        unregister = cancel.on_cancel(synthesizer.stop) if cancel else None
+        try:
+            first = True
+            for frame in frames:
+                if first:
+                    first = False
+                    log.event("tts_first_byte", ms=round((time.perf_counter() - started) * 1000, 1))
+                yield frame
+        finally:
+            if unregister:
+                unregister()
+            frames.close()
+
+
+def stream_tts_audio(text, pool=None, frame_bytes=DEFAULT_FRAME_BYTES, cancel=None,
+                     voice=VOICE_NAME, style=VOICE_STYLE, rate=SPEAKING_RATE, cache=None, pin=False):
+    """
+    Generate TTS audio and yield fixed-size MP3 frames while it is being synthesized.
+    Optimized for speed with lower quality audio format.
+    Repeated phrases are served from the TTS cache without touching Azure; otherwise
+    borrows a pre-connected synthesizer from `pool` and caches the audio once the
+    phrase has been synthesized completely (short phrases, or any with `pin`).
+    Phrases up to TTS_LOCAL_MAX_CHARS go to the local engine instead, and with
+    TTS_LOCAL_FALLBACK=1 so does any phrase the remote pool fails (or is too
+    busy) to start.
+    Stops synthesis as soon as `cancel` (a CancelToken) fires.
+    """
+    cache = cache or get_tts_cache()
+
+    def local():
+        return get_local_tts_pool().stream(text, frame_bytes=frame_bytes, cancel=cancel)
+
+    if TTS_LOCAL_MAX_CHARS and len(text.strip()) <= TTS_LOCAL_MAX_CHARS:
+        yield from _cached_or_synthesized(text, LOCAL_CACHE_VOICE, local, cache, frame_bytes, cancel, pin)
+        return
+
+    pool = pool or get_synthesizer_pool()
+    ssml = build_ssml(text, voice, style, rate)
+    started = False
+    try:
+        for frame in _cached_or_synthesized(text, (voice, style, rate, OUTPUT_FORMAT),
+                                            lambda: _remote_frames(ssml, pool, frame_bytes, cancel),
+                                            cache, frame_bytes, cancel, pin):
+            started = True
+            yield frame
+    except Exception as e:
+        if not TTS_LOCAL_FALLBACK or started or (cancel and cancel.cancelled):
+            raise
+        log.event("tts_local_fallback", every=10.0, error=str(e))
+        yield from _cached_or_synthesized(text, LOCAL_CACHE_VOICE, local, cache, frame_bytes, cancel, pin)
+
+
+def prewarm_tts_cache(prompts, pool=None, cache=None):
+    """Synthesize known prompts ahead of the first session so they play straight from cache."""
+    cache = cache or get_tts_cache()
+    started = time.perf_counter()
+    warmed = 0
+    for prompt in prompts:
+        try:
+            for _ in stream_tts_audio(prompt, pool=pool, cache=cache, pin=True):
+                pass
+            warmed += 1
+        except Exception as e:
+            print(f"⚠️ TTS prewarm failed for {prompt[:40]!r}: {e}")
+    print(f"🔥 TTS cache prewarmed {warmed}/{len(prompts)} prompts in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return warmed
+
+
+def load_prewarm_prompts(path=None):
+    """Default prompts plus one prompt per non-empty line of TTS_PREWARM_FILE, if set."""
+    prompts = list(DEFAULT_PREWARM_PROMPTS)
+    path = path or os.environ.get("TTS_PREWARM_FILE")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            prompts.extend(line.strip() for line in f if line.strip())
+    return prompts
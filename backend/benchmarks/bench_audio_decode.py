@@ -0,0 +1,141 @@
+# benchmarks/bench_audio_decode.py
+"""
+Decode benchmark: the legacy WebM -> WAV path (temp file, ffmpeg subprocess,
+temp WAV, soundfile read, separate amplitude pass) against the in-memory
+decoder in src/Utils/audio_decoder.py, for 1 s, 10 s and 60 s clips.
+
+Clips are WebM/Opus at 48 kHz mono (what the browser's MediaRecorder sends),
+encoded in memory with PyAV. Paths whose tools are missing (the ffmpeg
+binary, PyAV) are reported as skipped. The incremental decoder is fed in
+`--chunk-ms` pieces: "stream total" feeds them back to back, "stream final"
+paces them at `--speed` x real time (as a live upload arrives) and measures
+the last chunk -> last sample time, which is what a caller waits for once
+the user stops talking.
+
+Run from backend/:
+    python -m benchmarks.bench_audio_decode --seconds 1 10 60 --runs 5
+"""
+import argparse
+import io
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+from src.Utils.audio_decoder import StreamDecoder, av, decode_audio
+
+SAMPLE_RATE = 48000
+
+
+def speech_like(seconds, rate=SAMPLE_RATE, seed=3):
+    """Syllable-rate amplitude-modulated harmonics with pauses, so Opus does real work."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.3 * t) > -0.5)
+    return (0.2 * voice * envelope + 0.002 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def encode_webm(samples, rate=SAMPLE_RATE):
+    buffer = io.BytesIO()
+    with av.open(buffer, "w", format="webm") as container:
+        stream = container.add_stream("libopus", rate=rate)
+        stream.layout = "mono"
+        for i in range(0, len(samples), 960):
+            frame = av.AudioFrame.from_ndarray(samples[None, i:i + 960], format="flt", layout="mono")
+            frame.sample_rate = rate
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+def legacy_decode(blob):
+    """The previous transcribe_webm_audio conversion, minus the transcription."""
+    import soundfile as sf
+
+    with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as temp_webm:
+        temp_webm.write(blob)
+        webm_path = temp_webm.name
+    wav_fd, wav_path = tempfile.mkstemp(suffix=".wav")
+    os.close(wav_fd)
+    try:
+        subprocess.run(["ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-i", webm_path,
+                        "-ar", "16000", "-ac", "1", "-f", "wav", wav_path],
+                       stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=30, check=True)
+        audio, sr = sf.read(wav_path)
+        if len(audio.shape) > 1:
+            audio = audio.mean(axis=1)
+        np.abs(audio).max()
+        return audio
+    finally:
+        os.unlink(webm_path)
+        os.unlink(wav_path)
+
+
+def streamed_decode(blob, chunk_bytes, pace=0.0):
+    decoder = StreamDecoder()
+    for i in range(0, len(blob), chunk_bytes):
+        decoder.feed(blob[i:i + chunk_bytes])
+        if pace:
+            time.sleep(pace)
+    last_chunk = time.perf_counter()
+    decoder.close()
+    return time.perf_counter() - last_chunk, decoder.audio
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, nargs="+", default=[1, 10, 60])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--chunk-ms", type=int, default=250)
+    parser.add_argument("--speed", type=float, default=10.0, help="pacing of the 'stream final' feed")
+    args = parser.parse_args()
+
+    if av is None:
+        raise SystemExit("PyAV is needed to encode the test clips (pip install av)")
+    has_ffmpeg = shutil.which("ffmpeg") is not None
+    if not has_ffmpeg:
+        print("🧪 ffmpeg binary not found: legacy and ffmpeg-pipe paths skipped")
+
+    print(f"{'clip':>6} {'legacy':>10} {'ffmpeg pipe':>12} {'pyav':>10} {'stream total':>13} {'stream final':>13} "
+          f"{'speedup':>8}  check")
+    for seconds in args.seconds:
+        blob = encode_webm(speech_like(seconds))
+        chunk_bytes = max(1, int(len(blob) * args.chunk_ms / 1000 / seconds))
+
+        legacy = timed(lambda: legacy_decode(blob), args.runs) if has_ffmpeg else float("nan")
+        piped = timed(lambda: decode_audio(blob, backend="ffmpeg"), args.runs) if has_ffmpeg else float("nan")
+        in_process = timed(lambda: decode_audio(blob, backend="pyav"), args.runs)
+        streamed_total = timed(lambda: streamed_decode(blob, chunk_bytes), args.runs)
+        pace = args.chunk_ms / 1000 / args.speed
+        streamed_final = statistics.median(
+            streamed_decode(blob, chunk_bytes, pace)[0] for _ in range(args.runs)) * 1000
+
+        reference = decode_audio(blob, backend="pyav")
+        _, streamed = streamed_decode(blob, chunk_bytes)
+        check = (f"{reference.duration:.2f}s peak={reference.peak:.3f} "
+                 f"stream_match={abs(streamed.duration - reference.duration) < 1e-3}")
+        speedup = legacy / in_process if has_ffmpeg else float("nan")
+        print(f"{seconds:>5.0f}s {legacy:>8.1f}ms {piped:>10.1f}ms {in_process:>8.1f}ms {streamed_total:>11.1f}ms "
+              f"{streamed_final:>11.1f}ms {speedup:>7.1f}x  {check}")
+
+
+if __name__ == "__main__":
+    main()
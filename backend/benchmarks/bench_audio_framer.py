@@ -0,0 +1,94 @@
+# benchmarks/bench_audio_framer.py
+"""
+Outbound framing benchmark: slicing synthesizer output into tts_chunk frames
+with the copying re-slicer (bytearray accumulate + bytes() per frame, as
+_fixed_frames does) against AudioFramer's memoryview slices, for the shapes
+the outbox sees: a paced stream of 864-byte synthesizer reads, and one
+whole-sentence blob (a cache hit).
+
+For each it reports frames, time per second of audio, bytes copied before
+the socket write, and first-frame duration (what the client must receive
+before playback can start).
+
+Run from backend/:
+    python -m benchmarks.bench_audio_framer --seconds 10 60 --runs 20
+"""
+import argparse
+import statistics
+import time
+
+from src.Pipeline.audio_framer import BYTES_PER_MS, AudioFramer
+from src.TTS.synthesizer_pool import DEFAULT_FRAME_BYTES
+
+
+def copying_frames(chunks, frame_bytes):
+    pending = bytearray()
+    copied = 0
+    frames = []
+    for chunk in chunks:
+        pending += chunk
+        copied += len(chunk)
+        while len(pending) >= frame_bytes:
+            frames.append(bytes(pending[:frame_bytes]))
+            copied += frame_bytes
+            del pending[:frame_bytes]
+    if pending:
+        frames.append(bytes(pending))
+        copied += len(pending)
+    return frames, copied
+
+
+def framed(chunks, behind=False):
+    framer = AudioFramer()
+    frames = []
+    copied = 0
+    for chunk in chunks:
+        framer.push(chunk)
+        while (frame := framer.next_frame(behind=behind)) is not None:
+            payload = frame.payload()
+            copied += 0 if len(frame.views) == 1 and payload is frame.views[0].obj else len(payload)
+            frames.append(payload)
+    while (frame := framer.next_frame(behind=behind, final=True)) is not None:
+        frames.append(frame.payload())
+    return frames, copied
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, nargs="+", default=[10, 60])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'audio':>6} {'shape':>8} {'path':>10} {'frames':>7} {'us/s audio':>11} {'copied':>10} {'first frame':>12}")
+    for seconds in args.seconds:
+        total = int(seconds * 1000 * BYTES_PER_MS)
+        audio = bytes(range(256)) * (total // 256 + 1)
+        audio = audio[:total - total % 144]
+        shapes = {
+            "stream": [audio[i:i + DEFAULT_FRAME_BYTES] for i in range(0, len(audio), DEFAULT_FRAME_BYTES)],
+            "blob": [audio],
+        }
+        for shape, chunks in shapes.items():
+            paths = {
+                "copying": lambda: copying_frames(chunks, DEFAULT_FRAME_BYTES),
+                "framer": lambda: framed(chunks),
+                "merged": lambda: framed(chunks, behind=True),
+            }
+            for path, fn in paths.items():
+                elapsed, (frames, copied) = timed(fn, args.runs)
+                assert b"".join(frames) == audio
+                print(f"{seconds:>5.0f}s {shape:>8} {path:>10} {len(frames):>7} "
+                      f"{elapsed / seconds * 1e6:>11.1f} {copied:>9}B {len(frames[0]) / BYTES_PER_MS:>10.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
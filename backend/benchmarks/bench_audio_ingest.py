@@ -0,0 +1,59 @@
+# benchmarks/bench_audio_ingest.py
+"""
+Audio ingest micro-benchmark: raw 48 kHz pass-through vs. AudioIngest packets.
+
+Feeds frontend-sized frames (2048 Int16 samples at 48 kHz) and reports CPU
+cost per frame, messages and bytes sent to the STT socket per second of audio.
+Run from backend/:
+    python -m benchmarks.bench_audio_ingest --seconds 60
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.Utils.audio_ingest import AudioIngest
+
+INPUT_RATE = 48000
+FRAME_SAMPLES = 2048
+
+
+def make_frames(seconds):
+    t = np.arange(int(INPUT_RATE * seconds)) / INPUT_RATE
+    signal = (np.sin(2 * np.pi * 220 * t) * 6000 + np.random.randn(len(t)) * 500).astype(np.int16)
+    return [signal[i:i + FRAME_SAMPLES].tobytes() for i in range(0, len(signal), FRAME_SAMPLES)]
+
+
+def run(label, frames, seconds, make_sink):
+    sent = {"messages": 0, "bytes": 0}
+
+    def send(packet):
+        sent["messages"] += 1
+        sent["bytes"] += len(packet)
+
+    push = make_sink(send)
+    start = time.perf_counter()
+    for frame in frames:
+        push(frame)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed / len(frames) * 1e6:7.1f} µs/frame  "
+          f"{sent['messages'] / seconds:6.1f} msgs/s  {sent['bytes'] / seconds / 1000:7.1f} kB/s")
+    return sent["bytes"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--packet-ms", type=int, default=80)
+    args = parser.parse_args()
+
+    frames = make_frames(args.seconds)
+    raw = run("raw 48k linear16", frames, args.seconds, lambda send: lambda frame: send(bytes(frame)))
+    for encoding in ("linear16", "mulaw"):
+        sent = run(f"ingest 16k {encoding}", frames, args.seconds,
+                   lambda send: AudioIngest(send, packet_ms=args.packet_ms, encoding=encoding).push)
+        print(f"{'':<22} bandwidth reduction: {raw / sent:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_deepgram_pool.py
+"""
+Deepgram connection pool against the local fake Deepgram server.
+
+Measures time from session start to first transcript for a cold connection
+vs. a pooled one, checks that audio sent while connecting is buffered (not
+dropped), and that idle pooled sockets survive the server's idle timeout via
+KeepAlive. Run from backend/:
+    python -m benchmarks.bench_deepgram_pool --handshake-ms 150
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.stubs.fake_deepgram import FakeDeepgramServer
+from deepgram_client import DeepgramStreamClient
+from src.STT.deepgram_pool import DeepgramPool
+
+CHUNK = b"\x01\x00" * 2048  # one frontend ScriptProcessor buffer at 48 kHz
+
+
+def first_transcript_latency(get_client, chunks):
+    got = threading.Event()
+    start = time.perf_counter()
+    client = get_client(lambda text, is_final: got.set())
+    for _ in range(chunks):
+        client.send_audio(CHUNK)  # sent immediately, open or not
+    got.wait(10)
+    latency = time.perf_counter() - start
+    time.sleep(0.3)  # let the rest of the buffered audio drain before closing
+    client.close()
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--handshake-ms", type=float, default=150)
+    parser.add_argument("--idle-timeout", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    server = FakeDeepgramServer(port=args.port, interim_ms=100, idle_timeout=args.idle_timeout,
+                                handshake_ms=args.handshake_ms).start()
+    url = server.url()
+    chunks = 12  # ~0.5 s of audio, enough for the fake to emit a result
+
+    def cold(on_transcript):
+        client = DeepgramStreamClient("stub", on_transcript=on_transcript, url=url)
+        client.connect()
+        return client
+
+    before = server.bytes_received
+    latency = first_transcript_latency(cold, chunks)
+    print(f"cold connection   first transcript={latency * 1000:7.1f}ms  "
+          f"audio delivered={server.bytes_received - before}/{chunks * len(CHUNK)} bytes")
+
+    pool = DeepgramPool("stub", size=2, keepalive_interval=args.idle_timeout / 3, url=url).start()
+    time.sleep(args.idle_timeout * 2)  # longer than the server's idle timeout
+    idle_closes = server.idle_closes
+    latency = first_transcript_latency(lambda cb: pool.claim(cb), chunks)
+    print(f"pooled connection first transcript={latency * 1000:7.1f}ms  "
+          f"keepalives={server.keepalives_received} idle closes while pooled={idle_closes}")
+    print(f"pool stats: {pool.stats}")
+    pool.close()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# benchmarks/bench_deepgram_reconnect.py
+"""
+Deepgram client resilience against the local fake Deepgram server.
+
+1. Drop: a session streams `--seconds` of audio in real time and the server
+   drops every connection halfway. Without reconnect (max_reconnects=0, the
+   old behaviour) everything after the drop is lost; with it, the client
+   reopens the socket, replays the audio not yet covered by a final result
+   and carries on. Reports audio delivered, final results, and results
+   dropped as re-transcriptions of already-final audio.
+2. Silence: a claimed client that stops sending audio for longer than the
+   server's idle timeout must stay open on its own KeepAlives.
+3. Parsing: cost of handling a realistic mix of Deepgram messages (interims
+   with word timings, empty interims during silence, finals, Metadata) with a
+   full json.loads per message against the type pre-filter.
+
+Run from backend/:
+    python -m benchmarks.bench_deepgram_reconnect --seconds 8
+"""
+import argparse
+import json
+import time
+
+from benchmarks.stubs.fake_deepgram import FakeDeepgramServer
+from deepgram_client import DeepgramStreamClient, bytes_per_second
+
+CHUNK_MS = 80
+
+
+def stream(server, url, seconds, max_reconnects):
+    finals = []
+    client = DeepgramStreamClient("stub", url=url, max_reconnects=max_reconnects, backoff_initial=0.1,
+                                  on_transcript=lambda text, is_final: is_final and finals.append(text))
+    client.connect()
+    chunk = b"\x01\x00" * int(bytes_per_second(url) * CHUNK_MS / 1000 / 2)
+    before = server.bytes_received
+    count = int(seconds * 1000 / CHUNK_MS)
+    for i in range(count):
+        if i == count // 2:
+            server.drop_connections()
+        client.send_audio(chunk)
+        time.sleep(CHUNK_MS / 1000)
+    time.sleep(1.0)  # let the replayed backlog drain
+    sent = count * len(chunk)
+    delivered = server.bytes_received - before
+    client.close()
+    return client, sent, delivered, finals
+
+
+def silence(server, url, idle_timeout):
+    client = DeepgramStreamClient("stub", url=url, keepalive_interval=idle_timeout / 3)
+    client.connect()
+    for _ in range(10):
+        client.send_audio(b"\x01\x00" * 1280)
+    closes, keepalives = server.idle_closes, server.keepalives_received
+    time.sleep(idle_timeout * 2.5)
+    alive = client.is_open
+    client.close()
+    return alive, server.idle_closes - closes, server.keepalives_received - keepalives
+
+
+def messages():
+    words = [{"word": w, "start": i * 0.3, "end": i * 0.3 + 0.25, "confidence": 0.97, "punctuated_word": w}
+             for i, w in enumerate("i studied computer science at nit and then worked on".split())]
+
+    def result(transcript, is_final, word_list):
+        return json.dumps({"type": "Results", "channel_index": [0, 1], "duration": 1.2, "start": 0.0,
+                           "is_final": is_final, "speech_final": is_final,
+                           "channel": {"alternatives": [{"transcript": transcript, "confidence": 0.98,
+                                                         "words": word_list}]},
+                           "metadata": {"request_id": "2f0c6c8e", "model_info": {"name": "2-general-nova"}}})
+
+    interim = result("i studied computer science at nit and then worked on", False, words)
+    empty = result("", False, [])
+    final = result("i studied computer science at nit and then worked on", True, words)
+    metadata = json.dumps({"type": "Metadata", "request_id": "2f0c6c8e", "duration": 12.5, "channels": 1})
+    # Talk and pause: interims while speaking, a final per phrase, empty interims in the pauses
+    return [metadata] + ([interim] * 4 + [final] + [empty] * 3) * 10
+
+
+def parse_cost(rounds):
+    batch = messages() * rounds
+    client = DeepgramStreamClient("stub", url="ws://stub/v1/listen?encoding=linear16&sample_rate=16000",
+                                  on_transcript=lambda text, is_final: None)
+
+    def full(message):  # the old handler: decode everything, then dispatch on type
+        data = json.loads(message)
+        if data.get("type") == "Results":
+            alternatives = data.get("channel", {}).get("alternatives", [])
+            if alternatives:
+                transcript = alternatives[0].get("transcript", "")
+                if transcript.strip():
+                    client.on_transcript(transcript, data.get("is_final", False))
+
+    results = {}
+    for name, handle in (("json.loads all", full), ("pre-filtered", lambda m: client._on_message(None, m))):
+        start = time.perf_counter()
+        for message in batch:
+            handle(message)
+        results[name] = (time.perf_counter() - start) / len(batch) * 1e6
+    return results, client.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=8)
+    parser.add_argument("--idle-timeout", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    server = FakeDeepgramServer(port=args.port, interim_ms=250, final_ms=1500, idle_timeout=args.idle_timeout).start()
+    url = server.url(sample_rate=16000)
+    try:
+        print(f"{'drop mid-stream':<18} {'delivered':>10} {'finals':>7} {'reconnects':>10} {'replayed':>9} {'duplicates':>10}")
+        for label, max_reconnects in (("no reconnect", 0), ("reconnect", 5)):
+            client, sent, delivered, finals = stream(server, url, args.seconds, max_reconnects)
+            print(f"{label:<18} {delivered / sent * 100:>9.0f}% {len(finals):>7} {client.reconnects:>10} "
+                  f"{client.stats['replayed_bytes'] / client.bytes_per_second:>8.2f}s {client.stats['duplicates']:>10}")
+
+        alive, idle_closes, keepalives = silence(server, url, args.idle_timeout)
+        print(f"\nsilence {args.idle_timeout * 2.5:.0f}s (server idle timeout {args.idle_timeout:.0f}s): "
+              f"still open={alive} idle closes={idle_closes} keepalives={keepalives}")
+
+        costs, stats = parse_cost(2000)
+        print("\nmessage handling " + "  ".join(f"{name}={us:.1f}us/msg" for name, us in costs.items())
+              + f"  (decoded {stats['decoded']}/{stats['messages']})")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_llm_http.py
+"""
+Offline benchmark: Groq time-to-first-token when every turn opens a new
+connection vs. the shared keep-alive pool warmed at startup, against a local
+OpenAI-compatible stub whose connections cost `--handshake-ms` (like TLS).
+
+Run from backend/:
+    python -m benchmarks.bench_llm_http --turns 40 --concurrency 4 --handshake-ms 120
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stubs.fake_llm import FakeLLMServer
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run(label, get_llm, turns, concurrency):
+    def one_turn(_):
+        llm = get_llm()
+        start = time.perf_counter()
+        stream = llm.stream("Tell me about your education.")
+        next(stream)
+        ttft = time.perf_counter() - start
+        for _ in stream:
+            pass
+        return ttft
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        ttfts = list(executor.map(one_turn, range(turns)))
+    print(f"{label:<20} ttft p50={statistics.median(ttfts) * 1000:7.1f}ms p95={percentile(ttfts, 95) * 1000:7.1f}ms")
+
+
+def run_async(label, llm, turns, concurrency):
+    """The same turns through astream() on the shared AsyncClient (asyncio callers)."""
+    async def one_turn():
+        start = time.perf_counter()
+        ttft = None
+        async for _ in llm.astream("Tell me about your education."):
+            if ttft is None:
+                ttft = time.perf_counter() - start
+        return ttft
+
+    async def all_turns():
+        ttfts = []
+        for _ in range(0, turns, concurrency):
+            ttfts += await asyncio.gather(*(one_turn() for _ in range(concurrency)))
+        return ttfts
+
+    ttfts = asyncio.run(all_turns())
+    print(f"{label:<20} ttft p50={statistics.median(ttfts) * 1000:7.1f}ms p95={percentile(ttfts, 95) * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--handshake-ms", type=float, default=120)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(port=0, first_token_ms=100, token_ms=1, handshake_ms=args.handshake_ms).start()
+    os.environ["GROQ_BASE_URL"] = server.url
+    os.environ.setdefault("GROQ_API_KEY", "bench")
+    from src.LLM.groq_llm import GroqLLM
+    from src.LLM.http_pool import HTTPPoolConfig
+
+    no_keepalive = HTTPPoolConfig(max_keepalive_connections=0, http2=False)
+    run("new connection", lambda: GroqLLM(http_config=no_keepalive), args.turns, args.concurrency)
+
+    before = server.connections
+    shared = GroqLLM(http_config=HTTPPoolConfig(http2=False))
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(lambda _: shared.warm_up(), range(args.concurrency)))
+    run("pooled + warmed", lambda: shared, args.turns, args.concurrency)
+    print(f"pooled metrics: {shared.http_metrics.snapshot()} (server saw {server.connections - before} connections)")
+    run_async("pooled astream", shared, args.turns, args.concurrency)
+    print(f"pooled metrics: {shared.http_metrics.snapshot()}")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_llm_router.py
+"""
+Offline benchmark: time-to-first-token of a single provider with tail spikes
+vs. LLMRouter hedging across two such providers, plus a failing-provider run
+showing the circuit breaker.
+
+Run from backend/:
+    python -m benchmarks.bench_llm_router --turns 200 --spike-rate 0.05
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.LLM.llm_router import LLMRouter
+from src.LLM.stub_llm import StubLLM
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run(label, llm, turns, concurrency):
+    def one_turn(_):
+        start = time.perf_counter()
+        stream = llm.stream("Tell me about your education.")
+        try:
+            next(stream)
+            ttft = time.perf_counter() - start
+            for _ in stream:
+                pass
+            return ttft
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one_turn, range(turns)))
+    ttfts = [r for r in results if r is not None]
+    print(f"{label:<22} ttft p50={statistics.median(ttfts) * 1000:7.1f}ms p95={percentile(ttfts, 95) * 1000:7.1f}ms "
+          f"p99={percentile(ttfts, 99) * 1000:7.1f}ms errors={len(results) - len(ttfts)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--spike-rate", type=float, default=0.05)
+    parser.add_argument("--spike-ms", type=float, default=1500)
+    args = parser.parse_args()
+
+    def provider(name, fail_rate=0.0):
+        return StubLLM(first_token_delay=0.15, token_delay=0.001, name=name, spike_rate=args.spike_rate,
+                       spike_delay=args.spike_ms / 1000, fail_rate=fail_rate)
+
+    run("single provider", provider("a"), args.turns, args.concurrency)
+
+    router = LLMRouter([provider("a"), provider("b")], hedge_after=0.3)
+    run("router (hedged)", router, args.turns, args.concurrency)
+    print(f"router: { {k: v for k, v in router.snapshot().items() if k != 'providers'} }")
+
+    router = LLMRouter([provider("broken", fail_rate=1.0), provider("b")], hedge_after=0.3, reset_timeout=60)
+    run("router (1 broken)", router, args.turns, args.concurrency)
+    snapshot = router.snapshot()
+    print(f"router: failovers={snapshot['failovers']} "
+          f"broken circuit={snapshot['providers']['broken']['circuit']} "
+          f"broken requests={snapshot['providers']['broken']['requests']}")
+
+
+if __name__ == "__main__":
+    main()
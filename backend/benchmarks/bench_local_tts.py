@@ -0,0 +1,98 @@
+# benchmarks/bench_local_tts.py
+"""
+Local TTS benchmark: concurrent sessions streaming replies through one
+LocalTTSPool, unbatched (max_batch=1, every sentence its own inference call)
+against batched, on the FakePiperEngine cost model (or a real Piper voice
+with --model).
+
+For each it reports time to first audio per stream (p50/p95), wall time for
+all streams, inference calls, and the real-time factor (seconds of audio per
+second of wall time). It also decodes one stream's MP3 output to check the
+format matches what Azure sends (16 kHz mono).
+
+Run from backend/:
+    python -m benchmarks.bench_local_tts --sessions 1 4 16
+    python -m benchmarks.bench_local_tts --model voices/en_US-lessac-medium.onnx
+"""
+import argparse
+import io
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import av
+
+from benchmarks.bench_tts_pool import percentile
+from benchmarks.stubs.fake_piper import FakePiperEngine
+from src.TTS.local_tts import LocalTTSPool, PiperEngine
+
+REPLY = ("That's great to hear. Could you tell me a little more about where you completed your schooling? "
+         "What made you choose your field of study?")
+
+
+def one_stream(pool):
+    started = time.perf_counter()
+    first = None
+    audio = bytearray()
+    for frame in pool.stream(REPLY):
+        if first is None:
+            first = time.perf_counter() - started
+        audio += frame
+    return first, bytes(audio)
+
+
+def run(engine, sessions, max_batch, batch_wait):
+    pool = LocalTTSPool(engine, max_batch=max_batch, batch_wait=batch_wait).start()
+    engine.load()
+    try:
+        calls = pool.stats["batches"]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as executor:
+            results = list(executor.map(lambda _: one_stream(pool), range(sessions)))
+        elapsed = time.perf_counter() - started
+        firsts = [first for first, _ in results]
+        return {
+            "first_p50": statistics.median(firsts),
+            "first_p95": percentile(firsts, 95),
+            "wall": elapsed,
+            "calls": pool.stats["batches"] - calls,
+            "rtf": pool.stats["audio_seconds"] / elapsed,
+            "mp3": results[0][1],
+        }
+    finally:
+        pool.close()
+
+
+def check_format(mp3):
+    with av.open(io.BytesIO(mp3)) as container:
+        stream = container.streams.audio[0]
+        samples = sum(frame.samples for frame in container.decode(stream))
+        return stream.rate, stream.channels, samples / stream.rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--batch-wait-ms", type=float, default=10)
+    parser.add_argument("--model", help="Piper .onnx voice (default: the fake engine)")
+    args = parser.parse_args()
+
+    def engine():
+        return PiperEngine(args.model) if args.model else FakePiperEngine()
+
+    print(f"{'sessions':>8} {'mode':>10} {'first p50':>10} {'first p95':>10} {'wall':>8} {'calls':>6} {'RTF':>6}")
+    mp3 = None
+    for sessions in args.sessions:
+        for mode, max_batch, wait in (("unbatched", 1, 0), ("batched", args.max_batch, args.batch_wait_ms / 1000)):
+            r = run(engine(), sessions, max_batch, wait)
+            mp3 = r["mp3"]
+            print(f"{sessions:>8} {mode:>10} {r['first_p50'] * 1000:>8.0f}ms {r['first_p95'] * 1000:>8.0f}ms "
+                  f"{r['wall']:>7.2f}s {r['calls']:>6} {r['rtf']:>6.1f}")
+
+    rate, channels, seconds = check_format(mp3)
+    print(f"\noutput: {len(mp3)} bytes MP3, {rate} Hz, {channels} channel(s), {seconds:.2f}s decoded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_pipeline.py
+"""
+Synthetic end-to-end benchmark: inline LLM->TTS loop vs. the pipelined ResponsePipeline.
+
+Fake LLM emits tokens at a fixed rate, fake TTS has a first-byte latency plus
+paced frame output. Run from backend/:
+    python -m benchmarks.bench_pipeline --token-ms 20 --tts-first-byte-ms 150
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.Pipeline.response_pipeline import ResponsePipeline
+from src.Pipeline.sentence_segmenter import segment_stream
+
+RESPONSE = (
+    "That sounds like a great start. Could you tell me where you did your schooling? "
+    "I would also love to hear what made you choose your field of study. "
+    "Were there any subjects that you particularly enjoyed? "
+    "Finally, how did your college years shape your career goals?"
+)
+
+
+def fake_llm(token_delay):
+    for word in RESPONSE.split(" "):
+        time.sleep(token_delay)
+        yield word + " "
+
+
+def fake_tts(first_byte_delay, frame_delay, frames_per_sentence=6):
+    def synthesize(sentence, cancel=None):
+        time.sleep(first_byte_delay)
+        for _ in range(frames_per_sentence):
+            time.sleep(frame_delay)
+            yield b"\x00" * 864
+    return synthesize
+
+
+def run_inline(llm, synthesize):
+    start = time.perf_counter()
+    first_audio = None
+    for sentence in segment_stream(llm()):
+        for _ in synthesize(sentence):
+            if first_audio is None:
+                first_audio = time.perf_counter() - start
+    return first_audio, time.perf_counter() - start
+
+
+def run_pipelined(llm, synthesize, executor, lookahead):
+    pipeline = ResponsePipeline(synthesize, executor, lookahead=lookahead)
+    start = time.perf_counter()
+    first_audio = []
+
+    def emit(frame):
+        if not first_audio:
+            first_audio.append(time.perf_counter() - start)
+
+    pipeline.run(llm(), emit)
+    return first_audio[0], time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--token-ms", type=float, default=20)
+    parser.add_argument("--tts-first-byte-ms", type=float, default=150)
+    parser.add_argument("--frame-ms", type=float, default=30)
+    parser.add_argument("--lookahead", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    llm = lambda: fake_llm(args.token_ms / 1000)
+    synthesize = fake_tts(args.tts_first_byte_ms / 1000, args.frame_ms / 1000)
+
+    first, total = run_inline(llm, synthesize)
+    print(f"inline     first audio={first * 1000:7.1f}ms  last audio={total * 1000:7.1f}ms")
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        first, total = run_pipelined(llm, synthesize, executor, args.lookahead)
+    print(f"pipelined  first audio={first * 1000:7.1f}ms  last audio={total * 1000:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_segmenter.py
+"""
+Micro-benchmark: legacy rescan-the-buffer splitting vs. the incremental SentenceSegmenter.
+
+Groq's llama-3.1-8b-instant streams roughly 750 tokens/s; both segmenters
+should stay orders of magnitude above that. Run from backend/:
+    python -m benchmarks.bench_segmenter --tokens 200000
+"""
+import argparse
+import time
+
+from src.Pipeline.sentence_segmenter import segment_stream
+
+GROQ_TOKENS_PER_SECOND = 750
+
+SAMPLE = (
+    "That's great, Rohit. So you did your B.Tech. at NIT, and scored 8.7 CGPA there, "
+    "which is impressive! What made you choose computer science? Dr. Rao mentioned "
+    "you also worked on a research project, e.g. speech recognition, is that right?\n"
+)
+
+
+def legacy_split(tokens):
+    """The original process_streaming loop: rescans the whole buffer for every token."""
+    sentence_buffer = ""
+    for token in tokens:
+        sentence_buffer += token
+        if any(punct in sentence_buffer for punct in ['. ', '! ', '? ', '\n']):
+            sentence = sentence_buffer.strip()
+            if len(sentence) > 10:
+                yield sentence
+                sentence_buffer = ""
+    if sentence_buffer.strip():
+        yield sentence_buffer.strip()
+
+
+def make_tokens(text, count):
+    words = [w + " " for w in text.split(" ")]
+    return [words[i % len(words)] for i in range(count)]
+
+
+def bench(label, split, tokens):
+    start = time.perf_counter()
+    chunks = sum(1 for _ in split(tokens))
+    elapsed = time.perf_counter() - start
+    rate = len(tokens) / elapsed
+    print(f"{label:<28} {rate:>12,.0f} tokens/s  ({rate / GROQ_TOKENS_PER_SECOND:>8,.0f}x Groq)  "
+          f"{elapsed / len(tokens) * 1e6:6.2f} µs/token  chunks={chunks}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=200000)
+    args = parser.parse_args()
+
+    tokens = make_tokens(SAMPLE, args.tokens)
+    bench("legacy (punctuated)", legacy_split, tokens)
+    bench("incremental (punctuated)", segment_stream, tokens)
+
+    # A long run-on answer is where rescanning the whole buffer goes quadratic
+    run_on = make_tokens("and then we moved on to the next topic", min(args.tokens, 20000))
+    bench("legacy (run-on)", legacy_split, run_on)
+    bench("incremental (run-on)", segment_stream, run_on)
+
+
+if __name__ == "__main__":
+    main()
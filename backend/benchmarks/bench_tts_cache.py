@@ -0,0 +1,83 @@
+# benchmarks/bench_tts_cache.py
+"""
+Offline benchmark: time to first audio frame for a realistic phrase mix,
+with and without the phrase-level TTS cache.
+
+Run from backend/:
+    python -m benchmarks.bench_tts_cache --utterances 60 --repeat-ratio 0.5
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("AZURE_SPEECH_KEY", "bench")
+os.environ.setdefault("AZURE_SPEECH_REGION", "bench")
+
+from azure_tts import DEFAULT_PREWARM_PROMPTS, prewarm_tts_cache, stream_tts_audio  # noqa: E402
+from src.TTS.synthesizer_pool import FakeSynthesizer, SynthesizerPool  # noqa: E402
+from src.TTS.tts_cache import TTSCache  # noqa: E402
+
+REPEATED = DEFAULT_PREWARM_PROMPTS + [
+    "That's great.",
+    "Could you tell me more about that?",
+    "Okay, let's move on to the next question.",
+]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def phrase_mix(utterances, repeat_ratio, seed=7):
+    rng = random.Random(seed)
+    return [rng.choice(REPEATED) if rng.random() < repeat_ratio else f"One-off answer number {i} about the project."
+            for i in range(utterances)]
+
+
+def run(label, phrases, pool, cache):
+    ttfb = []
+    start = time.perf_counter()
+    for phrase in phrases:
+        t0 = time.perf_counter()
+        frames = stream_tts_audio(phrase, pool=pool, cache=cache)
+        next(frames)
+        ttfb.append(time.perf_counter() - t0)
+        for _ in frames:
+            pass
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} ttfb p50={statistics.median(ttfb) * 1000:7.1f}ms "
+          f"p95={percentile(ttfb, 95) * 1000:7.1f}ms total={elapsed:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--utterances", type=int, default=60)
+    parser.add_argument("--repeat-ratio", type=float, default=0.5)
+    args = parser.parse_args()
+
+    phrases = phrase_mix(args.utterances, args.repeat_ratio)
+    pool = SynthesizerPool(lambda: FakeSynthesizer(bytes_per_second=64000), size=1, health_interval=0)
+    pool.warm_up()
+
+    run("no cache", phrases, pool, TTSCache(max_text_chars=0))
+
+    cache = TTSCache()
+    prewarm_tts_cache(DEFAULT_PREWARM_PROMPTS, pool=pool, cache=cache)
+    run("memory cache", phrases, pool, cache)
+    print(f"memory cache:  {cache.snapshot()}")
+
+    with tempfile.TemporaryDirectory() as disk_dir:
+        # Tiny memory tier so nearly every hit is served from the mmap'd disk tier
+        cache = TTSCache(max_bytes=4096, disk_dir=disk_dir)
+        run("disk cache", phrases, pool, cache)
+        print(f"disk cache:    {cache.snapshot()}")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_tts_pool.py
+"""
+Offline benchmark: per-sentence synthesizer construction vs. a warm SynthesizerPool.
+
+Run from backend/:
+    python -m benchmarks.bench_tts_pool --sentences 40 --concurrency 4
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.TTS.synthesizer_pool import FakeSynthesizer, SynthesizerPool
+
+SENTENCE = "Can you please tell me a little bit about your educational background?"
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run(label, synthesize_once, sentences, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        latencies = list(executor.map(lambda _: synthesize_once(), range(sentences)))
+        elapsed = time.perf_counter() - start
+
+    print(f"{label:<22} p50={statistics.median(latencies) * 1000:7.1f}ms "
+          f"p95={percentile(latencies, 95) * 1000:7.1f}ms total={elapsed:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sentences", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    def per_sentence():
+        start = time.perf_counter()
+        synth = FakeSynthesizer()
+        synth.speak(SENTENCE)
+        synth.close()
+        return time.perf_counter() - start
+
+    pool = SynthesizerPool(FakeSynthesizer, size=args.concurrency, health_interval=0)
+    pool.warm_up()
+
+    def pooled():
+        start = time.perf_counter()
+        with pool.borrow() as synth:
+            synth.speak(SENTENCE)
+        return time.perf_counter() - start
+
+    run("per-sentence", per_sentence, args.sentences, args.concurrency)
+    run("pooled", pooled, args.sentences, args.concurrency)
+    print(f"pool stats: {pool.stats}")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# benchmarks/bench_workers.py
+"""
+Scale-out benchmark: aggregate throughput of serve.py with 1, 2, 4... workers.
+
+For each worker count it starts a fake Redis (message queue), a fake
+Deepgram and `serve.py --workers N` with stub LLM/TTS, then drives
+`--sessions` websocket clients from several client processes (so the
+harness itself is not the GIL bottleneck). Every session streams real-time
+PCM and runs back-to-back final_transcript turns for `--duration` seconds.
+
+It reports turns/s, audio chunks/s, server CPU, how sessions spread across
+workers, and whether an emit published from outside the owning worker (a
+write-only RedisManager in the client process) reached every session.
+Scaling is only meaningful when one worker is saturated (cores ≈ 1.0 at
+workers=1; raise --sessions until it is) and the machine has at least as
+many free cores as workers plus the client processes.
+
+Run from backend/:
+    python -m benchmarks.bench_workers --workers 1 2 4 --sessions 40 --duration 20
+"""
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+import psutil
+import socketio
+
+from benchmarks.load_test import percentile, wait_for_port
+from benchmarks.stubs.fake_deepgram import FakeDeepgramServer
+from benchmarks.stubs.fake_redis import FakeRedisServer
+
+SAMPLE_RATE = 48000
+CHUNK_SAMPLES = 2048
+CHANNEL = "hivoys"
+
+
+def start_workers(workers, args, deepgram_url, queue_url):
+    env = dict(os.environ)
+    env.update({
+        "LLM_BACKEND": "stub",
+        "STUB_LLM_FIRST_TOKEN_MS": str(args.llm_first_token_ms),
+        "STUB_LLM_TOKEN_MS": "0",
+        "TTS_BACKEND": "fake",
+        "FAKE_TTS_FIRST_BYTE_MS": str(args.tts_first_byte_ms),
+        "FAKE_TTS_BYTES_PER_SECOND": "10000000",
+        "TTS_PREWARM": "0",
+        "DEEPGRAM_URL": deepgram_url,
+        "SERVER_ENDPOINTING": "0",  # turns are driven by the harness' final_transcript
+        "LOG_LEVEL": "quiet",
+        "DEEPGRAM_API_KEY": env.get("DEEPGRAM_API_KEY", "stub"),
+        "AZURE_SPEECH_KEY": env.get("AZURE_SPEECH_KEY", "stub"),
+        "AZURE_SPEECH_REGION": env.get("AZURE_SPEECH_REGION", "stub"),
+        "GROQ_API_KEY": env.get("GROQ_API_KEY", "stub"),
+    })
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(backend, "serve.py"), "--workers", str(workers),
+         "--port", str(args.port), "--message-queue", queue_url],
+        env=env, cwd=backend, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    wait_for_port(args.port)
+    # All workers share the port; give the later ones time to bind before connecting
+    deadline = time.time() + 30
+    while time.time() < deadline and len(psutil.Process(proc.pid).children()) < workers:
+        time.sleep(0.1)
+    time.sleep(2.0)
+    return proc
+
+
+class Session:
+    def __init__(self, url, queue_url, deadline, speech_seconds):
+        self.url = url
+        self.queue_url = queue_url
+        self.deadline = deadline
+        self.speech_seconds = speech_seconds
+        self.worker = None
+        self.turns = 0
+        self.chunks = 0
+        self.errors = 0
+        self.latencies = []
+        self.probe_received = threading.Event()
+        self._connected = threading.Event()
+        self._first_chunk = threading.Event()
+        self._done = threading.Event()
+        self.client = socketio.Client(reconnection=False)
+        self.client.on("server_message", self._on_server_message)
+        self.client.on("tts_chunk", lambda data: self._first_chunk.set())
+        self.client.on("tts_done", lambda data: self._done.set())
+
+    def _on_server_message(self, data):
+        if "worker" in data:
+            self.worker = data["worker"]
+            self._connected.set()
+        elif data.get("probe"):
+            self.probe_received.set()
+
+    def _probe(self):
+        """Emit to our own sid from outside the owning worker, via the message queue."""
+        manager = socketio.RedisManager(self.queue_url, channel=CHANNEL, write_only=True)
+        manager.emit("server_message", {"text": "probe", "probe": True}, to=self.client.get_sid(), namespace="/")
+
+    def run(self):
+        try:
+            self.client.connect(self.url, transports=["websocket"])
+            self._connected.wait(10)
+            self._probe()
+            self.client.emit("start_session")
+            chunk = b"\x01\x00" * CHUNK_SAMPLES
+            chunk_seconds = CHUNK_SAMPLES / SAMPLE_RATE
+            while time.time() < self.deadline:
+                for _ in range(int(self.speech_seconds / chunk_seconds)):
+                    self.client.emit("audio_chunk", chunk)
+                    self.chunks += 1
+                    time.sleep(chunk_seconds)
+                self._first_chunk.clear()
+                self._done.clear()
+                sent = time.perf_counter()
+                self.client.emit("final_transcript", {"text": "I studied computer science."})
+                if self._first_chunk.wait(30):
+                    self.latencies.append(time.perf_counter() - sent)
+                if self._done.wait(60):
+                    self.turns += 1
+                else:
+                    self.errors += 1
+            self.probe_received.wait(2)
+        except Exception:
+            self.errors += 1
+        finally:
+            try:
+                self.client.disconnect()
+            except Exception:
+                pass
+
+
+def client_process(url, queue_url, sessions, deadline, speech_seconds, ramp_ms, results):
+    running = [Session(url, queue_url, deadline, speech_seconds) for _ in range(sessions)]
+    threads = [threading.Thread(target=s.run, daemon=True) for s in running]
+    for t in threads:
+        t.start()
+        time.sleep(ramp_ms / 1000)
+    for t in threads:
+        t.join()
+    results.put([
+        {"worker": s.worker, "turns": s.turns, "chunks": s.chunks, "errors": s.errors,
+         "latencies": s.latencies, "probe": s.probe_received.is_set()}
+        for s in running
+    ])
+
+
+def server_cpu_seconds(proc):
+    total = 0.0
+    for p in [proc] + proc.children(recursive=True):
+        try:
+            times = p.cpu_times()
+            total += times.user + times.system
+        except psutil.NoSuchProcess:
+            pass
+    return total
+
+
+def run_workers(workers, args, deepgram):
+    redis = FakeRedisServer(port=0).start()
+    proc = start_workers(workers, args, deepgram.url(), redis.url)
+    server = psutil.Process(proc.pid)
+    try:
+        cpu_before = server_cpu_seconds(server)
+        start = time.time()
+        deadline = start + args.duration
+        results = multiprocessing.Queue()
+        per_process = [args.sessions // args.client_procs + (i < args.sessions % args.client_procs)
+                       for i in range(args.client_procs)]
+        clients = [
+            multiprocessing.Process(target=client_process, args=(
+                f"http://127.0.0.1:{args.port}", redis.url, n, deadline,
+                args.speech_seconds, args.ramp_ms, results))
+            for n in per_process if n
+        ]
+        for c in clients:
+            c.start()
+        sessions = [s for _ in clients for s in results.get(timeout=args.duration + 120)]
+        for c in clients:
+            c.join()
+        wall = time.time() - start
+        cpu_seconds = server_cpu_seconds(server) - cpu_before
+    finally:
+        proc.terminate()
+        proc.wait(15)
+        redis.stop()
+
+    turns = sum(s["turns"] for s in sessions)
+    latencies = [l for s in sessions for l in s["latencies"]]
+    spread = Counter(s["worker"] for s in sessions)
+    return {
+        "workers": workers,
+        "turns_per_s": turns / wall,
+        "chunks_per_s": sum(s["chunks"] for s in sessions) / wall,
+        "errors": sum(s["errors"] for s in sessions),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "cores": cpu_seconds / wall,
+        "spread": dict(sorted(spread.items(), key=lambda kv: str(kv[0]))),
+        "probes": f"{sum(s['probe'] for s in sessions)}/{len(sessions)}",
+        "published": redis.published,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--client-procs", type=int, default=4)
+    parser.add_argument("--speech-seconds", type=float, default=1.0)
+    parser.add_argument("--llm-first-token-ms", type=float, default=20)
+    parser.add_argument("--tts-first-byte-ms", type=float, default=20)
+    parser.add_argument("--ramp-ms", type=float, default=20)
+    parser.add_argument("--port", type=int, default=5057)
+    parser.add_argument("--deepgram-port", type=int, default=8768)
+    args = parser.parse_args()
+
+    print(f"🧪 {os.cpu_count()} CPU(s) visible; scaling needs at least max(--workers) free cores")
+    deepgram = FakeDeepgramServer(port=args.deepgram_port).start()
+    baseline = None
+    try:
+        for workers in args.workers:
+            r = run_workers(workers, args, deepgram)
+            baseline = baseline or r["turns_per_s"] / workers
+            efficiency = r["turns_per_s"] / (baseline * workers) if baseline else float("nan")
+            print(f"workers={workers:<2} turns/s={r['turns_per_s']:7.2f} scaling={efficiency:5.0%} "
+                  f"chunks/s={r['chunks_per_s']:8.1f} turn p50={r['p50_ms']:7.1f}ms p95={r['p95_ms']:7.1f}ms "
+                  f"cores={r['cores']:5.2f} errors={r['errors']} spread={r['spread']} "
+                  f"cross-worker emits={r['probes']} queue msgs={r['published']}")
+    finally:
+        deepgram.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# benchmarks/load_test.py
+"""
+Load test: sessions per core for the threaded vs. eventlet Socket.IO server.
+
+Starts main.py as a subprocess for each async mode with local stubs
+(LLM_BACKEND=stub, TTS_BACKEND=fake, Deepgram -> benchmarks.stubs.fake_deepgram),
+then drives N concurrent sessions that stream real-time PCM and run
+final_transcript turns. Reports turn latency, server CPU and thread count.
+
+Needs the harness-only packages `python-socketio[client]` and `psutil`.
+Run from backend/:
+    python -m benchmarks.load_test --sessions 50 --turns 3 --modes threading eventlet
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import psutil
+import socketio
+
+from benchmarks.stubs.fake_deepgram import FakeDeepgramServer
+
+SAMPLE_RATE = 48000
+CHUNK_SAMPLES = 2048  # matches the frontend ScriptProcessor buffer
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"server did not open port {port}")
+
+
+def start_server(mode, port, deepgram_url, extra_env=None):
+    env = dict(os.environ)
+    env.update({
+        "SOCKETIO_ASYNC_MODE": mode,
+        "PORT": str(port),
+        "LLM_BACKEND": "stub",
+        "TTS_BACKEND": "fake",
+        "DEEPGRAM_URL": deepgram_url,
+        "SERVER_ENDPOINTING": "0",  # turns are driven by the harness' final_transcript
+        "DEEPGRAM_API_KEY": env.get("DEEPGRAM_API_KEY", "stub"),
+        "AZURE_SPEECH_KEY": env.get("AZURE_SPEECH_KEY", "stub"),
+        "AZURE_SPEECH_REGION": env.get("AZURE_SPEECH_REGION", "stub"),
+        "GROQ_API_KEY": env.get("GROQ_API_KEY", "stub"),
+    })
+    env.update(extra_env or {})
+    proc = subprocess.Popen([sys.executable, "main.py"], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port)
+    return proc
+
+
+class Session:
+    def __init__(self, url, turns, speech_seconds):
+        self.url = url
+        self.turns = turns
+        self.speech_seconds = speech_seconds
+        self.latencies = []
+        self.errors = 0
+        self._first_chunk = threading.Event()
+        self._done = threading.Event()
+        self.client = socketio.Client(reconnection=False)
+        self.client.on("tts_chunk", lambda data: self._first_chunk.set())
+        self.client.on("tts_done", lambda data: self._done.set())
+
+    def run(self):
+        try:
+            self.client.connect(self.url, transports=["websocket"])
+            self.client.emit("start_session")
+            chunk = b"\x01\x00" * CHUNK_SAMPLES
+            chunk_seconds = CHUNK_SAMPLES / SAMPLE_RATE
+            for _ in range(self.turns):
+                for _ in range(int(self.speech_seconds / chunk_seconds)):
+                    self.client.emit("audio_chunk", chunk)
+                    time.sleep(chunk_seconds)
+                self._first_chunk.clear()
+                self._done.clear()
+                sent = time.perf_counter()
+                self.client.emit("final_transcript", {"text": "I studied computer science."})
+                if self._first_chunk.wait(30):
+                    self.latencies.append(time.perf_counter() - sent)
+                if not self._done.wait(60):
+                    self.errors += 1
+        except Exception:
+            self.errors += 1
+        finally:
+            try:
+                self.client.disconnect()
+            except Exception:
+                pass
+
+
+def run_mode(mode, args, deepgram):
+    port = args.port
+    proc = start_server(mode, port, deepgram.url())
+    server = psutil.Process(proc.pid)
+    try:
+        time.sleep(1.0)
+        cpu_before = server.cpu_times()
+        start = time.perf_counter()
+
+        sessions = [Session(f"http://127.0.0.1:{port}", args.turns, args.speech_seconds)
+                    for _ in range(args.sessions)]
+        threads = [threading.Thread(target=s.run, daemon=True) for s in sessions]
+        peak_threads = 0
+        for t in threads:
+            t.start()
+            time.sleep(args.ramp_ms / 1000)
+        while any(t.is_alive() for t in threads):
+            peak_threads = max(peak_threads, server.num_threads())
+            time.sleep(0.2)
+
+        wall = time.perf_counter() - start
+        cpu_after = server.cpu_times()
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+    cpu_seconds = (cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)
+    cores_used = cpu_seconds / wall
+    latencies = [l for s in sessions for l in s.latencies]
+    errors = sum(s.errors for s in sessions)
+    print(f"{mode:<10} sessions={args.sessions:<4} errors={errors:<3} "
+          f"turn p50={statistics.median(latencies) * 1000 if latencies else float('nan'):7.1f}ms "
+          f"p95={percentile(latencies, 95) * 1000:7.1f}ms "
+          f"cpu={cpu_seconds:6.2f}s cores={cores_used:5.2f} "
+          f"sessions/core={args.sessions / max(cores_used, 1e-6):8.1f} "
+          f"peak threads={peak_threads}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--speech-seconds", type=float, default=2.0)
+    parser.add_argument("--ramp-ms", type=float, default=20)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--deepgram-port", type=int, default=8765)
+    parser.add_argument("--modes", nargs="+", default=["threading", "eventlet"])
+    args = parser.parse_args()
+
+    deepgram = FakeDeepgramServer(port=args.deepgram_port).start()
+    for mode in args.modes:
+        run_mode(mode, args, deepgram)
+    deepgram.stop()
+
+
+if __name__ == "__main__":
+    main()
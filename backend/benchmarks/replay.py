@@ -0,0 +1,337 @@
+# benchmarks/replay.py
+"""
+Offline replay benchmark for the full voice pipeline.
+
+Replays PCM sessions into the Socket.IO server (main.py, spawned as a
+subprocess) at real-time or accelerated speed, with every external service
+replaced by a local stub:
+  - STT: benchmarks.stubs.fake_deepgram in VAD mode (interims while speaking,
+    final + UtteranceEnd after the pause), so server-side endpointing runs
+  - LLM: benchmarks.stubs.fake_llm, an OpenAI-compatible SSE server reached
+    through the real GroqLLM client (GROQ_BASE_URL)
+  - TTS: the in-process FakeSynthesizer with Azure-like latencies
+    (FAKE_TTS_*); the Speech SDK's service protocol cannot be pointed at a
+    local server
+
+Sessions come from `--recordings DIR` (mono 16-bit .wav files) or are
+synthesized (voiced bursts separated by pauses). For each concurrency level
+it reports end-of-speech → first audio latency percentiles, turn throughput,
+server CPU per session, and server memory growth, plus the server-side span
+means from /metrics.
+
+Regression gate (exit code 1 on regression):
+    python -m benchmarks.replay --sessions 10 --save-baseline benchmarks/baseline.json   # on main
+    python -m benchmarks.replay --sessions 10 --baseline benchmarks/baseline.json        # on the change
+
+Needs the harness-only packages `python-socketio[client]` and `psutil`.
+Run from backend/:
+    python -m benchmarks.replay --sessions 1 10 50 --speed 1.0
+"""
+import argparse
+import glob
+import json
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+import wave
+
+import numpy as np
+import psutil
+import socketio
+
+from benchmarks.load_test import percentile, start_server
+from benchmarks.stubs.fake_deepgram import FakeDeepgramServer
+from benchmarks.stubs.fake_llm import FakeLLMServer
+
+SAMPLE_RATE = 48000
+CHUNK_SAMPLES = 2048  # matches the frontend ScriptProcessor buffer
+
+
+# -------------------- sessions -------------------- #
+
+def load_recording(path):
+    """Mono 16-bit WAV → 48 kHz int16 samples (linear resampling if needed)."""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        if f.getnchannels() > 1:
+            samples = samples.reshape(-1, f.getnchannels())[:, 0]
+        rate = f.getframerate()
+    if rate != SAMPLE_RATE:
+        positions = np.arange(0, len(samples), rate / SAMPLE_RATE)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+    return samples
+
+
+def synthetic_session(utterances, speech_seconds, pause_seconds, seed):
+    """
+    Voiced bursts (harmonics of a wobbling f0, syllable-rate envelope) separated by
+    near-silent pauses. A random lead-in keeps concurrent sessions from ending
+    their utterances in lock-step.
+    """
+    rng = np.random.default_rng(seed)
+    parts = [np.zeros(int(rng.uniform(0.3, 0.3 + pause_seconds) * SAMPLE_RATE), dtype=np.float32)]
+    for _ in range(utterances):
+        t = np.arange(int(speech_seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        f0 = rng.uniform(110, 180) * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+        phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+        envelope = 0.6 + 0.4 * np.abs(np.sin(2 * np.pi * 4 * t))
+        parts.append((4000 * voiced * envelope).astype(np.float32))
+        parts.append(rng.normal(0, 30, int(pause_seconds * SAMPLE_RATE)).astype(np.float32))
+    return np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+
+
+class ReplaySession:
+    def __init__(self, url, samples, speed):
+        self.url = url
+        self.samples = samples
+        self.speed = speed
+        self.latencies = []
+        self.turns_done = 0
+        self.interrupted = 0
+        self.finals = 0
+        self.errors = 0
+        self._final_at = None
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self.client = socketio.Client(reconnection=False)
+        self.client.on("transcript", self._on_transcript)
+        self.client.on("tts_chunk", self._on_chunk)
+        self.client.on("tts_done", self._on_done)
+        self.client.on("tts_cancel", self._on_cancel)
+        self.client.on("error", lambda data: self._count_error())
+
+    def _count_error(self):
+        self.errors += 1
+
+    def _on_transcript(self, data):
+        if data.get("is_final"):
+            with self._lock:
+                self.finals += 1
+                self._final_at = time.perf_counter()
+                self._idle.clear()
+
+    def _on_chunk(self, data):
+        with self._lock:
+            if self._final_at is not None:
+                self.latencies.append(time.perf_counter() - self._final_at)
+                self._final_at = None
+
+    def _on_cancel(self, data):
+        self.interrupted += 1
+        self._idle.set()
+
+    def _on_done(self, data):
+        self.turns_done += 1
+        self._idle.set()
+
+    def run(self):
+        try:
+            self.client.connect(self.url, transports=["websocket"])
+            self.client.emit("start_session")
+            chunk_seconds = CHUNK_SAMPLES / SAMPLE_RATE / self.speed
+            started = time.perf_counter()
+            for index, offset in enumerate(range(0, len(self.samples), CHUNK_SAMPLES)):
+                self.client.emit("audio_chunk", self.samples[offset:offset + CHUNK_SAMPLES].tobytes())
+                # Pace against the session clock so emit overhead does not accumulate
+                delay = started + (index + 1) * chunk_seconds - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            self._idle.wait(30)  # let the last response finish
+        except Exception:
+            self.errors += 1
+        finally:
+            try:
+                self.client.disconnect()
+            except Exception:
+                pass
+
+
+# -------------------- measurement -------------------- #
+
+_SPAN_LINE = re.compile(r'^hivoys_turn_span_seconds_(sum|count)\{span="([a-z_]+)"\} ([0-9.e+-]+)$')
+
+
+def scrape_span_means(port):
+    """Mean seconds per span from the server's /metrics histogram sums and counts."""
+    try:
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+    except Exception:
+        return {}
+    sums, counts = {}, {}
+    for line in body.splitlines():
+        match = _SPAN_LINE.match(line)
+        if match:
+            kind, span, value = match.groups()
+            (sums if kind == "sum" else counts)[span] = float(value)
+    return {span: round(sums[span] / counts[span] * 1000, 1) for span in counts if counts[span] and span in sums}
+
+
+def run_level(args, sessions_count, sessions_audio, port):
+    deepgram = FakeDeepgramServer(port=args.deepgram_port, vad=True).start()
+    llm = FakeLLMServer(port=0, first_token_ms=args.llm_first_token_ms, token_ms=args.llm_token_ms).start()
+    proc = start_server(args.mode, port, deepgram.url(), {
+        "SERVER_ENDPOINTING": "1",
+        "LLM_PROVIDERS": "groq",
+        "GROQ_BASE_URL": llm.url,
+        "LLM_KEEPWARM_SECONDS": "0",
+        "TTS_CACHE_MB": "32" if args.tts_cache else "0",
+        "TTS_PREWARM": "1" if args.tts_cache else "0",
+        "FAKE_TTS_FIRST_BYTE_MS": str(args.tts_first_byte_ms),
+        "LOG_LEVEL": "quiet",
+    })
+    server = psutil.Process(proc.pid)
+    try:
+        time.sleep(1.0)
+        rss_before = server.memory_info().rss
+        cpu_before = server.cpu_times()
+        start = time.perf_counter()
+
+        sessions = [ReplaySession(f"http://127.0.0.1:{port}", sessions_audio[i % len(sessions_audio)], args.speed)
+                    for i in range(sessions_count)]
+        threads = [threading.Thread(target=s.run, daemon=True) for s in sessions]
+        rss_peak = rss_before
+        for t in threads:
+            t.start()
+            time.sleep(args.ramp_ms / 1000)
+        while any(t.is_alive() for t in threads):
+            rss_peak = max(rss_peak, server.memory_info().rss)
+            time.sleep(0.2)
+
+        wall = time.perf_counter() - start
+        cpu_after = server.cpu_times()
+        spans = scrape_span_means(port)
+        time.sleep(args.settle_seconds)  # let per-session state be released before measuring growth
+        rss_after = server.memory_info().rss
+    finally:
+        proc.terminate()
+        proc.wait(10)
+        deepgram.stop()
+        llm.stop()
+
+    cpu_seconds = (cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)
+    latencies = [l for s in sessions for l in s.latencies]
+    turns = sum(s.turns_done for s in sessions)
+    return {
+        "sessions": sessions_count,
+        "turns": turns,
+        "finals": sum(s.finals for s in sessions),
+        "interrupted": sum(s.interrupted for s in sessions),
+        "errors": sum(s.errors for s in sessions),
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        "turns_per_second": round(turns / wall, 2),
+        "cpu_ms_per_session_second": round(cpu_seconds * 1000 / sessions_count / wall, 2),
+        "cpu_ms_per_turn": round(cpu_seconds * 1000 / turns, 1) if turns else None,
+        "rss_before_mb": round(rss_before / 2 ** 20, 1),
+        "rss_peak_mb": round(rss_peak / 2 ** 20, 1),
+        "rss_growth_mb": round((rss_after - rss_before) / 2 ** 20, 1),
+        "server_span_mean_ms": spans,
+    }
+
+
+def print_result(result):
+    print(f"sessions={result['sessions']:<4} turns={result['turns']:<4} interrupted={result['interrupted']:<3} "
+          f"errors={result['errors']:<3} "
+          f"latency p50={result['latency_p50_ms']}ms p95={result['latency_p95_ms']}ms "
+          f"p99={result['latency_p99_ms']}ms turns/s={result['turns_per_second']} "
+          f"cpu/session={result['cpu_ms_per_session_second']}ms/s "
+          f"rss peak={result['rss_peak_mb']}MB growth={result['rss_growth_mb']}MB")
+    if result["server_span_mean_ms"]:
+        print("   server spans (mean ms from end of speech): " +
+              " ".join(f"{k}={v}" for k, v in result["server_span_mean_ms"].items()))
+
+
+# -------------------- regression gate -------------------- #
+
+# metric -> (relative tolerance multiplier, absolute slack); higher is worse for all of them
+GATED_METRICS = {
+    "latency_p50_ms": (1.0, 20.0),
+    "latency_p95_ms": (1.0, 40.0),
+    "cpu_ms_per_session_second": (1.0, 1.0),
+    "rss_growth_mb": (0.0, 10.0),
+    "errors": (0.0, 0.0),
+}
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    by_sessions = {r["sessions"]: r for r in baseline["results"]}
+    for result in results:
+        base = by_sessions.get(result["sessions"])
+        if base is None:
+            continue
+        for metric, (relative, slack) in GATED_METRICS.items():
+            new, old = result.get(metric), base.get(metric)
+            if new is None or old is None:
+                continue
+            limit = old * (1 + tolerance * relative) + slack
+            if new > limit:
+                regressions.append(f"sessions={result['sessions']} {metric}: {old} -> {new} (limit {limit:.1f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (2.0 = twice real time)")
+    parser.add_argument("--recordings", help="directory of mono 16-bit .wav sessions")
+    parser.add_argument("--utterances", type=int, default=3)
+    parser.add_argument("--speech-seconds", type=float, default=1.5)
+    parser.add_argument("--pause-seconds", type=float, default=5.0)
+    parser.add_argument("--mode", default="eventlet", choices=["eventlet", "threading"])
+    parser.add_argument("--tts-cache", action="store_true", help="keep the TTS phrase cache enabled")
+    parser.add_argument("--llm-first-token-ms", type=float, default=150)
+    parser.add_argument("--llm-token-ms", type=float, default=4)
+    parser.add_argument("--tts-first-byte-ms", type=float, default=80)
+    parser.add_argument("--ramp-ms", type=float, default=20)
+    parser.add_argument("--settle-seconds", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=5056)
+    parser.add_argument("--deepgram-port", type=int, default=8767)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--save-baseline", help="write results JSON as the regression baseline")
+    parser.add_argument("--baseline", help="compare against this baseline and exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="relative slack for the gate")
+    args = parser.parse_args()
+
+    if args.recordings:
+        sessions_audio = [load_recording(p) for p in sorted(glob.glob(f"{args.recordings}/*.wav"))]
+        if not sessions_audio:
+            parser.error(f"no .wav files in {args.recordings}")
+    else:
+        sessions_audio = [synthetic_session(args.utterances, args.speech_seconds, args.pause_seconds, seed)
+                          for seed in range(max(args.sessions))]
+
+    results = []
+    for count in args.sessions:
+        result = run_level(args, count, sessions_audio, args.port)
+        print_result(result)
+        results.append(result)
+
+    report = {"mode": args.mode, "speed": args.speed, "results": results}
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Wrote {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("❌ Regressions vs. baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print("✅ No regressions vs. baseline")
+
+
+if __name__ == "__main__":
+    main()
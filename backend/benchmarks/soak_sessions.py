@@ -0,0 +1,146 @@
+# benchmarks/soak_sessions.py
+"""
+Soak test for the session manager: repeated rounds of session churn against
+one eventlet worker (stub LLM/TTS, fake Deepgram), checking that memory,
+threads and upstream connections stay flat.
+
+Every round opens `--sessions` clients. Each starts an STT session, streams
+audio (some send 4 s at 10x real time, so the audio rate limit trips) and fires a
+burst of final_transcript turns (the turn rate limit and the per-session
+turn cap trip). Then a third of them disconnect cleanly, a third are killed
+without a disconnect (their client process exits), and a third just go
+silent and must be reaped by the idle timeout. After each round the harness
+waits for the reaper and samples the server.
+
+Run from backend/:
+    python -m benchmarks.soak_sessions --rounds 10 --sessions 30
+"""
+import argparse
+import multiprocessing
+import re
+import time
+import urllib.request
+
+import psutil
+import socketio
+
+from benchmarks.load_test import CHUNK_SAMPLES, SAMPLE_RATE, start_server
+from benchmarks.stubs.fake_deepgram import FakeDeepgramServer
+
+
+def metric(text, name):
+    match = re.search(rf"^{name} ([0-9.e+-]+)$", text, re.M)
+    return float(match.group(1)) if match else float("nan")
+
+
+def drive(url, speed, turns, linger, seconds=1.0):
+    """One client: start STT, stream `seconds` of audio, burst turns, then linger or return."""
+    client = socketio.Client(reconnection=False)
+    client.connect(url, transports=["websocket"])
+    client.emit("start_session")
+    chunk = b"\x01\x00" * CHUNK_SAMPLES
+    for _ in range(int(seconds * SAMPLE_RATE / CHUNK_SAMPLES)):
+        client.emit("audio_chunk", chunk)
+        time.sleep(CHUNK_SAMPLES / SAMPLE_RATE / speed)
+    for _ in range(turns):
+        client.emit("final_transcript", {"text": "I studied computer science."})
+    time.sleep(linger)
+    return client
+
+
+def clean_client(url, speed, turns, seconds):
+    drive(url, speed, turns, 1.0, seconds).disconnect()
+
+
+def killed_client(url, speed, turns, ready):
+    drive(url, speed, turns, 0.5)
+    ready.set()
+    time.sleep(3600)  # killed by the harness, never disconnects
+
+
+def silent_clients(url, speed, turns, count, hold):
+    clients = [drive(url, speed, turns, 0) for _ in range(count)]
+    time.sleep(hold)  # stays connected but sends nothing: the idle reaper must close it
+    for client in clients:
+        try:
+            client.disconnect()
+        except Exception:
+            pass
+
+
+def sample(proc, port, deepgram):
+    text = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+    return {
+        "rss_mb": proc.memory_info().rss / 1e6,
+        "threads": proc.num_threads(),
+        "fds": proc.num_fds(),
+        "sessions": metric(text, "hivoys_sessions"),
+        "stt": metric(text, "hivoys_sessions_stt_clients"),
+        "turns": metric(text, "hivoys_sessions_turns_in_flight"),
+        "deepgram_open": deepgram.open_connections,
+        "reaped": metric(text, "hivoys_sessions_reaped_idle") + metric(text, "hivoys_sessions_reaped_zombie"),
+        "limited_turns": metric(text, "hivoys_sessions_rate_limited_turns") + metric(text, "hivoys_sessions_rejected_turns"),
+        "limited_audio_kb": metric(text, "hivoys_sessions_rate_limited_audio_bytes") / 1000,
+    }
+
+
+def report(round_number, s):
+    print(f"{round_number:>5} {s['rss_mb']:>7.1f} {s['threads']:>7} {s['fds']:>5} {s['sessions']:>8.0f} "
+          f"{s['stt']:>4.0f} {s['turns']:>5.0f} {s['deepgram_open']:>7} {s['reaped']:>6.0f} "
+          f"{s['limited_turns']:>13.0f} {s['limited_audio_kb']:>11.0f}kB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--sessions", type=int, default=30)
+    parser.add_argument("--turns", type=int, default=8, help="final_transcript burst per session")
+    parser.add_argument("--idle-timeout", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=5061)
+    parser.add_argument("--deepgram-port", type=int, default=8769)
+    args = parser.parse_args()
+
+    deepgram = FakeDeepgramServer(port=args.deepgram_port, idle_timeout=60).start()
+    server = start_server("eventlet", args.port, deepgram.url(), extra_env={
+        "TTS_PREWARM": "0",
+        "LOG_LEVEL": "quiet",
+        "SESSION_IDLE_TIMEOUT": str(args.idle_timeout),
+        "SESSION_REAP_INTERVAL": "1",
+    })
+    proc = psutil.Process(server.pid)
+    url = f"http://127.0.0.1:{args.port}"
+    third = max(1, args.sessions // 3)
+    try:
+        time.sleep(2)
+        print(f"{'round':>5} {'rss MB':>7} {'threads':>7} {'fds':>5} {'sessions':>8} {'stt':>4} {'turns':>5} "
+              f"{'dg open':>7} {'reaped':>6} {'limited turns':>13} {'limited audio':>13}")
+        report(0, sample(proc, args.port, deepgram))
+        for round_number in range(1, args.rounds + 1):
+            procs = []
+            for i in range(third):
+                speed, seconds = (10.0, 4.0) if i % 2 else (1.0, 1.0)
+                procs.append(multiprocessing.Process(target=clean_client, args=(url, speed, args.turns, seconds)))
+            killed = []
+            for i in range(third):
+                ready = multiprocessing.Event()
+                killed.append((multiprocessing.Process(target=killed_client, args=(url, 1.0, args.turns, ready)),
+                               ready))
+            procs.append(multiprocessing.Process(
+                target=silent_clients, args=(url, 1.0, args.turns, third, args.idle_timeout + 5)))
+            for p in procs + [k for k, _ in killed]:
+                p.start()
+            for p, ready in killed:
+                ready.wait(30)
+                p.kill()
+            for p in procs:
+                p.join(120)
+            time.sleep(2)  # reaper interval plus slack
+            report(round_number, sample(proc, args.port, deepgram))
+    finally:
+        server.terminate()
+        server.wait(10)
+        deepgram.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# benchmarks/stubs/fake_deepgram.py
+"""
+Local stand-in for Deepgram's live transcription WebSocket.
+
+Speaks the subset of the result protocol DeepgramStreamClient consumes:
+an interim `Results` message for every `--interim-ms` of audio received and a
+final (`is_final` + `speech_final`) result every `--final-ms`. With `vad=True`
+only audio above `vad_threshold` RMS counts as speech: interims are sent while
+speaking, and the final result plus an UtteranceEnd follow `endpointing_ms` of
+silence, as Deepgram does for recorded sessions with pauses. Like the real
+service it closes a stream that receives neither audio nor {"type": "KeepAlive"}
+for `idle_timeout` seconds, and `handshake_ms` adds latency to every WebSocket
+upgrade so connection pooling can be measured. drop_connections() closes every
+open stream, to exercise client reconnects.
+
+Run standalone from backend/:
+    python -m benchmarks.stubs.fake_deepgram --port 8765
+then point the server at it with DEEPGRAM_URL=ws://127.0.0.1:8765/v1/listen?...
+"""
+import argparse
+import asyncio
+import json
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from websockets.asyncio.server import serve
+
+WORDS = "i studied computer science at nit and then worked on speech recognition projects".split()
+
+
+def _result(transcript, start, duration, is_final):
+    return json.dumps({
+        "type": "Results",
+        "channel_index": [0, 1],
+        "duration": duration,
+        "start": start,
+        "is_final": is_final,
+        "speech_final": is_final,
+        "channel": {"alternatives": [{"transcript": transcript, "confidence": 0.98, "words": []}]},
+    })
+
+
+class FakeDeepgramServer:
+    def __init__(self, host="127.0.0.1", port=8765, interim_ms=500, final_ms=2000,
+                 idle_timeout=10.0, handshake_ms=0, vad=False, vad_threshold=500, endpointing_ms=300):
+        self.host = host
+        self.port = port
+        self.interim_ms = interim_ms
+        self.final_ms = final_ms
+        self.idle_timeout = idle_timeout
+        self.handshake_ms = handshake_ms
+        self.vad = vad
+        self.vad_threshold = vad_threshold
+        self.endpointing_ms = endpointing_ms
+        self.finals_sent = 0
+        self.connections = 0
+        self.open_connections = 0
+        self.bytes_received = 0
+        self.messages_received = 0
+        self.keepalives_received = 0
+        self.idle_closes = 0
+        self._sockets = set()
+        self._loop = None
+        self._stop = None
+
+    async def _handle(self, websocket):
+        self.connections += 1
+        params = parse_qs(urlparse(websocket.request.path).query)
+        sample_rate = int(params.get("sample_rate", ["48000"])[0])
+        encoding = params.get("encoding", ["linear16"])[0]
+        bytes_per_sample = 1 if encoding == "mulaw" else 2
+        bytes_per_ms = sample_rate * bytes_per_sample / 1000  # mono
+
+        if self.vad:
+            await self._handle_vad(websocket, encoding, bytes_per_ms)
+            return
+
+        audio_ms = 0.0
+        last_interim = 0.0
+        segment_start = 0.0
+        words = 0
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(websocket.recv(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    self.idle_closes += 1
+                    await websocket.close(1011, "NET-0001: no audio received")
+                    break
+                self.messages_received += 1
+                if isinstance(message, str):
+                    message_type = json.loads(message).get("type")
+                    if message_type == "KeepAlive":
+                        self.keepalives_received += 1
+                    elif message_type == "CloseStream":
+                        break
+                    continue
+
+                self.bytes_received += len(message)
+                audio_ms += len(message) / bytes_per_ms
+                if audio_ms - last_interim >= self.interim_ms:
+                    last_interim = audio_ms
+                    words += 1
+                    text = " ".join(WORDS[i % len(WORDS)] for i in range(words))
+                    is_final = audio_ms - segment_start >= self.final_ms
+                    await websocket.send(_result(text, segment_start / 1000,
+                                                 (audio_ms - segment_start) / 1000, is_final))
+                    if is_final:
+                        segment_start = audio_ms
+                        words = 0
+        except Exception:
+            pass
+
+    def _is_speech(self, message, encoding):
+        if encoding == "mulaw":
+            # μ-law codes near 0xFF / 0x7F are near-zero amplitude
+            magnitude = 0x7F - (np.frombuffer(message, dtype=np.uint8) & 0x7F).astype(np.int32)
+            return magnitude.mean() > 16
+        samples = np.frombuffer(message[:len(message) // 2 * 2], dtype=np.int16).astype(np.float32)
+        return samples.size > 0 and float(np.sqrt(np.mean(samples ** 2))) > self.vad_threshold
+
+    async def _handle_vad(self, websocket, encoding, bytes_per_ms):
+        audio_ms = 0.0
+        speech_ms = 0.0
+        silence_ms = 0.0
+        last_interim = 0.0
+        segment_start = None
+        words = 0
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(websocket.recv(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    self.idle_closes += 1
+                    await websocket.close(1011, "NET-0001: no audio received")
+                    break
+                self.messages_received += 1
+                if isinstance(message, str):
+                    message_type = json.loads(message).get("type")
+                    if message_type == "KeepAlive":
+                        self.keepalives_received += 1
+                    elif message_type == "CloseStream":
+                        break
+                    continue
+
+                self.bytes_received += len(message)
+                duration = len(message) / bytes_per_ms
+                audio_ms += duration
+                if self._is_speech(message, encoding):
+                    if segment_start is None:
+                        segment_start = audio_ms - duration
+                        speech_ms = 0.0
+                        last_interim = 0.0
+                        await websocket.send(json.dumps({"type": "SpeechStarted", "channel": [0],
+                                                         "timestamp": segment_start / 1000}))
+                    speech_ms += duration
+                    silence_ms = 0.0
+                    if speech_ms - last_interim >= self.interim_ms:
+                        last_interim = speech_ms
+                        words += 1
+                        text = " ".join(WORDS[i % len(WORDS)] for i in range(words))
+                        await websocket.send(_result(text, segment_start / 1000,
+                                                     (audio_ms - segment_start) / 1000, False))
+                elif segment_start is not None:
+                    silence_ms += duration
+                    if silence_ms >= self.endpointing_ms:
+                        words = max(words, 1)
+                        text = " ".join(WORDS[i % len(WORDS)] for i in range(words))
+                        await websocket.send(_result(text, segment_start / 1000,
+                                                     (audio_ms - segment_start) / 1000, True))
+                        await websocket.send(json.dumps({"type": "UtteranceEnd", "channel": [0, 1],
+                                                         "last_word_end": audio_ms / 1000}))
+                        self.finals_sent += 1
+                        segment_start = None
+                        words = 0
+        except Exception:
+            pass
+
+    async def _delay_handshake(self, connection, request):
+        if self.handshake_ms:
+            await asyncio.sleep(self.handshake_ms / 1000)
+        return None
+
+    async def _handle_counted(self, websocket):
+        self.open_connections += 1
+        self._sockets.add(websocket)
+        try:
+            await self._handle(websocket)
+        finally:
+            self._sockets.discard(websocket)
+            self.open_connections -= 1
+
+    async def _serve(self, ready):
+        self._stop = asyncio.Event()
+        async with serve(self._handle_counted, self.host, self.port, process_request=self._delay_handshake):
+            ready.set()
+            await self._stop.wait()
+
+    def start(self):
+        """Serve on a background thread; returns once the socket is listening."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._serve(ready))
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait(5)
+        return self
+
+    def stop(self):
+        if self._loop and self._stop:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def drop_connections(self, code=1011, reason="network error"):
+        """Close every open stream from the server side, like a dropped connection."""
+        def drop():
+            for websocket in list(self._sockets):
+                asyncio.ensure_future(websocket.close(code, reason))
+
+        self._loop.call_soon_threadsafe(drop)
+
+    def url(self, sample_rate=48000, encoding="linear16"):
+        return (f"ws://{self.host}:{self.port}/v1/listen?encoding={encoding}"
+                f"&sample_rate={sample_rate}&channels=1&interim_results=true")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--idle-timeout", type=float, default=10.0)
+    parser.add_argument("--handshake-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    server = FakeDeepgramServer(args.host, args.port, idle_timeout=args.idle_timeout,
+                                handshake_ms=args.handshake_ms).start()
+    print(f"🧪 Fake Deepgram listening on {server.url()}")
+    threading.Event().wait()
+
+
+if __name__ == "__main__":
+    main()
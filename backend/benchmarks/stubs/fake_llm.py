@@ -0,0 +1,129 @@
+# benchmarks/stubs/fake_llm.py
+"""
+Local stand-in for an OpenAI-compatible chat-completions endpoint (which is
+what Groq speaks), streaming a canned answer over SSE.
+
+Every new TCP connection pays `handshake_ms` before its first response, like a
+TLS handshake to a remote API, so connection reuse shows up in latency.
+`GET /models` answers immediately (used by warm-up requests).
+
+Run standalone from backend/:
+    python -m benchmarks.stubs.fake_llm --port 8766
+then point the server at it, e.g. GROQ_BASE_URL=http://127.0.0.1:8766 or
+LLM_PROVIDERS=openai OPENAI_COMPAT_BASE_URL=http://127.0.0.1:8766/v1
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPONSE = (
+    "That's great to hear. Could you tell me a little more about where you completed your schooling? "
+    "I'd also love to know what made you choose your field of study."
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.stub.connections += 1
+        time.sleep(self.server.stub.handshake_ms / 1000)
+
+    def log_message(self, *args):
+        pass
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        body = json.dumps({"object": "list", "data": [{"id": "stub", "object": "model"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        stub = self.server.stub
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        stub.requests += 1
+        if not request.get("stream"):
+            body = json.dumps({"id": "stub", "object": "chat.completion", "created": 0, "model": "stub",
+                               "choices": [{"index": 0, "finish_reason": "stop",
+                                            "message": {"role": "assistant", "content": stub.response}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            time.sleep(stub.first_token_ms / 1000)
+            for word in stub.response.split(" "):
+                chunk = {"id": "stub", "object": "chat.completion.chunk", "created": 0, "model": "stub",
+                         "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                self._chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                time.sleep(stub.token_ms / 1000)
+            self._chunk(b"data: [DONE]\n\n")
+            self._chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+class FakeLLMServer:
+    def __init__(self, host="127.0.0.1", port=8766, first_token_ms=150, token_ms=4, handshake_ms=0,
+                 response=RESPONSE):
+        self.host = host
+        self.port = port
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.handshake_ms = handshake_ms
+        self.response = response
+        self.connections = 0
+        self.requests = 0
+        self._server = None
+
+    def start(self):
+        """Serve on a background thread; returns once the socket is listening."""
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--first-token-ms", type=float, default=150)
+    parser.add_argument("--token-ms", type=float, default=4)
+    parser.add_argument("--handshake-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.host, args.port, args.first_token_ms, args.token_ms, args.handshake_ms).start()
+    print(f"🧪 Fake LLM listening on {server.url}")
+    threading.Event().wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# benchmarks/stubs/fake_piper.py
+"""
+Stand-in for PiperEngine with the same phonemize()/synthesize_batch()
+interface and a simple cost model, for benchmarking LocalTTSPool without a
+voice model.
+
+One inference call costs `overhead_ms` (session launch, graph setup) plus
+`per_phoneme_ms` for every position of the padded batch, and calls run one
+at a time (one model, one CPU), so batching pays off exactly when the fixed
+overhead dominates, as it does for short conversational sentences. Each
+phoneme yields `samples_per_phoneme` samples of a 220 Hz tone at 22.05 kHz,
+and shorter rows are padded with silence like a real padded batch.
+"""
+import re
+import threading
+import time
+
+import numpy as np
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class FakePiperEngine:
+    def __init__(self, overhead_ms=60.0, per_phoneme_ms=0.15, samples_per_phoneme=1400, sample_rate=22050):
+        self.overhead_ms = overhead_ms
+        self.per_phoneme_ms = per_phoneme_ms
+        self.samples_per_phoneme = samples_per_phoneme
+        self.sample_rate = sample_rate
+        self.loaded = False
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        self.loaded = True
+
+    def phonemize(self, text):
+        return [[ord(c) % 100 for c in sentence] for sentence in SENTENCE_END.split(text.strip()) if sentence]
+
+    def synthesize_batch(self, id_lists):
+        longest = max(len(ids) for ids in id_lists)
+        with self._lock:
+            self.calls += 1
+            time.sleep((self.overhead_ms + self.per_phoneme_ms * longest * len(id_lists)) / 1000)
+        clips = []
+        for ids in id_lists:
+            t = np.arange(len(ids) * self.samples_per_phoneme) / self.sample_rate
+            clips.append((0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32))
+        return clips
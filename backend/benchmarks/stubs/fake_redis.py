@@ -0,0 +1,162 @@
+# benchmarks/stubs/fake_redis.py
+"""
+Minimal Redis-compatible pub/sub server: just enough RESP for Flask-SocketIO's
+message queue (python-socketio's RedisManager via redis-py), so multi-worker
+mode can be exercised without a Redis install.
+
+Supports PING, ECHO, SELECT, CLIENT, HELLO, SUBSCRIBE, UNSUBSCRIBE, PUBLISH
+and QUIT, over RESP2 or RESP3 (redis-py >= 6 negotiates RESP3 with HELLO 3).
+
+Run standalone from backend/:
+    python -m benchmarks.stubs.fake_redis --port 6379
+then start workers with SOCKETIO_MESSAGE_QUEUE=redis://127.0.0.1:6379/0
+"""
+import argparse
+import asyncio
+import threading
+
+
+def _bulk(value):
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, str):
+        value = value.encode()
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _array(items, kind=b"*"):
+    return kind + b"%d\r\n" % len(items) + b"".join(
+        b":%d\r\n" % item if isinstance(item, int) else _bulk(item) for item in items)
+
+
+def _push(items, protocol):
+    """Pub/sub frames are plain arrays in RESP2 and push (`>`) frames in RESP3."""
+    return _array(items, b">" if protocol == 3 else b"*")
+
+
+class FakeRedisServer:
+    def __init__(self, host="127.0.0.1", port=6379):
+        self.host = host
+        self.port = port
+        self.published = 0
+        self.delivered = 0
+        self._channels = {}  # channel -> set of writers
+        self._loop = None
+        self._server = None
+
+    async def _read_command(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.strip().split()  # inline command
+        args = []
+        for _ in range(int(line[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def _handle(self, reader, writer):
+        subscribed = set()
+        protocol = 2
+        writer.protocol = 2
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                command = args[0].upper()
+                if command == b"PING":
+                    writer.write(_push([b"pong", b""], protocol) if subscribed and protocol == 2 else b"+PONG\r\n")
+                elif command == b"ECHO":
+                    writer.write(_bulk(args[1]))
+                elif command in (b"SELECT", b"CLIENT"):
+                    writer.write(b"+OK\r\n")
+                elif command == b"HELLO":
+                    requested = int(args[1]) if len(args) > 1 else protocol
+                    if requested not in (2, 3):
+                        writer.write(b"-NOPROTO unsupported protocol version\r\n")
+                    else:
+                        protocol = writer.protocol = requested
+                        info = [b"server", b"redis", b"version", b"7.0.0", b"proto", protocol, b"mode", b"standalone"]
+                        if protocol == 3:
+                            writer.write(b"%4\r\n" + _array(info)[len(b"*8\r\n"):])
+                        else:
+                            writer.write(_array(info))
+                elif command == b"SUBSCRIBE":
+                    for channel in args[1:]:
+                        subscribed.add(channel)
+                        self._channels.setdefault(channel, set()).add(writer)
+                        writer.write(_push([b"subscribe", channel, len(subscribed)], protocol))
+                elif command == b"UNSUBSCRIBE":
+                    for channel in args[1:] or list(subscribed):
+                        subscribed.discard(channel)
+                        self._channels.get(channel, set()).discard(writer)
+                        writer.write(_push([b"unsubscribe", channel, len(subscribed)], protocol))
+                elif command == b"PUBLISH":
+                    channel, message = args[1], args[2]
+                    receivers = list(self._channels.get(channel, ()))
+                    for receiver in receivers:
+                        receiver.write(_push([b"message", channel, message], receiver.protocol))
+                    self.published += 1
+                    self.delivered += len(receivers)
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif command == b"QUIT":
+                    writer.write(b"+OK\r\n")
+                    break
+                else:
+                    writer.write(b"-ERR unknown command '%s'\r\n" % command)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscribed:
+                self._channels.get(channel, set()).discard(writer)
+            writer.close()
+
+    def start(self):
+        """Serve on a background thread; returns once the socket is listening."""
+        ready = threading.Event()
+
+        async def serve():
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            async with self._server:
+                await self._server.serve_forever()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(serve())
+            except asyncio.CancelledError:
+                pass
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait(5)
+        return self
+
+    def stop(self):
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+    @property
+    def url(self):
+        return f"redis://{self.host}:{self.port}/0"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    server = FakeRedisServer(args.host, args.port).start()
+    print(f"🧪 Fake Redis listening on {server.url}")
+    threading.Event().wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,84 +1,368 @@
 # backend/deepgram_client.py
 import json
+import os
+import random
+import re
 import threading
+import time
+from collections import deque
+from urllib.parse import urlencode, urlparse, parse_qsl, urlunparse
 import websocket
+from src.Utils.metrics import STT_RECONNECTS_TOTAL, STT_REPLAYED_BYTES_TOTAL
+from src.Utils.structured_log import log
+
+# Enable interim results and VAD for faster response
+DEEPGRAM_URL = "wss://api.deepgram.com/v1/listen?model=nova-2&encoding=linear16&sample_rate=48000&channels=1&interim_results=true&endpointing=300&vad_events=true&utterance_end_ms=1000"
+
+
+def with_audio_format(url, encoding, sample_rate):
+    """Return `url` with its encoding/sample_rate query params set to what the ingest layer sends."""
+    parts = urlparse(url)
+    params = dict(parse_qsl(parts.query))
+    params.update({"encoding": encoding, "sample_rate": str(sample_rate)})
+    return urlunparse(parts._replace(query=urlencode(params)))
+
+
+# Audio sent before the socket opens is held here instead of being dropped, sized from the
+# stream's own encoding/sample rate (16 kHz linear16 from the ingest layer: 160 kB)
+PRECONNECT_BUFFER_SECONDS = 5.0
+KEEPALIVE_MESSAGE = json.dumps({"type": "KeepAlive"})
+
+# Cheap scans of the raw message, so events nobody consumes (Metadata, empty interims
+# during silence) are never decoded, and results are decoded without their per-word
+# timings (most of each message, unused here). Deepgram sends one alternative by default.
+_MESSAGE_TYPE = re.compile(r'"type"\s*:\s*"(\w+)"')
+_WORDS = re.compile(r'"words"\s*:\s*\[[^\]]*\]')
+_EMPTY_STRING = re.compile(r'\s*:\s*""')
+_FALSE = re.compile(r'\s*:\s*false')
+_HANDLED_TYPES = {"Results", "UtteranceEnd", "SpeechStarted"}
+
+
+def bytes_per_second(url):
+    """Audio byte rate of the stream described by `url`'s encoding/sample_rate/channels params."""
+    params = dict(parse_qsl(urlparse(url).query))
+    width = 1 if params.get("encoding") == "mulaw" else 2
+    return int(params.get("sample_rate", "48000")) * int(params.get("channels", "1")) * width
+
+
+def _is_empty_interim(message):
+    transcript = message.find('"transcript"')
+    if transcript < 0 or not _EMPTY_STRING.match(message, transcript + 12):
+        return False
+    is_final = message.find('"is_final"')
+    return is_final >= 0 and _FALSE.match(message, is_final + 10) is not None
+
+
+def _decode_result(message):
+    try:
+        return json.loads(_WORDS.sub('"words":[]', message))
+    except json.JSONDecodeError:
+        return json.loads(message)  # a "]" inside a word cut the scan short
+
 
 class DeepgramStreamClient:
-    def __init__(self, api_key, on_transcript):
+    def __init__(self, api_key, on_transcript=None, url=None, on_speech_started=None, turn_detector=None,
+                 preconnect_buffer_bytes=None, keepalive_interval=None, max_reconnects=None,
+                 replay_seconds=None, backoff_initial=0.25, backoff_max=8.0):
         """
         on_transcript(transcript_text: str, is_final: bool) -> None
+        on_speech_started() -> None, called on Deepgram's VAD SpeechStarted event (barge-in).
+        turn_detector: optional TurnDetector fed with every result, UtteranceEnd and
+        SpeechStarted event for server-side endpointing.
+        url defaults to DEEPGRAM_URL (overridable via env, e.g. to a local stub server).
+        Callbacks may be (re)bound after connect(), which is how DeepgramPool hands
+        out pre-opened clients.
+
+        A socket that drops after it has opened is reopened, up to `max_reconnects`
+        attempts in a row with exponential backoff (DG_MAX_RECONNECTS, default 5).
+        Audio sent meanwhile waits in the pre-connect buffer, and the last
+        `replay_seconds` (DG_REPLAY_SECONDS, default 5) of audio not yet covered by
+        a final result are replayed first, so the words in flight when the socket
+        dropped are not lost. A KeepAlive goes out after `keepalive_interval`
+        seconds without audio (DG_KEEPALIVE_SECONDS, default 5).
         """
         self.api_key = api_key
         self.on_transcript = on_transcript
+        self.on_speech_started = on_speech_started
+        self.turn_detector = turn_detector
+        self.url = url or os.environ.get("DEEPGRAM_URL", DEEPGRAM_URL)
         self.ws = None
         self._running = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._pending = deque()  # (offset, chunk) waiting for the socket to open
+        self._pending_bytes = 0
+        self.last_send = time.monotonic()
 
-    def connect(self):
-        """Start WebSocket connection in a separate thread."""
-        # Enable interim results and VAD for faster response
-        url = "wss://api.deepgram.com/v1/listen?model=nova-2&encoding=linear16&sample_rate=48000&channels=1&interim_results=true&endpointing=300&vad_events=true"
-        
-        def on_message(ws, message):
-            try:
-                data = json.loads(message)
-                
-                # Handle transcript results
-                if data.get("type") == "Results":
-                    channel = data.get("channel", {})
-                    alternatives = channel.get("alternatives", [])
-                    if alternatives:
-                        transcript = alternatives[0].get("transcript", "")
-                        is_final = data.get("is_final", False)
-                        if transcript.strip():
-                            self.on_transcript(transcript, is_final)
-                
-                # Handle speech started event
-                elif data.get("type") == "SpeechStarted":
-                    print("🎤 Speech detected")
-                
-            except json.JSONDecodeError:
-                pass
-            except Exception as e:
-                print(f"❌ Deepgram message error: {e}")
+        self.keepalive_interval = keepalive_interval or float(os.environ.get("DG_KEEPALIVE_SECONDS", "5"))
+        self.max_reconnects = int(os.environ.get("DG_MAX_RECONNECTS", "5")) if max_reconnects is None else max_reconnects
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.bytes_per_second = bytes_per_second(self.url)
+        self.preconnect_buffer_bytes = preconnect_buffer_bytes or int(PRECONNECT_BUFFER_SECONDS * self.bytes_per_second)
+        if replay_seconds is None:
+            replay_seconds = float(os.environ.get("DG_REPLAY_SECONDS", "5"))
+        self.replay_bytes = int(replay_seconds * self.bytes_per_second)
 
-        def on_error(ws, error):
-            print(f"❌ Deepgram WebSocket error: {error}")
+        # Session audio clock, in bytes of audio handed to send_audio()
+        self._audio_bytes = 0
+        self._replay = deque()  # (offset, chunk) sent on the current socket and not yet final
+        self._replay_size = 0
+        self._stream_start = 0  # session offset of the current socket's first byte (its t=0)
+        # (socket byte, session offset) where each contiguous run of the socket's audio starts: audio
+        # dropped from a full pre-connect buffer leaves gaps the socket's own clock knows nothing about
+        self._runs = []
+        self._stream_bytes = 0  # bytes sent on the current socket
+        self._next_offset = None  # session offset that would continue the current run
+        self._final_until = 0  # session offset covered by final results
+        self.opens = 0  # times a socket has opened (the first one, then reconnects)
+        self.last_error = None
+        self._wake = threading.Event()
+        self.reconnects = 0
+        self.stats = {"messages": 0, "decoded": 0, "duplicates": 0, "replayed_bytes": 0, "dropped_bytes": 0}
 
-        def on_close(ws, close_status_code, close_msg):
-            print(f"🔌 Deepgram connection closed: {close_status_code}")
-            self._running = False
+    def bind(self, on_transcript, on_speech_started=None, turn_detector=None):
+        """Attach session callbacks to this (possibly already open) client."""
+        self.on_transcript = on_transcript
+        self.on_speech_started = on_speech_started
+        self.turn_detector = turn_detector
+
+    @property
+    def is_open(self):
+        return self._running
+
+    @property
+    def is_alive(self):
+        """Open, still connecting, or reconnecting."""
+        return not self._closed
+
+    @property
+    def stream_offset(self):
+        """Session time (s) at which the current socket's timestamps start."""
+        return self._stream_start / self.bytes_per_second
+
+    # -------------------- socket callbacks -------------------- #
+
+    def _on_message(self, ws, message):
+        self.stats["messages"] += 1
+        try:
+            match = _MESSAGE_TYPE.search(message, 0, 64) or _MESSAGE_TYPE.search(message)
+            message_type = match.group(1) if match else None
+            if message_type not in _HANDLED_TYPES:
+                return
 
-        def on_open(ws):
-            print("✅ Deepgram WebSocket connected")
+            # Handle end of utterance (silence gap detected from word timings)
+            if message_type == "UtteranceEnd":
+                if self.turn_detector:
+                    self.turn_detector.on_utterance_end()
+                return
+
+            # Handle speech started event
+            if message_type == "SpeechStarted":
+                log.event("speech_started", every=1.0)
+                if self.turn_detector:
+                    self.turn_detector.on_speech_started()
+                if self.on_speech_started:
+                    self.on_speech_started()
+                return
+
+            # Empty interim (silence): no text to show and no new speech for the detector,
+            # whose silence timeout must keep running
+            if _is_empty_interim(message):
+                return
+
+            # Handle transcript results
+            data = _decode_result(message)
+            self.stats["decoded"] += 1
+            is_final = data.get("is_final", False)
+            if "duration" in data:
+                # Realign the socket's timestamps onto the session clock; after a reconnect
+                # the replayed audio may be re-transcribed up to what was already final
+                end = self._session_offset(data.get("start", 0.0) + data["duration"])
+                if end <= self._final_until:
+                    self.stats["duplicates"] += 1
+                    return
+                if is_final:
+                    self._finalized(end)
+
+            alternatives = data.get("channel", {}).get("alternatives", [])
+            if alternatives:
+                transcript = alternatives[0].get("transcript", "")
+                if transcript.strip() and self.on_transcript:
+                    self.on_transcript(transcript, is_final)
+                if self.turn_detector:
+                    self.turn_detector.on_result(
+                        transcript,
+                        is_final,
+                        speech_final=data.get("speech_final", False),
+                        confidence=alternatives[0].get("confidence", 0.0),
+                    )
+
+        except json.JSONDecodeError:
+            pass
+        except Exception as e:
+            print(f"❌ Deepgram message error: {e}")
+
+    def _on_error(self, ws, error):
+        print(f"❌ Deepgram WebSocket error: {error}")
+        self.last_error = str(error) or type(error).__name__
+
+    def _on_close(self, ws, close_status_code, close_msg):
+        print(f"🔌 Deepgram connection closed: {close_status_code}")
+        self._running = False
+
+    def _on_open(self, ws):
+        print("✅ Deepgram WebSocket connected" if not self.opens else "✅ Deepgram WebSocket reconnected")
+        # Flush audio buffered while connecting (replay first), before any new chunk can jump the queue
+        with self._lock:
+            self._stream_start = self._pending[0][0] if self._pending else self._audio_bytes
+            self._runs = [(0, self._stream_start)]
+            self._stream_bytes = 0
+            self._next_offset = self._stream_start
+            self._replay.clear()
+            self._replay_size = 0
+            while self._pending:
+                self._send_now(*self._pending.popleft())
+            self._pending_bytes = 0
+            self.opens += 1
+            self.last_error = None
             self._running = True
 
-        # Create WebSocket connection
-        self.ws = websocket.WebSocketApp(
-            url,
-            header={"Authorization": f"Token {self.api_key}"},
-            on_open=on_open,
-            on_message=on_message,
-            on_error=on_error,
-            on_close=on_close
-        )
+    # -------------------- connection -------------------- #
+
+    def connect(self):
+        """
+        Start WebSocket connection in a separate thread, which also reopens it
+        if it drops. (A green thread when the server runs with SOCKETIO_ASYNC_MODE=eventlet.)
+        """
+        threading.Thread(target=self._run, daemon=True).start()
+        threading.Thread(target=self._keepalive, daemon=True).start()
+
+    def _run(self):
+        failures = 0
+        while not self._closed:
+            opens = self.opens
+            # Create WebSocket connection
+            self.ws = websocket.WebSocketApp(
+                self.url,
+                header={"Authorization": f"Token {self.api_key}"},
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            self.ws.run_forever()
+            self._running = False
+            if self._closed:
+                break
+            failures = 0 if self.opens > opens else failures + 1
+            # Only a socket that worked before is retried: a bad key or URL fails fast
+            if not self.opens or failures >= self.max_reconnects:
+                if self.opens:
+                    STT_RECONNECTS_TOTAL.inc(1, "gave_up")
+                    print(f"❌ Deepgram connection lost, not reconnecting ({failures} failed attempt(s))")
+                break
+            delay = min(self.backoff_max, self.backoff_initial * 2 ** failures) * random.uniform(0.5, 1.0)
+            replayed = self._prepare_replay()
+            print(f"🔁 Deepgram reconnecting in {delay:.2f}s, replaying {replayed / self.bytes_per_second:.1f}s of audio")
+            self._wake.wait(delay)
+            self.reconnects += 1
+            STT_RECONNECTS_TOTAL.inc(1, "attempted")
+        self._running = False
+        self._closed = True
+
+    def _prepare_replay(self):
+        """Queue the audio the dropped socket had not finalized ahead of what arrived since."""
+        with self._lock:
+            replay = [(offset, chunk) for offset, chunk in self._replay if offset + len(chunk) > self._final_until]
+            self._replay.clear()
+            self._replay_size = 0
+            replayed = sum(len(chunk) for _, chunk in replay)
+            self._pending.extendleft(reversed(replay))
+            self._pending_bytes += replayed
+            self.stats["replayed_bytes"] += replayed
+        STT_REPLAYED_BYTES_TOTAL.inc(replayed)
+        return replayed
+
+    def _session_offset(self, seconds):
+        """Session offset of `seconds` into the current socket's audio, skipping over any gaps."""
+        position = int(seconds * self.bytes_per_second)
+        with self._lock:
+            for run_start, offset in reversed(self._runs):
+                if run_start <= position:
+                    return offset + position - run_start
+        return self._stream_start + position
 
-        # Run in separate thread
-        wst = threading.Thread(target=self.ws.run_forever, daemon=True)
-        wst.start()
+    def _finalized(self, end):
+        """Final results cover the session up to `end`: that audio never needs replaying."""
+        with self._lock:
+            self._final_until = max(self._final_until, end)
+            while self._replay and self._replay[0][0] + len(self._replay[0][1]) <= self._final_until:
+                self._replay_size -= len(self._replay.popleft()[1])
+
+    def _keepalive(self):
+        while not self._closed:
+            self._wake.wait(self.keepalive_interval / 2)
+            if self._running and time.monotonic() - self.last_send >= self.keepalive_interval:
+                self.send_keepalive()
+
+    # -------------------- sending -------------------- #
+
+    def _send_now(self, offset, chunk_bytes):
+        # Kept until a final result covers it, for replay if the socket drops (bounded)
+        self._replay.append((offset, chunk_bytes))
+        self._replay_size += len(chunk_bytes)
+        while self._replay_size > self.replay_bytes and self._replay:
+            self._replay_size -= len(self._replay.popleft()[1])
+        if offset != self._next_offset:
+            self._runs.append((self._stream_bytes, offset))
+        self._stream_bytes += len(chunk_bytes)
+        self._next_offset = offset + len(chunk_bytes)
+        try:
+            self.ws.send(chunk_bytes, opcode=websocket.ABNF.OPCODE_BINARY)
+            self.last_send = time.monotonic()
+        except Exception as e:
+            print(f"❌ Error sending audio to Deepgram: {e}")
 
     def send_audio(self, chunk_bytes: bytes):
-        """Send binary audio chunk to Deepgram websocket."""
+        """
+        Send binary audio chunk to Deepgram websocket. While the socket is
+        connecting or reconnecting, audio goes to a bounded pre-connect buffer
+        (oldest dropped first).
+        """
+        with self._lock:
+            offset = self._audio_bytes
+            self._audio_bytes += len(chunk_bytes)
+            if self._running:
+                self._send_now(offset, chunk_bytes)
+                return
+            if self._closed:
+                return
+            self._pending.append((offset, chunk_bytes))
+            self._pending_bytes += len(chunk_bytes)
+            while self._pending_bytes > self.preconnect_buffer_bytes and self._pending:
+                dropped = len(self._pending.popleft()[1])
+                self._pending_bytes -= dropped
+                self.stats["dropped_bytes"] += dropped
+
+    def send_keepalive(self):
+        """Tell Deepgram the stream is still alive during silence (avoids the ~10 s idle close)."""
         if self.ws and self._running:
             try:
-                self.ws.send(chunk_bytes, opcode=websocket.ABNF.OPCODE_BINARY)
+                self.ws.send(KEEPALIVE_MESSAGE)
+                self.last_send = time.monotonic()
             except Exception as e:
-                print(f"❌ Error sending audio to Deepgram: {e}")
+                print(f"❌ Error sending KeepAlive to Deepgram: {e}")
 
     def close(self):
         """Close the WebSocket connection."""
         self._running = False
+        self._closed = True
+        self._wake.set()
+        if self.turn_detector:
+            self.turn_detector.close()
         if self.ws:
             try:
                 self.ws.close()
             except Exception as e:
-                print(f"❌ Error closing Deepgram connection: {e}")
\ No newline at end of file
+                print(f"❌ Error closing Deepgram connection: {e}")
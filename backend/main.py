@@ -1,24 +1,367 @@
 import os
-import io
-import json
-import threading
+
+# Event-loop engine: green threads let one process hold many sessions without an OS
+# thread per turn. Must patch before anything else imports socket/threading.
+ASYNC_MODE = os.environ.get("SOCKETIO_ASYNC_MODE", "eventlet")
+if ASYNC_MODE == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from flask import Flask, request
+from flask import Flask, Response, request
 from flask_socketio import SocketIO, emit
-from deepgram_client import DeepgramStreamClient
-from azure_tts import stream_tts_audio
-from src.LLM.groq_llm import GroqLLM
+from deepgram_client import DEEPGRAM_URL, with_audio_format
+from src.STT.deepgram_pool import DeepgramPool
+from src.Utils.audio_ingest import AudioIngest
+from azure_tts import (stream_tts_audio, get_synthesizer_pool, get_tts_cache, prewarm_tts_cache, load_prewarm_prompts,
+                       TTS_LOCAL_FALLBACK, TTS_LOCAL_MAX_CHARS)
+from src.TTS.local_tts import get_local_tts_pool
+from src.LLM.llm_router import create_llm_from_env
+from src.LLM.conversation_store import ConversationStore
+from src.Pipeline.outbox import SessionOutbox, SessionClosed
+from src.Pipeline.audio_framer import create_framer_from_env
+from src.Pipeline.response_pipeline import ResponsePipeline
+from src.Pipeline.sentence_segmenter import segment_stream
+from src.Pipeline.turns import TurnCancelled
+from src.Pipeline.sessions import SessionManager
+from src.Pipeline.speculation import SpeculativeGate, SpeculativeTurn
+from src.STT.turn_detector import TurnDetector
+from src.Utils.metrics import REGISTRY, TurnTrace, AUDIO_CHUNKS_TOTAL, AUDIO_BYTES_TOTAL
+from src.Utils.structured_log import log
+from src.Utils.startup import Startup
 
 load_dotenv()
 
 app = Flask(__name__)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading", ping_timeout=60, ping_interval=25)
+
+# Multi-worker mode (see serve.py): workers share a Redis-compatible message queue so
+# socketio.emit(..., room=sid) reaches the client from any worker, while each session's
+# state (Deepgram client, outbox, conversation) stays in the worker that owns its socket.
+MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE") or None
+WORKER_ID = os.environ.get("WORKER_ID", "0")
+REUSE_PORT = os.environ.get("REUSE_PORT", "0") == "1"
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=ASYNC_MODE, ping_timeout=60, ping_interval=25,
+                    message_queue=MESSAGE_QUEUE, channel=os.environ.get("SOCKETIO_CHANNEL", "hivoys"))
 
 # -------------------- GLOBALS -------------------- #
-groq = GroqLLM()
-groq_model = groq.get_model()
-DG_API_KEY = os.environ["DEEPGRAM_API_KEY"]
-dg_clients = {}  # sid → DeepgramStreamClient
+llm = create_llm_from_env()  # one provider, or an LLMRouter hedging across several
+llm_model = llm.get_model()
+STT_BACKEND = os.environ.get("STT_BACKEND", "deepgram").lower()  # deepgram | whisper (local)
+DG_API_KEY = os.environ.get("DEEPGRAM_API_KEY", "")  # checked by the stt warm-up, not at import
+# Browser sends 48 kHz Int16; the ingest layer batches, downsamples and (optionally) μ-law encodes it
+CLIENT_SAMPLE_RATE = 48000
+STT_SAMPLE_RATE = int(os.environ.get("STT_SAMPLE_RATE", "16000"))
+STT_ENCODING = os.environ.get("STT_ENCODING", "linear16")  # linear16 | mulaw
+AUDIO_PACKET_MS = int(os.environ.get("AUDIO_PACKET_MS", "80"))
+if STT_BACKEND == "whisper":
+    from src.STT.whisper_stream import create_whisper_pool_from_env, SAMPLE_RATE as WHISPER_SAMPLE_RATE
+    STT_SAMPLE_RATE, STT_ENCODING = WHISPER_SAMPLE_RATE, "linear16"  # what the model consumes
+    stt_pool = create_whisper_pool_from_env()  # batched faster-whisper shared by this worker's sessions
+else:
+    stt_pool = DeepgramPool(  # pre-opened live sockets
+        DG_API_KEY,
+        size=int(os.environ.get("DG_POOL_SIZE", "2")),
+        url=with_audio_format(os.environ.get("DEEPGRAM_URL", DEEPGRAM_URL), STT_ENCODING, STT_SAMPLE_RATE),
+    )
+tts_pool = get_synthesizer_pool()  # pre-connected Azure synthesizers shared by this worker
+tts_executor = ThreadPoolExecutor(max_workers=tts_pool.max_size, thread_name_prefix="tts")
+response_pipeline = ResponsePipeline(
+    synthesize=lambda sentence, cancel: stream_tts_audio(sentence, pool=tts_pool, cancel=cancel),
+    executor=tts_executor,
+    lookahead=int(os.environ.get("TTS_LOOKAHEAD", "2")),
+    segment=lambda tokens: segment_stream(
+        tokens,
+        min_length=int(os.environ.get("SEGMENT_MIN_CHARS", "12")),
+        max_length=int(os.environ.get("SEGMENT_MAX_CHARS", "220")),
+        first_chunk_early=os.environ.get("SEGMENT_FIRST_CHUNK_EARLY", "1") == "1",
+    ),
+)
+
+def forget_session(session, reason):
+    """Release what a closed session left outside itself; reaped sessions also lose their socket."""
+    log.forget(session.sid)
+    conversations.drop(session.sid)
+    if reason != "disconnect":
+        print(f"🧹 Closing {reason} session {session.sid}")
+        try:
+            socketio.server.disconnect(session.sid)
+        except Exception:
+            pass
+
+
+# sid → Session: outbox, STT client + audio ingest, turn tracker, speculation, rate limits
+sessions = SessionManager(
+    max_sessions=int(os.environ.get("MAX_SESSIONS", "500")),
+    max_stt=int(os.environ.get("MAX_STT_SESSIONS", "500")),
+    max_turns=int(os.environ.get("MAX_TURNS", "64")),
+    max_turns_per_session=int(os.environ.get("MAX_TURNS_PER_SESSION", "2")),
+    audio_rate=float(os.environ.get("AUDIO_RATE_LIMIT_BPS", "192000")),  # 2x real-time 48 kHz Int16
+    audio_burst=float(os.environ.get("AUDIO_RATE_BURST_BYTES", "192000")),
+    turn_rate=float(os.environ.get("TURN_RATE_LIMIT_PER_MIN", "30")) / 60,
+    turn_burst=float(os.environ.get("TURN_RATE_BURST", "5")),
+    idle_timeout=float(os.environ.get("SESSION_IDLE_TIMEOUT", "600")),
+    reap_interval=float(os.environ.get("SESSION_REAP_INTERVAL", "30")),
+    is_alive=lambda sid: socketio.server.manager.is_connected(sid, "/"),
+    on_close=forget_session,
+)
+conversations = ConversationStore(  # sid → token-budgeted history, summarized as it grows
+    summarize=llm.summarize,
+    max_history_tokens=int(os.environ.get("LLM_HISTORY_TOKENS", "1500")),
+    idle_ttl=float(os.environ.get("CONVERSATION_IDLE_TTL", "1800")),
+    max_sessions=int(os.environ.get("CONVERSATION_MAX_SESSIONS", "10000")),
+)
+
+# Detect end of turn from Deepgram results in-process instead of waiting for the
+# browser to echo final_transcript back; optionally start the LLM on interims.
+SERVER_ENDPOINTING = os.environ.get("SERVER_ENDPOINTING", "1") == "1"
+SPECULATIVE_LLM = os.environ.get("SPECULATIVE_LLM", "0") == "1"
+
+
+def keep_llm_warm(interval):
+    """Refresh the LLM connection pool before idle keep-alive connections expire (startup does the first warm-up)."""
+    while interval > 0:
+        socketio.sleep(interval)
+        llm.warm_up()
+
+
+# -------------------- STARTUP -------------------- #
+# Nothing above connects to a service or loads a model; the engines warm up concurrently
+# in the background once the server is listening, and /readyz reports when they are done.
+
+startup = Startup(timeout=float(os.environ.get("STARTUP_TIMEOUT", "120")))
+
+
+def warm_tts():
+    tts_pool.warm_up()
+    if not tts_pool.ready:
+        raise RuntimeError(tts_pool.last_error or "no synthesizer connected")
+
+
+def warm_stt():
+    if STT_BACKEND == "deepgram" and not DG_API_KEY:
+        raise RuntimeError("DEEPGRAM_API_KEY is not set")
+    stt_pool.start()
+
+
+def stt_ready():
+    if getattr(stt_pool, "last_error", None):
+        raise RuntimeError(stt_pool.last_error)
+    return stt_pool.ready
+
+
+startup.register("tts", warm_tts)
+startup.register("stt", warm_stt, check=stt_ready)
+startup.register("llm", llm.warm_up)
+# Local voice for short phrases / remote fallback: optional, the remote voice still serves without it
+USE_LOCAL_TTS = TTS_LOCAL_FALLBACK or TTS_LOCAL_MAX_CHARS > 0 or os.environ.get("TTS_BACKEND") == "local"
+if USE_LOCAL_TTS:
+    def local_tts_ready():
+        if get_local_tts_pool().last_error:
+            raise RuntimeError(get_local_tts_pool().last_error)
+        return get_local_tts_pool().ready
+
+    startup.register("local_tts", get_local_tts_pool, check=local_tts_ready, required=False)
+if os.environ.get("TTS_PREWARM", "1") == "1":
+    startup.register("tts_cache", lambda: prewarm_tts_cache(load_prewarm_prompts(), pool=tts_pool), required=False)
+
+
+def barge_in(client_sid, reason):
+    """Abort the session's in-flight response and drop its queued audio."""
+    session = sessions.get(client_sid)
+    if session is None or not session.tracker.cancel(reason):
+        return
+    print(f"✋ Barge-in ({reason}) for {client_sid}")
+    session.outbox.clear()
+    session.outbox.put("tts_cancel", {"reason": reason})
+
+
+def start_turn(client_sid, text, gate=None):
+    """
+    Run one LLM → TTS response for `text` in a background task. With `gate`
+    (a SpeculativeGate) output is held back until the gate is committed.
+    Returns the turn's CancelToken and TurnTrace.
+    """
+    session = sessions.get(client_sid)
+    if session is None:
+        return None, None
+    refused = sessions.begin_turn(session)
+    if refused:
+        print(f"🚦 Turn refused ({refused}) for {client_sid}")
+        if gate is None:
+            socketio.emit("error", {"message": f"turn refused: {refused}"}, room=client_sid, ignore_queue=True)
+        return None, None
+
+    print(f"🧠 User said: {text}{' (speculative)' if gate else ''}")
+    tracker = session.tracker
+    sink = gate or session.outbox
+
+    # A new turn supersedes whatever the bot is still saying
+    barge_in(client_sid, "new turn")
+    turn_id, cancel = tracker.start_turn()
+
+    trace = TurnTrace(client_sid, turn_id)
+    if session.last_audio_at is not None:
+        trace.mark("last_audio_chunk", at=session.last_audio_at)
+    if gate is None:
+        trace.mark("stt_final")
+
+    history = conversations.history(client_sid)
+    spoken = []
+
+    def on_sentence(sentence):
+        spoken.append(sentence)
+        log.event("tts_sentence", key=client_sid, every=1.0, turn=turn_id, chars=len(sentence))
+
+    def process_streaming():
+        try:
+            # LLM tokens, sentence segmentation and TTS run as overlapping pipeline stages
+            full_response = response_pipeline.run(
+                llm_model.stream(text, cancel=cancel, history=history),
+                emit_audio=lambda audio_chunk: sink.put("tts_chunk", audio_chunk),
+                on_sentence=on_sentence,
+                cancel=cancel,
+                trace=trace,
+            )
+            cancel.raise_if_cancelled()
+
+            # Signal completion
+            sink.put("tts_done", {"text": full_response})
+            trace.mark("tts_done")
+            spans = trace.finish("completed")
+            conversations.record_turn(client_sid, text, full_response)
+            log.event("turn", key=client_sid, every=0, turn=turn_id,
+                      **{f"{span}_ms": round(seconds * 1000, 1) for span, seconds in spans.items()})
+            print(f"✅ Completed response: {full_response}")
+
+        except TurnCancelled as e:
+            trace.finish("cancelled")
+            # Keep what the user already heard; a discarded speculation was never heard
+            if spoken and (gate is None or gate.committed):
+                conversations.record_turn(client_sid, text, " ".join(spoken) + " …")
+            print(f"🛑 Turn {turn_id} cancelled ({e}) for {client_sid}")
+        except SessionClosed:
+            trace.finish("session_closed")
+            print(f"🛑 Turn cancelled, session closed: {client_sid}")
+        except Exception as e:
+            trace.finish("error")
+            print(f"❌ Streaming error: {e}")
+            import traceback
+            traceback.print_exc()
+            socketio.emit("error", {"message": str(e)}, room=client_sid)
+        finally:
+            tracker.finish(cancel)
+            sessions.end_turn(session)
+
+    # Process in a background task (green thread under eventlet)
+    socketio.start_background_task(process_streaming)
+    return cancel, trace
+
+
+def start_speculation(client_sid, text):
+    """Start the LLM on a stable, high-confidence interim transcript."""
+    session = sessions.get(client_sid)
+    if session is None:
+        return
+    gate = SpeculativeGate(session.outbox)
+    cancel, trace = start_turn(client_sid, text, gate=gate)
+    if cancel:
+        cancel.on_cancel(gate.discard)  # unblocks a turn waiting on a full gate
+        session.speculation = SpeculativeTurn(text, cancel, gate, trace)
+
+
+def commit_speculation(client_sid, speculation):
+    try:
+        speculation.gate.commit()
+    except SessionClosed:
+        print(f"🛑 Speculation flush stopped, session closed: {client_sid}")
+
+
+def handle_server_turn(client_sid, text):
+    """End of user turn detected server-side from Deepgram results."""
+    session = sessions.get(client_sid)
+    speculation = session.speculation if session else None
+    if session:
+        session.speculation = None
+    if speculation and not speculation.cancel.cancelled:
+        if speculation.matches(text):
+            print(f"⚡ Speculative response confirmed for {client_sid}")
+            speculation.trace.mark("stt_final")
+            # Flushing may block on a slow client; keep it off the STT receive thread
+            socketio.start_background_task(commit_speculation, client_sid, speculation)
+            return
+        speculation.cancel.cancel("speculation mismatch")
+    start_turn(client_sid, text)
+
+
+def create_stt_client(session):
+    """Claim an STT client for `session`; False when the worker is at its STT limit."""
+    client_sid = session.sid
+
+    def on_transcript_cb(transcript, is_final):
+        socketio.emit("transcript", {"text": transcript, "is_final": is_final}, room=client_sid, ignore_queue=True)
+
+    detector = None
+    if SERVER_ENDPOINTING:
+        detector = TurnDetector(
+            on_turn=lambda text: handle_server_turn(client_sid, text),
+            silence_timeout=float(os.environ.get("ENDPOINT_SILENCE_MS", "700")) / 1000,
+            on_speculate=(lambda text: start_speculation(client_sid, text)) if SPECULATIVE_LLM else None,
+            speculative_confidence=float(os.environ.get("SPECULATIVE_MIN_CONFIDENCE", "0.9")),
+        )
+
+    def create():
+        stt = stt_pool.claim(
+            on_transcript=on_transcript_cb,
+            on_speech_started=lambda: barge_in(client_sid, "speech started"),
+            turn_detector=detector,
+        )
+        ingest = AudioIngest(
+            send=stt.send_audio,
+            input_rate=CLIENT_SAMPLE_RATE,
+            output_rate=STT_SAMPLE_RATE,
+            packet_ms=AUDIO_PACKET_MS,
+            encoding=STT_ENCODING,
+        )
+        return stt, ingest
+
+    return sessions.attach_stt(session, create)
+
+
+# -------------------- METRICS -------------------- #
+
+REGISTRY.register_collector(lambda: {f"hivoys_tts_pool_{k}": v for k, v in tts_pool.stats.items()})
+REGISTRY.register_collector(lambda: {f"hivoys_tts_cache_{k}": v for k, v in get_tts_cache().snapshot().items()})
+REGISTRY.register_collector(lambda: {f"hivoys_{STT_BACKEND}_pool_{k}": v for k, v in stt_pool.stats.items()})
+REGISTRY.register_collector(lambda: {f"hivoys_conversations_{k}": v for k, v in conversations.stats.items()})
+REGISTRY.register_collector(lambda: {f"hivoys_sessions_{k}": v for k, v in sessions.snapshot().items()})
+REGISTRY.register_collector(lambda: {"hivoys_sessions": len(sessions), "hivoys_worker_id": int(WORKER_ID),
+                                     "hivoys_ready": int(startup.ready)})
+if USE_LOCAL_TTS:
+    REGISTRY.register_collector(lambda: {f"hivoys_local_tts_{k}": v for k, v in get_local_tts_pool().stats.items()})
+if hasattr(llm, "http_metrics"):
+    REGISTRY.register_collector(lambda: {f"hivoys_llm_http_{k}": v for k, v in llm.http_metrics.snapshot().items()})
+if hasattr(llm, "snapshot"):
+    REGISTRY.register_collector(lambda: {f"hivoys_llm_router_{k}": v for k, v in llm.snapshot().items()})
+
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/healthz")
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok", "worker": WORKER_ID, "uptime_s": startup.report()["uptime_s"]}
+
+
+@app.route("/readyz")
+def readyz():
+    """Readiness: 200 once every required engine is warm, else 503 with per-engine state."""
+    report = startup.report()
+    return report, (200 if report["ready"] else 503)
 
 
 # -------------------- EVENTS -------------------- #
@@ -26,49 +369,53 @@ dg_clients = {}  # sid → DeepgramStreamClient
 @socketio.on("connect")
 def handle_connect(auth=None):
     sid = request.sid
-    print(f"✅ Client connected: {sid}")
-    emit("server_message", {"text": "Connected to HiVoys WebSocket Server!"})
+    outbox = SessionOutbox(socketio, sid, framer=create_framer_from_env())
+    if sessions.open(sid, outbox) is None:
+        print(f"🚦 Rejecting {sid}: worker {WORKER_ID} is at MAX_SESSIONS")
+        return False  # refuses the connection; the client can retry (another worker may take it)
+    outbox.start()
+    print(f"✅ Client connected: {sid} (worker {WORKER_ID})")
+    emit("server_message", {"text": "Connected to HiVoys WebSocket Server!", "worker": WORKER_ID})
 
 
 @socketio.on("start_session")
 def handle_start_session(data=None):
-    """Start new Deepgram live transcription session."""
+    """Start a new live transcription session (Deepgram or local Whisper)."""
     client_sid = request.sid
-    print(f"🎤 Starting Deepgram session for: {client_sid}")
-
-    def on_transcript_cb(transcript, is_final):
-        socketio.emit("transcript", {"text": transcript, "is_final": is_final}, room=client_sid)
-
-    dg = DeepgramStreamClient(api_key=DG_API_KEY, on_transcript=on_transcript_cb)
-    dg.connect()
-    dg_clients[client_sid] = dg
+    session = sessions.get(client_sid)
+    if session is None:
+        return
+    print(f"🎤 Starting {STT_BACKEND} session for: {client_sid}")
+    if not create_stt_client(session):
+        emit("error", {"message": "speech recognition is at capacity, try again shortly"})
+        return
 
-    emit("server_message", {"text": "Deepgram session started"})
+    emit("server_message", {"text": f"{STT_BACKEND.capitalize()} session started"})
+    emit("session_config", {"server_endpointing": SERVER_ENDPOINTING})
 
 
 @socketio.on("audio_chunk")
 def handle_audio_chunk(blob):
     client_sid = request.sid
     try:
-        dg = dg_clients.get(client_sid)
-        if dg is None:
-            print(f"⚠️ Creating new Deepgram session for {client_sid}")
-            def on_transcript_cb(transcript, is_final):
-                socketio.emit("transcript", {"text": transcript, "is_final": is_final}, room=client_sid)
-            
-            dg = DeepgramStreamClient(api_key=DG_API_KEY, on_transcript=on_transcript_cb)
-            dg.connect()
-            dg_clients[client_sid] = dg
-
-        chunk_bytes = bytes(blob) if isinstance(blob, (bytes, bytearray)) else blob
-        # Debug: print every 50th chunk to avoid spam
-        if not hasattr(handle_audio_chunk, 'counter'):
-            handle_audio_chunk.counter = 0
-        handle_audio_chunk.counter += 1
-        if handle_audio_chunk.counter % 50 == 0:
-            print(f"📡 Sent {handle_audio_chunk.counter} audio chunks ({len(chunk_bytes)} bytes)")
-        
-        dg.send_audio(chunk_bytes)
+        session = sessions.get(client_sid)
+        if session is None or not sessions.admit_audio(session, len(blob)):
+            return  # unknown/closed session, or over its audio rate limit
+        ingest = session.ingest
+        if ingest is None:
+            print(f"⚠️ Creating new {STT_BACKEND} session for {client_sid}")
+            create_stt_client(session)
+            ingest = session.ingest
+            if ingest is None:
+                return  # refused, or still being claimed by start_session
+
+        AUDIO_CHUNKS_TOTAL.inc()
+        AUDIO_BYTES_TOTAL.inc(len(blob))
+        log.event("audio_ingest", key=client_sid, every=10.0, chunk_bytes=len(blob),
+                  packets_out=ingest.packets_out, bytes_in=ingest.bytes_in, bytes_out=ingest.bytes_out)
+
+        # Batched into fixed-duration packets, downsampled and encoded without copying the blob
+        ingest.push(blob)
 
     except Exception as e:
         print("❌ handle_audio_chunk error:", e)
@@ -83,70 +430,33 @@ def handle_final_transcript(payload):
     if not text.strip():
         return
 
-    print(f"🧠 User said: {text}")
-
-    def process_streaming():
-        try:
-            # Stream LLM response and convert to TTS in real-time
-            full_response = ""
-            sentence_buffer = ""
-            
-            # Get streaming response from Groq
-            for chunk in groq_model.stream(text):
-                full_response += chunk
-                sentence_buffer += chunk
-                
-                # When we have a complete sentence, convert to speech immediately
-                if any(punct in sentence_buffer for punct in ['. ', '! ', '? ', '\n']):
-                    sentence = sentence_buffer.strip()
-                    if len(sentence) > 10:  # Only process meaningful sentences
-                        print(f"🎵 Streaming TTS for: {sentence[:50]}...")
-                        
-                        # Get audio chunks and send them
-                        for audio_chunk in stream_tts_audio(sentence):
-                            # Ensure it's bytes
-                            if isinstance(audio_chunk, bytes):
-                                print(f"📤 Sending {len(audio_chunk)} bytes of audio")
-                                socketio.emit("tts_chunk", audio_chunk, room=client_sid)
-                            else:
-                                print(f"⚠️ Warning: audio_chunk is not bytes: {type(audio_chunk)}")
-                        
-                        sentence_buffer = ""
-            
-            # Process any remaining text
-            if sentence_buffer.strip():
-                print(f"🎵 Final TTS chunk: {sentence_buffer[:50]}...")
-                for audio_chunk in stream_tts_audio(sentence_buffer.strip()):
-                    if isinstance(audio_chunk, bytes):
-                        print(f"📤 Sending {len(audio_chunk)} bytes of audio")
-                        socketio.emit("tts_chunk", audio_chunk, room=client_sid)
-            
-            # Signal completion
-            socketio.emit("tts_done", {"text": full_response}, room=client_sid)
-            print(f"✅ Completed response: {full_response}")
-            
-        except Exception as e:
-            print(f"❌ Streaming error: {e}")
-            import traceback
-            traceback.print_exc()
-            socketio.emit("error", {"message": str(e)}, room=client_sid)
-    
-    # Process in background
-    thread = threading.Thread(target=process_streaming, daemon=True)
-    thread.start()
+    start_turn(client_sid, text)
 
 
 @socketio.on("disconnect")
 def handle_disconnect():
-    """Cleanup Deepgram connections."""
+    """Close the STT client and cancel in-flight turns."""
     client_sid = request.sid
-    dg = dg_clients.pop(client_sid, None)
-    if dg:
-        dg.close()
+    sessions.close(client_sid, "disconnect")
     print(f"❌ Client disconnected: {client_sid}")
 
 
 # -------------------- MAIN -------------------- #
 if __name__ == "__main__":
-    print("🚀 Starting HiVoys WebSocket Server with Streaming...")
-    socketio.run(app, host="0.0.0.0", port=5000, debug=False)
\ No newline at end of file
+    print(f"🚀 Starting HiVoys WebSocket Server with Streaming ({ASYNC_MODE})...")
+    startup.start(socketio.start_background_task, sleep=socketio.sleep)
+    socketio.start_background_task(keep_llm_warm, float(os.environ.get("LLM_KEEPWARM_SECONDS", "60")))
+    conversations.start()
+    sessions.start()
+    port = int(os.environ.get("PORT", "5000"))
+    if REUSE_PORT:
+        # Several workers bind the same port; the kernel hashes each new connection to one
+        # of them and the websocket stays there, so a session never changes worker.
+        if ASYNC_MODE != "eventlet":
+            raise SystemExit("REUSE_PORT=1 requires SOCKETIO_ASYNC_MODE=eventlet")
+        from eventlet import wsgi
+        print(f"🧩 Worker {WORKER_ID} sharing port {port} (message queue: {MESSAGE_QUEUE})")
+        wsgi.server(eventlet.listen(("0.0.0.0", port), reuse_port=True), app, log_output=False)
+    else:
+        socketio.run(app, host="0.0.0.0", port=port, debug=False,
+                     allow_unsafe_werkzeug=(ASYNC_MODE == "threading"))
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Multi-worker launcher: runs N copies of main.py on one port.
+
+Each worker binds the port with SO_REUSEPORT (REUSE_PORT=1), so the kernel
+spreads new connections across workers and every websocket stays on the
+worker that accepted it (clients must use the websocket transport, which
+the frontend does, so there is no polling hand-off to break stickiness).
+Workers share a Redis-compatible message queue so an emit to any sid works
+from any worker.
+
+    python serve.py --workers 4 --port 5000 --message-queue redis://127.0.0.1:6379/0
+
+Crashed workers are restarted; SIGTERM/SIGINT stop them all.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def spawn(worker_id, args):
+    env = dict(os.environ)
+    env.update({
+        "PORT": str(args.port),
+        "REUSE_PORT": "1",
+        "SOCKETIO_ASYNC_MODE": "eventlet",
+        "WORKER_ID": str(worker_id),
+    })
+    if args.message_queue:
+        env["SOCKETIO_MESSAGE_QUEUE"] = args.message_queue
+    return subprocess.Popen([sys.executable, os.path.join(HERE, "main.py")], env=env, cwd=HERE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "5000")))
+    parser.add_argument("--message-queue", default=os.environ.get("SOCKETIO_MESSAGE_QUEUE"))
+    args = parser.parse_args()
+
+    if args.workers > 1 and not args.message_queue:
+        print("⚠️ No --message-queue: emits only reach clients connected to the emitting worker")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    workers = {i: spawn(i, args) for i in range(args.workers)}
+    print(f"🚀 {args.workers} worker(s) on port {args.port}")
+
+    while not stopping:
+        time.sleep(0.5)
+        for worker_id, proc in list(workers.items()):
+            if proc.poll() is not None and not stopping:
+                print(f"⚠️ Worker {worker_id} exited ({proc.returncode}), restarting")
+                time.sleep(1.0)
+                workers[worker_id] = spawn(worker_id, args)
+
+    print("🛑 Stopping workers...")
+    for proc in workers.values():
+        if proc.poll() is None:
+            proc.terminate()
+    deadline = time.time() + 10
+    for proc in workers.values():
+        try:
+            proc.wait(max(deadline - time.time(), 0.1))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,36 @@
 from abc import ABC, abstractmethod
 
+
 class BaseLLM(ABC):
+    """
+    Streaming chat interface shared by every LLM provider (and LLMRouter).
+
+    stream() yields text chunks as they arrive. Cancelling `cancel` (a
+    CancelToken) must stop generation promptly, typically by closing the HTTP
+    stream. `history` is a list of {"role", "content"} messages sent between the
+    provider's system prompt and the new user message.
+    """
+
     def __init__(self, model_name: str):
         self.model_name = model_name
 
-    @abstractmethod
     def get_model(self):
         """Return the LLM model instance."""
-        pass
\ No newline at end of file
+        return self
+
+    @abstractmethod
+    def stream(self, user_message, cancel=None, history=None):
+        """Yield response text chunks for `user_message`."""
+
+    def warm_up(self):
+        """Establish connections ahead of the first turn; providers without a network client have nothing to do."""
+        return True
+
+    def invoke(self, messages):
+        """Non-streaming completion of the last user message in `messages`."""
+        *history, last = messages
+        return "".join(self.stream(last["content"], history=history))
+
+    def summarize(self, previous_summary, messages):
+        """Fold `messages` into `previous_summary`; None lets the caller fall back to its own."""
+        return None
@@ -0,0 +1,170 @@
+# src/LLM/conversation_store.py
+import threading
+import time
+from collections import OrderedDict
+
+SUMMARY_PREFIX = "Summary of the interview so far:"
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 chars/token for English) so budgeting needs no tokenizer."""
+    return len(text) // 4 + 4  # + per-message overhead
+
+
+def _fallback_summary(previous, messages, max_chars=1200):
+    """Extractive summary used when no summarizer is configured (or it fails)."""
+    lines = [previous] if previous else []
+    lines += [f"{m['role']}: {m['content']}" for m in messages]
+    text = " ".join(lines)
+    return text if len(text) <= max_chars else "…" + text[-max_chars:]
+
+
+class Conversation:
+    """
+    History of one session: a running summary of compacted turns plus the
+    recent turns verbatim. Everything is append-only between compactions, so the
+    prompt prefix (system prompt, summary, older turns) stays byte-identical
+    from one request to the next and provider-side prompt caching can hit.
+    """
+
+    def __init__(self):
+        self.summary = ""
+        self.messages = []
+        self.tokens = 0
+        self.last_active = time.monotonic()
+        self.lock = threading.Lock()
+        self.compacting = False
+
+    def history(self, max_tokens):
+        """Messages to send ahead of the new user message, never more than `max_tokens`."""
+        with self.lock:
+            self.last_active = time.monotonic()
+            history = []
+            budget = max_tokens
+            if self.summary:
+                history.append({"role": "system", "content": f"{SUMMARY_PREFIX} {self.summary}"})
+                budget -= estimate_tokens(self.summary)
+            # Hard cap while a compaction is still pending: keep the newest turns that fit
+            start = len(self.messages)
+            while start > 0 and budget - estimate_tokens(self.messages[start - 1]["content"]) >= 0:
+                start -= 1
+                budget -= estimate_tokens(self.messages[start]["content"])
+            start += start % 2  # never open the window on an orphaned assistant reply
+            return history + self.messages[start:]
+
+
+class ConversationStore:
+    """
+    Per-session conversation memory for the LLM.
+
+    Each sid gets its own Conversation. When a session's verbatim history grows
+    past `max_history_tokens`, the oldest `compact_turns` user/assistant pairs
+    are folded into the running summary by `summarize(previous_summary, messages)`
+    (in the background, so the turn that triggered it is not delayed). Sessions
+    idle for `idle_ttl` seconds are evicted by the reaper, and at most
+    `max_sessions` are kept (least recently used dropped first).
+    """
+
+    def __init__(self, summarize=None, max_history_tokens=1500, compact_turns=3, idle_ttl=1800.0,
+                 max_sessions=10000, reap_interval=60.0):
+        self.summarize = summarize
+        self.max_history_tokens = max_history_tokens
+        self.compact_turns = compact_turns
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.reap_interval = reap_interval
+
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._reaper = None
+        self.stats = {"compactions": 0, "summary_failures": 0, "evicted_idle": 0, "evicted_lru": 0}
+
+    def _get(self, sid):
+        with self._lock:
+            conversation = self._sessions.get(sid)
+            if conversation is None:
+                conversation = self._sessions[sid] = Conversation()
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.stats["evicted_lru"] += 1
+            else:
+                self._sessions.move_to_end(sid)
+            return conversation
+
+    def history(self, sid):
+        return self._get(sid).history(self.max_history_tokens)
+
+    def record_turn(self, sid, user_text, assistant_text):
+        conversation = self._get(sid)
+        with conversation.lock:
+            for role, content in (("user", user_text), ("assistant", assistant_text)):
+                conversation.messages.append({"role": role, "content": content})
+                conversation.tokens += estimate_tokens(content)
+            conversation.last_active = time.monotonic()
+            needs_compaction = conversation.tokens > self.max_history_tokens and not conversation.compacting
+            if needs_compaction:
+                conversation.compacting = True
+        if needs_compaction:
+            threading.Thread(target=self._compact, args=(conversation,), daemon=True).start()
+
+    def _compact(self, conversation):
+        try:
+            while True:
+                with conversation.lock:
+                    if conversation.tokens <= self.max_history_tokens or len(conversation.messages) <= 2:
+                        return
+                    previous = conversation.summary
+                    count = min(self.compact_turns * 2, len(conversation.messages) - 2)
+                    chunk = conversation.messages[:count]
+
+                summary = None
+                if self.summarize:
+                    try:
+                        summary = self.summarize(previous, chunk)
+                    except Exception as e:
+                        self.stats["summary_failures"] += 1
+                        print(f"⚠️ Conversation summary failed, using extractive fallback: {e}")
+                summary = summary or _fallback_summary(previous, chunk)
+                # The summary may use at most half the budget so recent turns always fit verbatim
+                max_summary_chars = self.max_history_tokens * 2
+                if len(summary) > max_summary_chars:
+                    summary = "…" + summary[-max_summary_chars:]
+
+                with conversation.lock:
+                    # Turns appended meanwhile sit after `chunk`, so dropping the head is safe
+                    del conversation.messages[:count]
+                    conversation.summary = summary
+                    conversation.tokens = sum(estimate_tokens(m["content"]) for m in conversation.messages)
+                self.stats["compactions"] += 1
+        finally:
+            conversation.compacting = False
+
+    def drop(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def evict_idle(self):
+        cutoff = time.monotonic() - self.idle_ttl
+        with self._lock:
+            idle = [sid for sid, c in self._sessions.items() if c.last_active < cutoff]
+            for sid in idle:
+                del self._sessions[sid]
+            self.stats["evicted_idle"] += len(idle)
+        return len(idle)
+
+    def _reap(self):
+        while True:
+            time.sleep(self.reap_interval)
+            evicted = self.evict_idle()
+            if evicted:
+                print(f"🧹 Evicted {evicted} idle conversation(s)")
+
+    def start(self):
+        """Start the idle-session reaper."""
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap, daemon=True)
+            self._reaper.start()
+        return self
+
+    def __len__(self):
+        return len(self._sessions)
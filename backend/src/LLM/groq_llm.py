@@ -1,33 +1,73 @@
 # src/LLM/groq_llm.py
 import os
-from groq import Groq
+import threading
+import time
+from src.LLM.base import BaseLLM
+from src.LLM.http_pool import ConnectionMetrics, HTTPPoolConfig
+from src.LLM.prompts import SYSTEM_PROMPT, SUMMARY_PROMPT
 
-class GroqLLM:
-    def __init__(self):
-        self.client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+
+class GroqLLM(BaseLLM):
+    def __init__(self, model_name="llama-3.1-8b-instant", http_config=None):
         # Use fastest model for lowest latency
-        self.model_name = "llama-3.1-8b-instant"
-    
-    def get_model(self):
-        return self
+        super().__init__(model_name)
+        self.name = "groq"
+        # One pooled keep-alive client for every session in this worker, so turns reuse warm TLS connections
+        self.http_config = http_config or HTTPPoolConfig.from_env()
+        self.http_metrics = ConnectionMetrics()
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._async_client = None
+
+    @property
+    def client(self):
+        """
+        Sync Groq client, built on first use: importing the SDK is slow and a
+        missing GROQ_API_KEY should fail the warm-up, not the server import.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from groq import Groq
+                    self._client = Groq(api_key=os.environ.get("GROQ_API_KEY"),
+                                        http_client=self.http_config.client(self.http_metrics))
+        return self._client
+
+    @property
+    def async_client(self):
+        """AsyncGroq sharing the same pool settings and metrics, created on first use (needs a running loop)."""
+        if self._async_client is None:
+            from groq import AsyncGroq
+            self._async_client = AsyncGroq(api_key=os.environ.get("GROQ_API_KEY"),
+                                           http_client=self.http_config.async_client(self.http_metrics))
+        return self._async_client
+
+    def _messages(self, user_message, history):
+        return [{"role": "system", "content": SYSTEM_PROMPT}, *(history or []),
+                {"role": "user", "content": user_message}]
+
+    def warm_up(self):
+        """Open (or refresh) a pooled connection with a cheap request so no turn pays the TLS handshake."""
+        started = time.perf_counter()
+        try:
+            self.client.models.list()
+            print(f"🔥 Groq connection warm in {(time.perf_counter() - started) * 1000:.0f} ms "
+                  f"({self.http_metrics.snapshot()['new_connections']} opened so far)")
+            return True
+        except Exception as e:
+            print(f"⚠️ Groq warm-up failed: {e}")
+            return False
     
-    def stream(self, user_message):
+    def stream(self, user_message, cancel=None, history=None):
         """
         Stream response token by token for ultra-low latency.
-        Yields each chunk as it arrives.
+        Yields each chunk as it arrives. Cancelling `cancel` closes the HTTP
+        stream so no further Groq tokens are generated or read.
+        `history` (from ConversationStore) goes between the fixed system prompt
+        and the new message, keeping the prompt prefix stable across turns.
         """
-        messages = [
-            {
-                "role": "system",
-                "content": "You are a professional interviewer nad your name is Kavita. Keep responses concise and conversational. Name of the interviewee is Rohit and your are going to ask about his educataion background. and you will start the conversation first."
+        messages = self._messages(user_message, history)
 
-            },
-            {
-                "role": "user",
-                "content": user_message
-            }
-        ]
-        
         try:
             stream = self.client.chat.completions.create(
                 model=self.model_name,
@@ -37,14 +77,40 @@ class GroqLLM:
                 stream=True  # Enable streaming
             )
             
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
-                    
+            unregister = cancel.on_cancel(stream.close) if cancel else None
+            try:
+                for chunk in stream:
+                    if cancel and cancel.cancelled:
+                        break
+                    if chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                if unregister:
+                    unregister()
+                stream.close()
+
         except Exception as e:
+            if cancel and cancel.cancelled:
+                return  # stream was closed underneath us by the cancel
             print(f"❌ Groq streaming error: {e}")
             raise
     
+    async def astream(self, user_message, history=None):
+        """Async variant of stream() for asyncio callers; uses the pooled AsyncGroq client."""
+        stream = await self.async_client.chat.completions.create(
+            model=self.model_name,
+            messages=self._messages(user_message, history),
+            temperature=0.7,
+            max_tokens=120,
+            stream=True,
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
     def invoke(self, messages):
         """
         Non-streaming fallback for compatibility.
@@ -77,4 +143,18 @@ class GroqLLM:
             
         except Exception as e:
             print(f"❌ Groq API error: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def summarize(self, previous_summary, messages):
+        """Fold `messages` into `previous_summary` (used by ConversationStore compaction)."""
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        response = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": f"Current summary: {previous_summary or '(none)'}\n\nNew exchanges:\n{transcript}"},
+            ],
+            temperature=0.2,
+            max_tokens=200,
+        )
+        return response.choices[0].message.content.strip()
@@ -0,0 +1,106 @@
+# src/LLM/http_pool.py
+import importlib.util
+import os
+import threading
+import time
+
+import httpx
+
+
+def http2_available():
+    return importlib.util.find_spec("h2") is not None
+
+
+class ConnectionMetrics:
+    """
+    Counts, per request, whether httpcore had to open (and TLS-handshake) a new
+    connection or reused a pooled one. Hooked in through httpcore's `trace`
+    request extension, so it sees exactly what the transport did.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "new_connections": 0, "reused_connections": 0, "tls_handshakes": 0,
+                      "connect_ms_total": 0.0}
+
+    def _tracer(self, is_async=False):
+        """A per-request trace callback; httpcore awaits it on the async path, so that one is a coroutine."""
+        state = {"connected": False, "started": None}
+
+        def observe(event_name):
+            if event_name == "connection.connect_tcp.started":
+                state["connected"] = True
+                state["started"] = time.perf_counter()
+            elif event_name == "connection.start_tls.complete":
+                with self._lock:
+                    self.stats["tls_handshakes"] += 1
+            elif event_name.endswith("send_request_headers.started"):
+                with self._lock:
+                    self.stats["requests"] += 1
+                    if state["connected"]:
+                        self.stats["new_connections"] += 1
+                        self.stats["connect_ms_total"] += (time.perf_counter() - state["started"]) * 1000
+                    else:
+                        self.stats["reused_connections"] += 1
+                state["connected"] = False
+
+        if not is_async:
+            return lambda event_name, info: observe(event_name)
+
+        async def trace(event_name, info):
+            observe(event_name)
+
+        return trace
+
+    def on_request(self, request):
+        request.extensions["trace"] = self._tracer()
+
+    async def on_request_async(self, request):
+        request.extensions["trace"] = self._tracer(is_async=True)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats["reuse_ratio"] = stats["reused_connections"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+
+class HTTPPoolConfig:
+    """Connection-pool, keep-alive and timeout settings shared by an LLM provider's sync and async clients."""
+
+    def __init__(self, max_connections=100, max_keepalive_connections=20, keepalive_expiry=120.0, http2=True,
+                 connect_timeout=3.0, read_timeout=30.0, write_timeout=10.0, pool_timeout=5.0):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and http2_available()
+        if http2 and not self.http2:
+            print("⚠️ HTTP/2 requested but 'h2' is not installed; using HTTP/1.1 keep-alive")
+        self.timeout = httpx.Timeout(connect=connect_timeout, read=read_timeout, write=write_timeout,
+                                     pool=pool_timeout)
+
+    @property
+    def limits(self):
+        return httpx.Limits(max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_keepalive_connections,
+                            keepalive_expiry=self.keepalive_expiry)
+
+    @classmethod
+    def from_env(cls, prefix="LLM_HTTP_"):
+        env = lambda name, default: os.environ.get(prefix + name, default)
+        return cls(
+            max_connections=int(env("MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(env("MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(env("KEEPALIVE_EXPIRY", "120")),
+            http2=env("HTTP2", "1") == "1",
+            connect_timeout=float(env("CONNECT_TIMEOUT", "3")),
+            read_timeout=float(env("READ_TIMEOUT", "30")),
+        )
+
+    def client(self, metrics=None):
+        hooks = {"request": [metrics.on_request]} if metrics else {}
+        return httpx.Client(limits=self.limits, timeout=self.timeout, http2=self.http2, event_hooks=hooks)
+
+    def async_client(self, metrics=None):
+        hooks = {"request": [metrics.on_request_async]} if metrics else {}
+        return httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=self.http2, event_hooks=hooks)
@@ -0,0 +1,356 @@
+# src/LLM/llm_router.py
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from src.LLM.base import BaseLLM
+from src.Pipeline.turns import CancelToken
+from src.Utils.structured_log import log
+
+_TOKEN, _END, _ERROR = "token", "end", "error"
+
+
+class CircuitBreaker:
+    """
+    Closed → open after `failure_threshold` consecutive failures; after
+    `reset_timeout` seconds one trial request is let through (half-open) and its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def release(self):
+        """A half-open trial ended without an outcome (e.g. cancelled as a losing hedge)."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+class ProviderStats:
+    """Rolling time-to-first-token samples and outcome counters of one provider."""
+
+    def __init__(self, window=200, alpha=0.2):
+        self.ttft = deque(maxlen=window)
+        self.ewma = None
+        self.alpha = alpha
+        self.requests = 0
+        self.wins = 0
+        self.failures = 0
+
+    def record_ttft(self, seconds):
+        self.ttft.append(seconds)
+        self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+
+    def record_censored(self, seconds):
+        """
+        A request cancelled before its first token (a losing hedge): its TTFT is
+        at least `seconds`. Only ever raises the EWMA, and stays out of the
+        percentile window that sets the hedge delay.
+        """
+        if self.ewma is None or seconds > self.ewma:
+            self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+
+    def percentile(self, pct):
+        if not self.ttft:
+            return None
+        values = sorted(self.ttft)
+        return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+class _Attempt:
+    def __init__(self, provider, cancel):
+        self.provider = provider
+        self.cancel = cancel
+        self.started = time.perf_counter()
+
+
+class LLMRouter(BaseLLM):
+    """
+    Routes each turn to the provider with the best recent time-to-first-token
+    and hedges against tail spikes: if no token has arrived after the hedge
+    delay, the same request is sent to the next provider and whichever stream
+    produces a token first wins (the losers are cancelled). The hedge delay
+    is `hedge_after` seconds, or, once enough samples exist, the primary's own
+    p`hedge_percentile` TTFT (floored at `min_hedge_after`). A provider that
+    fails before its first token is failed over immediately; repeated failures
+    trip its circuit breaker so it is skipped until the breaker half-opens.
+    """
+
+    def __init__(self, providers, hedge_after=0.4, hedge_percentile=95, min_hedge_after=0.15, max_attempts=2,
+                 failure_threshold=3, reset_timeout=30.0, min_samples=20):
+        super().__init__("router")
+        self.name = "router"
+        self.providers = list(providers)
+        self.hedge_after = hedge_after
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_after = min_hedge_after
+        self.max_attempts = max_attempts
+        self.min_samples = min_samples
+        self.stats = {p.name: ProviderStats() for p in self.providers}
+        self.breakers = {p.name: CircuitBreaker(failure_threshold, reset_timeout) for p in self.providers}
+        self.counters = {"turns": 0, "hedged": 0, "hedge_wins": 0, "failovers": 0, "exhausted": 0}
+        self._lock = threading.Lock()
+
+    # -------------------- routing -------------------- #
+
+    def _ranked(self):
+        """Providers whose breaker allows a request, fastest (EWMA TTFT) first; untried ones follow in config order."""
+        order = {p.name: i for i, p in enumerate(self.providers)}
+        candidates = [p for p in self.providers if self.breakers[p.name].state != "open"]
+
+        def key(p):
+            ewma = self.stats[p.name].ewma
+            return (ewma is None, ewma or 0.0, order[p.name])
+
+        return sorted(candidates, key=key)
+
+    def _hedge_delay(self, provider):
+        stats = self.stats[provider.name]
+        if len(stats.ttft) >= self.min_samples:
+            return max(self.min_hedge_after, stats.percentile(self.hedge_percentile))
+        return self.hedge_after
+
+    def _next_allowed(self, pending):
+        while pending:
+            provider = pending.pop(0)
+            if self.breakers[provider.name].allow():
+                return provider
+        return None
+
+    def _launch(self, provider, user_message, history, events, attempts):
+        attempt = _Attempt(provider, CancelToken())
+        attempts.append(attempt)
+        with self._lock:
+            self.stats[provider.name].requests += 1
+
+        def run():
+            try:
+                for chunk in provider.stream(user_message, cancel=attempt.cancel, history=history):
+                    if attempt.cancel.cancelled:
+                        return
+                    events.put((attempt, _TOKEN, chunk))
+                events.put((attempt, _END, None))
+            except Exception as e:
+                events.put((attempt, _ERROR, e))
+
+        threading.Thread(target=run, daemon=True).start()
+        return attempt
+
+    # -------------------- BaseLLM -------------------- #
+
+    def stream(self, user_message, cancel=None, history=None):
+        with self._lock:
+            self.counters["turns"] += 1
+        pending = self._ranked()
+        first = self._next_allowed(pending)
+        if first is None:
+            with self._lock:
+                self.counters["exhausted"] += 1
+            raise RuntimeError("No LLM provider available (all circuits open)")
+
+        events = queue.Queue()
+        attempts = []
+        live = set()
+        winner = None
+        finished = False
+        last_error = None
+        unregister = cancel.on_cancel(lambda: [a.cancel.cancel("turn cancelled") for a in attempts]) if cancel else None
+
+        live.add(self._launch(first, user_message, history, events, attempts))
+        hedge_at = time.perf_counter() + self._hedge_delay(first)
+        try:
+            # Phase 1: race for the first token
+            while winner is None:
+                if cancel and cancel.cancelled:
+                    return
+                if not live:
+                    provider = self._next_allowed(pending)
+                    if provider is None:
+                        with self._lock:
+                            self.counters["exhausted"] += 1
+                        raise last_error or RuntimeError("All LLM providers failed")
+                    with self._lock:
+                        self.counters["failovers"] += 1
+                    live.add(self._launch(provider, user_message, history, events, attempts))
+                    continue
+
+                timeout = None
+                if pending and len(attempts) < self.max_attempts:
+                    timeout = max(0.0, hedge_at - time.perf_counter())
+                try:
+                    attempt, kind, payload = events.get(timeout=min(timeout, 0.05) if timeout is not None else 0.05)
+                except queue.Empty:
+                    if timeout is not None and time.perf_counter() >= hedge_at:
+                        provider = self._next_allowed(pending)
+                        if provider is not None:
+                            with self._lock:
+                                self.counters["hedged"] += 1
+                            log.event("llm_hedge", every=1.0, provider=provider.name)
+                            live.add(self._launch(provider, user_message, history, events, attempts))
+                            hedge_at = time.perf_counter() + self._hedge_delay(provider)
+                    continue
+
+                if attempt not in live:
+                    continue
+                if kind == _ERROR:
+                    live.discard(attempt)
+                    last_error = payload
+                    self._record_failure(attempt.provider, payload)
+                    continue
+
+                # First token (or an empty but successful response) wins the race
+                winner = attempt
+                self._record_first_token(attempt)
+                if attempt is not attempts[0]:
+                    with self._lock:
+                        self.counters["hedge_wins"] += 1
+                for other in live - {attempt}:
+                    other.cancel.cancel("hedge lost")
+                    self._record_censored(other)
+                live = {attempt}
+                if kind == _END:
+                    finished = True
+                    self.breakers[attempt.provider.name].record_success()
+                    return
+                yield payload
+
+            # Phase 2: relay the winning stream
+            while True:
+                if cancel and cancel.cancelled:
+                    return
+                try:
+                    attempt, kind, payload = events.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+                if attempt is not winner:
+                    continue
+                if kind == _TOKEN:
+                    yield payload
+                elif kind == _END:
+                    finished = True
+                    self.breakers[winner.provider.name].record_success()
+                    return
+                else:
+                    finished = True
+                    self._record_failure(winner.provider, payload)
+                    raise payload
+        finally:
+            if unregister:
+                unregister()
+            for attempt in attempts:
+                if attempt is not winner:
+                    attempt.cancel.cancel("router done")
+                    self.breakers[attempt.provider.name].release()
+            if winner is not None and not finished:
+                # Cancelled or abandoned mid-stream: no outcome, but a half-open trial must not stay claimed
+                winner.cancel.cancel("router done")
+                self.breakers[winner.provider.name].release()
+
+    def _record_first_token(self, attempt):
+        ttft = time.perf_counter() - attempt.started
+        with self._lock:
+            stats = self.stats[attempt.provider.name]
+            stats.record_ttft(ttft)
+            stats.wins += 1
+
+    def _record_censored(self, attempt):
+        with self._lock:
+            self.stats[attempt.provider.name].record_censored(time.perf_counter() - attempt.started)
+
+    def _record_failure(self, provider, error):
+        print(f"❌ LLM provider {provider.name} failed: {error}")
+        with self._lock:
+            self.stats[provider.name].failures += 1
+        self.breakers[provider.name].record_failure()
+
+    def warm_up(self):
+        return all([provider.warm_up() for provider in self.providers])
+
+    def summarize(self, previous_summary, messages):
+        for provider in self._ranked():
+            if self.breakers[provider.name].state == "closed":
+                return provider.summarize(previous_summary, messages)
+        return None
+
+    def snapshot(self):
+        """Per-provider TTFT percentiles, win/failure counts and breaker state."""
+        with self._lock:
+            providers = {
+                name: {
+                    "ttft_p50": s.percentile(50), "ttft_p95": s.percentile(95), "ttft_ewma": s.ewma,
+                    "requests": s.requests, "wins": s.wins, "failures": s.failures,
+                    "circuit": self.breakers[name].state,
+                }
+                for name, s in self.stats.items()
+            }
+            return dict(self.counters, providers=providers)
+
+
+def create_llm_from_env():
+    """
+    LLM_PROVIDERS is a comma-separated, preference-ordered list of groq | openai | stub
+    (default: groq, or stub when LLM_BACKEND=stub). More than one provider
+    builds an LLMRouter; LLM_HEDGE_MS sets its initial hedge delay.
+    """
+    default = "stub" if os.environ.get("LLM_BACKEND") == "stub" else "groq"
+    names = [n.strip() for n in os.environ.get("LLM_PROVIDERS", default).split(",") if n.strip()]
+
+    providers = []
+    for name in names:
+        if name == "groq":
+            from src.LLM.groq_llm import GroqLLM
+            providers.append(GroqLLM())
+        elif name == "openai":
+            from src.LLM.openai_compatible_llm import OpenAICompatibleLLM
+            providers.append(OpenAICompatibleLLM())
+        elif name == "stub":
+            from src.LLM.stub_llm import StubLLM
+            providers.append(StubLLM(name=f"stub{len(providers)}" if len(names) > 1 else "stub"))
+        else:
+            raise ValueError(f"Unknown LLM provider: {name}")
+
+    if len(providers) == 1:
+        return providers[0]
+    return LLMRouter(
+        providers,
+        hedge_after=float(os.environ.get("LLM_HEDGE_MS", "400")) / 1000,
+        max_attempts=int(os.environ.get("LLM_MAX_ATTEMPTS", "2")),
+    )
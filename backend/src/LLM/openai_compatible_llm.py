@@ -0,0 +1,85 @@
+# src/LLM/openai_compatible_llm.py
+import json
+import os
+
+import requests
+
+from src.LLM.base import BaseLLM
+from src.LLM.prompts import SYSTEM_PROMPT
+
+
+class OpenAICompatibleLLM(BaseLLM):
+    """
+    Any server speaking the OpenAI chat-completions API with SSE streaming
+    (OpenAI, Together, a local vLLM / llama.cpp / Ollama endpoint, ...).
+    Configured from OPENAI_COMPAT_BASE_URL / OPENAI_COMPAT_API_KEY / OPENAI_COMPAT_MODEL.
+    """
+
+    def __init__(self, base_url=None, api_key=None, model_name=None, name="openai", timeout=(3.05, 30)):
+        super().__init__(model_name or os.environ.get("OPENAI_COMPAT_MODEL", "gpt-4o-mini"))
+        self.name = name
+        self.base_url = (base_url or os.environ.get("OPENAI_COMPAT_BASE_URL", "https://api.openai.com/v1")).rstrip("/")
+        self.api_key = api_key or os.environ.get("OPENAI_COMPAT_API_KEY", "")
+        self.timeout = timeout
+        # Keep-alive pool shared by every session; sized like the Groq client's (LLM_HTTP_MAX_KEEPALIVE)
+        self.session = requests.Session()
+        pool_size = int(os.environ.get("LLM_HTTP_MAX_KEEPALIVE", "20"))
+        self.session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+
+    def warm_up(self):
+        """Open a pooled connection with a cheap GET so the first turn skips the TLS handshake."""
+        try:
+            self.session.get(f"{self.base_url}/models", headers=self._headers(), timeout=self.timeout).close()
+            return True
+        except Exception as e:
+            print(f"⚠️ {self.name} warm-up failed: {e}")
+            return False
+
+    def _headers(self):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def _post(self, messages, stream, max_tokens=120, temperature=0.7):
+        response = self.session.post(
+            f"{self.base_url}/chat/completions",
+            headers=self._headers(),
+            json={"model": self.model_name, "messages": messages, "temperature": temperature,
+                  "max_tokens": max_tokens, "stream": stream},
+            stream=stream,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response
+
+    def stream(self, user_message, cancel=None, history=None):
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}, *(history or []),
+                    {"role": "user", "content": user_message}]
+        try:
+            response = self._post(messages, stream=True)
+            unregister = cancel.on_cancel(response.close) if cancel else None
+            try:
+                for line in response.iter_lines():
+                    if cancel and cancel.cancelled:
+                        break
+                    if not line.startswith(b"data: "):
+                        continue
+                    payload = line[6:]
+                    if payload == b"[DONE]":
+                        break
+                    choices = json.loads(payload).get("choices") or [{}]
+                    content = choices[0].get("delta", {}).get("content")
+                    if content:
+                        yield content
+            finally:
+                if unregister:
+                    unregister()
+                response.close()
+
+        except Exception as e:
+            if cancel and cancel.cancelled:
+                return  # response was closed underneath us by the cancel
+            print(f"❌ {self.name} streaming error: {e}")
+            raise
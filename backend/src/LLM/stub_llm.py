@@ -0,0 +1,56 @@
+# src/LLM/stub_llm.py
+import os
+import random
+import time
+from src.LLM.base import BaseLLM
+
+STUB_RESPONSE = (
+    "That's great to hear. Could you tell me a little more about where you completed your schooling? "
+    "I'd also love to know what made you choose your field of study."
+)
+
+
+class StubLLM(BaseLLM):
+    """
+    Local stand-in for GroqLLM (LLM_BACKEND=stub) that streams a canned answer
+    with Groq-like latencies, for load tests and offline benchmarks.
+    `spike_rate` of requests wait an extra `spike_delay` before the first token
+    and `fail_rate` of them raise, to exercise LLMRouter hedging and failover.
+    """
+
+    def __init__(self, first_token_delay=None, token_delay=None, response=STUB_RESPONSE, name="stub",
+                 spike_rate=0.0, spike_delay=1.0, fail_rate=0.0):
+        super().__init__("stub")
+        self.name = name
+        self.first_token_delay = first_token_delay if first_token_delay is not None else \
+            float(os.environ.get("STUB_LLM_FIRST_TOKEN_MS", "150")) / 1000
+        self.token_delay = token_delay if token_delay is not None else \
+            float(os.environ.get("STUB_LLM_TOKEN_MS", "4")) / 1000
+        self.response = response
+        self.spike_rate = spike_rate
+        self.spike_delay = spike_delay
+        self.fail_rate = fail_rate
+
+    def stream(self, user_message, cancel=None, history=None):
+        delay = self.first_token_delay
+        if random.random() < self.spike_rate:
+            delay += self.spike_delay
+        if cancel:
+            cancel.wait(delay)
+        else:
+            time.sleep(delay)
+        if random.random() < self.fail_rate:
+            raise RuntimeError(f"{self.name}: simulated provider error")
+        for word in self.response.split(" "):
+            if cancel and cancel.cancelled:
+                return
+            time.sleep(self.token_delay)
+            yield word + " "
+
+    def invoke(self, messages):
+        return self.response
+
+    def summarize(self, previous_summary, messages):
+        time.sleep(self.first_token_delay)
+        asked = " ".join(m["content"] for m in messages if m["role"] == "user")
+        return f"{previous_summary} Interviewee said: {asked[:200]}".strip()[-600:]
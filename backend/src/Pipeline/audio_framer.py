@@ -0,0 +1,214 @@
+# src/Pipeline/audio_framer.py
+import collections
+import os
+import time
+
+# Outbound TTS audio is 16 kHz / 32 kbps mono MP3: 4 bytes per ms, and every MPEG
+# frame is exactly 144 bytes (36 ms), so cutting on 144-byte boundaries keeps each
+# outbound frame independently decodable and lets whole frames be dropped cleanly.
+BYTES_PER_MS = 4
+ALIGN_BYTES = 144
+
+# Rough size of the JSON packet python-socketio sends ahead of each binary attachment
+FRAME_HEADER_BYTES = 96
+
+
+class AudioFrame:
+    """
+    One outbound slice of TTS audio. `views` are memoryviews into the
+    synthesizer's own buffers; they are only joined (if they span more than
+    one buffer) when payload() is handed to the socket.
+    """
+
+    __slots__ = ("seq", "stream", "offset_ms", "size", "views")
+
+    def __init__(self, seq, stream, offset_ms, views):
+        self.seq = seq
+        self.stream = stream
+        self.offset_ms = offset_ms
+        self.views = views
+        self.size = sum(view.nbytes for view in views)
+
+    @property
+    def duration_ms(self):
+        return self.size / BYTES_PER_MS
+
+    def payload(self):
+        if len(self.views) == 1:
+            view = self.views[0]
+            if isinstance(view.obj, bytes) and view.nbytes == len(view.obj):
+                return view.obj  # the synthesizer's buffer itself, no copy at all
+        return b"".join(self.views)
+
+    def to_event(self):
+        return {
+            "seq": self.seq,
+            "stream": self.stream,
+            "t": round(self.offset_ms, 1),
+            "ms": round(self.duration_ms, 1),
+            "ts": round(time.time() * 1000),
+            "audio": self.payload(),
+        }
+
+
+class DrainMeter:
+    """
+    Estimates how fast a session's client takes in bytes, from the frames it
+    has not acknowledged yet. Every frame handed to the socket is recorded
+    with the running byte total; the backlog (frames not yet acknowledged)
+    then tells how many of those bytes have arrived. The rate is only
+    measurable while the link is busy, so intervals that start with an empty
+    backlog are ignored, and two idle samples in a row reset it to unknown
+    (the link is keeping up).
+    """
+
+    def __init__(self, smoothing=0.3, min_interval=0.02):
+        self.smoothing = smoothing
+        self.min_interval = min_interval
+        self.total = 0
+        self.rate = None  # bytes/s, None while the socket is not the bottleneck
+        self._sent = collections.deque([0], maxlen=1024)  # running total after each frame
+        self._last = None  # (time, drained, backlog) at the previous sample
+
+    def sent(self, *frame_sizes):
+        for size in frame_sizes:
+            self.total += size
+            self._sent.append(self.total)
+
+    def sample(self, backlog, now=None):
+        now = time.monotonic() if now is None else now
+        backlog = min(backlog, len(self._sent) - 1)
+        drained = self._sent[-1 - backlog]
+        if self._last is not None:
+            then, drained_then, backlog_then = self._last
+            if now - then < self.min_interval:
+                return self.rate
+            if backlog_then > 0:
+                observed = (drained - drained_then) / (now - then)
+                self.rate = observed if self.rate is None else self.rate + self.smoothing * (observed - self.rate)
+            elif backlog == 0:
+                self.rate = None
+        self._last = (now, drained, backlog)
+        return self.rate
+
+
+class AudioFramer:
+    """
+    Re-slices one session's outbound TTS audio into frames without copying it.
+
+    push() takes synthesizer output as it arrives; next_frame() cuts the next
+    frame off the front as memoryview slices, aligned to whole MPEG frames.
+    The first frame of every stream (one spoken response) is `first_ms` long
+    so the client can start playback right away. After that, frames are sized
+    so one drains in about `send_ms` at the measured socket rate, clamped to
+    [min_ms, max_ms] (or `frame_ms` while the rate is unknown): a slow link
+    gets small frames that don't hold the socket for long, a fast one gets
+    fewer, larger packets. When the session is behind, everything buffered is
+    merged into `max_ms` frames, and with `max_lag_ms` set, audio that has
+    waited longer than that for the socket is dropped (whole buffers, so the
+    client sees a jump in `t` rather than a corrupt frame).
+    """
+
+    def __init__(self, frame_ms=216, min_ms=72, max_ms=864, first_ms=72, send_ms=50, max_lag_ms=0):
+        self.frame_ms = frame_ms
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.first_ms = first_ms
+        self.send_ms = send_ms
+        self.max_lag_ms = max_lag_ms
+        self.seq = 0
+        self.stream = 0
+        self.buffered = 0
+        self._pending = collections.deque()  # [memoryview, arrival time]
+        self._offset = 0  # bytes of the current stream already framed or dropped
+        self.stats = {"frames": 0, "bytes": 0, "merged": 0, "dropped_ms": 0.0}
+
+    @property
+    def max_bytes(self):
+        return self._aligned(self.max_ms)
+
+    @staticmethod
+    def _aligned(ms):
+        return max(ALIGN_BYTES, int(ms * BYTES_PER_MS) // ALIGN_BYTES * ALIGN_BYTES)
+
+    def frame_bytes(self, rate=None):
+        """Target frame size for the next frame, given the socket drain rate in bytes/s."""
+        if self._offset == 0:
+            return self._aligned(self.first_ms)
+        if rate is None:
+            return self._aligned(self.frame_ms)
+        ms = rate * self.send_ms / 1000 / BYTES_PER_MS
+        return self._aligned(min(self.max_ms, max(self.min_ms, ms)))
+
+    def push(self, chunk):
+        if chunk:
+            view = memoryview(chunk).cast("B")
+            self._pending.append([view, time.monotonic()])
+            self.buffered += view.nbytes
+
+    def _drop_late(self, now):
+        cutoff = now - self.max_lag_ms / 1000
+        while self._pending and self._pending[0][1] < cutoff:
+            view, _ = self._pending.popleft()
+            self.buffered -= view.nbytes
+            self._offset += view.nbytes
+            self.stats["dropped_ms"] += view.nbytes / BYTES_PER_MS
+
+    def next_frame(self, rate=None, behind=False, final=False):
+        """
+        Cut the next frame from buffered audio, or return None when there is
+        nothing to send yet. Never waits for more audio: a short frame goes out
+        as is. Until `final` (end of the stream) a trailing partial MPEG frame
+        stays buffered for the next push.
+        """
+        if self.max_lag_ms and self._offset:
+            self._drop_late(time.monotonic())
+        size = self.max_bytes if behind and self._offset else self.frame_bytes(rate)
+        take = min(size, self.buffered)
+        if not final:
+            take -= take % ALIGN_BYTES
+        if take <= 0:
+            return None
+
+        views = []
+        remaining = take
+        while remaining:
+            entry = self._pending[0]
+            view = entry[0]
+            if view.nbytes <= remaining:
+                views.append(view)
+                self._pending.popleft()
+                remaining -= view.nbytes
+            else:
+                views.append(view[:remaining])
+                entry[0] = view[remaining:]
+                remaining = 0
+
+        frame = AudioFrame(self.seq, self.stream, self._offset / BYTES_PER_MS, views)
+        self.seq += 1
+        self.buffered -= take
+        self._offset += take
+        self.stats["frames"] += 1
+        self.stats["bytes"] += take
+        self.stats["merged"] += len(views) > 1
+        return frame
+
+    def end_stream(self):
+        """Start a new stream (after tts_done or a cancel); anything still buffered is discarded."""
+        self._pending.clear()
+        self.buffered = 0
+        if self._offset:
+            self._offset = 0
+            self.stream += 1
+
+
+def create_framer_from_env():
+    """One session's framer, configured by AUDIO_FRAME_* (milliseconds)."""
+    return AudioFramer(
+        frame_ms=float(os.environ.get("AUDIO_FRAME_MS", "216")),
+        min_ms=float(os.environ.get("AUDIO_FRAME_MIN_MS", "72")),
+        max_ms=float(os.environ.get("AUDIO_FRAME_MAX_MS", "864")),
+        first_ms=float(os.environ.get("AUDIO_FRAME_FIRST_MS", "72")),
+        send_ms=float(os.environ.get("AUDIO_FRAME_SEND_MS", "50")),
+        max_lag_ms=float(os.environ.get("AUDIO_FRAME_MAX_LAG_MS", "0")),
+    )
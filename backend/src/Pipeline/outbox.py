@@ -0,0 +1,191 @@
+# src/Pipeline/outbox.py
+import collections
+import queue
+import threading
+import time
+
+from src.Pipeline.audio_framer import FRAME_HEADER_BYTES, AudioFramer, DrainMeter
+from src.Utils.metrics import TTS_FRAMES_TOTAL, TTS_FRAME_BYTES_TOTAL, TTS_FRAMES_MERGED_TOTAL, TTS_DROPPED_MS_TOTAL
+
+
+class SessionClosed(Exception):
+    """Raised to producers once the session's outbox has been closed."""
+
+
+_CLOSE = object()
+AUDIO_EVENT = "tts_chunk"
+END_OF_STREAM = ("tts_done", "tts_cancel")
+
+
+class SessionOutbox:
+    """
+    Bounded outbound queue for one Socket.IO session, drained by a single
+    sender task.
+
+    Producers (the TTS pipeline) block in put() while the queue is full, and
+    the sender holds off while more than `high_water` audio frames are still
+    unacknowledged by the client (every frame is emitted with an ack
+    callback), so a slow client slows its own synthesis instead of growing
+    server memory. A client that has never acknowledged a frame `ack_timeout`
+    seconds after it was sent (an older frontend) gets no back-pressure.
+    After close() every put() raises SessionClosed, which aborts the
+    producing turn.
+
+    Audio put() as "tts_chunk" is not emitted as is: the sender feeds it to an
+    AudioFramer and emits sequenced, timestamped frames sized to the socket's
+    measured drain rate, merging audio that queued up while the socket was
+    busy (see audio_framer.py).
+    """
+
+    def __init__(self, socketio, sid, max_pending=64, high_water=16, put_timeout=10.0, framer=None,
+                 ack_timeout=5.0):
+        self.socketio = socketio
+        self.sid = sid
+        self.high_water = high_water
+        self.ack_timeout = ack_timeout
+        self.put_timeout = put_timeout
+        self.closed = False
+        self.framer = framer or AudioFramer()
+        self.drain = DrainMeter()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._held = None  # a non-audio item pulled while merging audio, sent next
+        self._lock = threading.Lock()  # framer state is shared with clear()
+        self._unacked = collections.deque()  # send time of each frame the client has not acknowledged
+        self._acks = None  # whether the client acknowledges frames (unknown until the first ack or timeout)
+        self._task = None
+
+    def start(self):
+        self._task = self.socketio.start_background_task(self._run)
+        return self
+
+    def _socket_backlog(self):
+        """Audio frames sent to this client and not acknowledged yet."""
+        with self._lock:
+            if self._acks is None and self._unacked and time.monotonic() - self._unacked[0] > self.ack_timeout:
+                print(f"⚠️ {self.sid} does not acknowledge audio frames; back-pressure disabled")
+                self._acks = False
+            if self._acks is False:
+                self._unacked.clear()
+            return len(self._unacked)
+
+    def _on_ack(self, *args):
+        with self._lock:
+            self._acks = True
+            if self._unacked:
+                self._unacked.popleft()
+
+    def _emit(self, event, data, frame_bytes=None):
+        # The outbox lives in the worker that owns the socket, so skip the
+        # message queue (multi-worker mode) and write straight to it.
+        if frame_bytes is None:
+            self.socketio.emit(event, data, room=self.sid, ignore_queue=True)
+            return
+        with self._lock:
+            if self._acks is not False:
+                self._unacked.append(time.monotonic())
+        self.socketio.emit(event, data, room=self.sid, ignore_queue=True, callback=self._on_ack)
+        self.drain.sent(frame_bytes)
+
+    def _wait_for_socket(self):
+        """Hold off while the socket is behind; False once the session closed."""
+        while not self.closed:
+            backlog = self._socket_backlog()
+            self.drain.sample(backlog)
+            if backlog <= self.high_water:
+                return True
+            self.socketio.sleep(0.005)
+        return False
+
+    def _next_item(self):
+        if self._held is not None:
+            item, self._held = self._held, None
+            return item
+        return self._queue.get()
+
+    def _pull_audio(self):
+        """Move audio that is already queued into the framer, up to one maximum-size frame."""
+        while self.framer.buffered < self.framer.max_bytes:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _CLOSE and item[0] == AUDIO_EVENT:
+                with self._lock:
+                    self.framer.push(item[1])
+            else:
+                self._held = item
+                return
+
+    def _send_audio(self, final=False):
+        while True:
+            if not final:
+                self._pull_audio()
+            if not self._wait_for_socket():
+                return False
+            if not final:
+                self._pull_audio()  # merge whatever arrived while the socket drained
+            backlog = self._socket_backlog()
+            rate = self.drain.sample(backlog)
+            with self._lock:
+                frame = self.framer.next_frame(rate, behind=backlog > self.high_water // 2, final=final)
+                dropped = self.framer.stats["dropped_ms"]
+            if dropped:
+                TTS_DROPPED_MS_TOTAL.inc(dropped)
+                self.framer.stats["dropped_ms"] = 0.0
+            if frame is None:
+                return True
+            self._emit(AUDIO_EVENT, frame.to_event(), FRAME_HEADER_BYTES + frame.size)
+            TTS_FRAMES_TOTAL.inc()
+            TTS_FRAME_BYTES_TOTAL.inc(frame.size)
+            if len(frame.views) > 1:
+                TTS_FRAMES_MERGED_TOTAL.inc()
+
+    def _run(self):
+        while True:
+            item = self._next_item()
+            if item is _CLOSE:
+                return
+            event, data = item
+            if event == AUDIO_EVENT:
+                with self._lock:
+                    self.framer.push(data)
+                if not self._send_audio():
+                    return
+                continue
+            if event in END_OF_STREAM:
+                # Flush the stream's tail (a partial MPEG frame included) before it ends
+                if event == "tts_done" and not self._send_audio(final=True):
+                    return
+                with self._lock:
+                    self.framer.end_stream()
+            if not self._wait_for_socket():
+                return
+            self._emit(event, data)
+
+    def put(self, event, data):
+        """Queue an event for the client, blocking while the session is behind."""
+        if self.closed:
+            raise SessionClosed(self.sid)
+        try:
+            self._queue.put((event, data), timeout=self.put_timeout)
+        except queue.Full:
+            raise SessionClosed(f"{self.sid} stopped draining")
+        if self.closed:
+            raise SessionClosed(self.sid)
+
+    def clear(self):
+        """Drop everything queued but not yet sent (stale audio after a barge-in)."""
+        with self._lock:
+            self.framer.end_stream()
+            self._held = None
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def close(self):
+        self.closed = True
+        # Unblock the sender even if the queue is full
+        self.clear()
+        self._queue.put(_CLOSE)
@@ -0,0 +1,158 @@
+# src/Pipeline/response_pipeline.py
+import queue
+import threading
+
+from src.Pipeline.sentence_segmenter import segment_stream
+from src.Pipeline.turns import CancelToken
+from src.Utils.metrics import NULL_TRACE
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+class _SentenceJob:
+    def __init__(self, sentence):
+        self.sentence = sentence
+        self.frames = queue.Queue()
+
+
+class ResponsePipeline:
+    """
+    Producer/consumer pipeline for one LLM response:
+
+        token reader -> [token queue] -> segmenter -> [sentence queue] -> emitter
+                                              \\-> TTS executor (synthesizes ahead)
+
+    Sentences are submitted to the shared TTS executor as soon as they are
+    segmented, so sentence N+1 synthesizes while sentence N is still being
+    emitted. The emitter drains sentences strictly in order. Both queues are
+    bounded: `lookahead` caps how many sentences may be in flight per response.
+    Cancelling the turn's CancelToken stops every stage and returns the
+    emitter within one poll interval. An optional TurnTrace gets a mark at the
+    first event of every stage.
+    """
+
+    def __init__(self, synthesize, executor, lookahead=2, token_queue_size=256, segment=segment_stream):
+        self.synthesize = synthesize  # (sentence, cancel) -> iterable of audio frames
+        self.executor = executor
+        self.lookahead = lookahead
+        self.token_queue_size = token_queue_size
+        self.segment = segment
+
+    # -------------------- helpers -------------------- #
+
+    @staticmethod
+    def _put(q, item, stop):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _drain(q, cancel=None, stop=None):
+        """Yield items until _DONE; polls so a cancel (raises) or stop (returns) is seen even if _DONE never comes."""
+        while True:
+            try:
+                item = q.get(timeout=0.02)
+            except queue.Empty:
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                if stop is not None and stop.is_set():
+                    return
+                continue
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+
+    # -------------------- stages -------------------- #
+
+    def _read_tokens(self, token_stream, token_q, stop, trace):
+        try:
+            trace.mark("llm_request")
+            for token in token_stream:
+                trace.mark("llm_first_token")
+                if not self._put(token_q, token, stop):
+                    return
+        except Exception as e:
+            self._put(token_q, _Failure(e), stop)
+            return
+        self._put(token_q, _DONE, stop)
+
+    def _synthesize_job(self, job, stop, cancel, trace):
+        try:
+            if stop.is_set():
+                job.frames.put(_DONE)
+                return
+            for frame in self.synthesize(job.sentence, cancel):
+                if stop.is_set():
+                    break
+                trace.mark("tts_first_byte")
+                job.frames.put(frame)
+        except Exception as e:
+            job.frames.put(_Failure(e))
+            return
+        job.frames.put(_DONE)
+
+    def _segment(self, token_q, sentence_q, full_text, stop, cancel, trace):
+        def tokens():
+            # The reader gives up without sending _DONE once the turn stops
+            for token in self._drain(token_q, stop=stop):
+                full_text.append(token)
+                yield token
+
+        try:
+            for sentence in self.segment(tokens()):
+                trace.mark("first_sentence")
+                job = _SentenceJob(sentence)
+                if not self._put(sentence_q, job, stop):
+                    return
+                self.executor.submit(self._synthesize_job, job, stop, cancel, trace)
+        except Exception as e:
+            self._put(sentence_q, _Failure(e), stop)
+            return
+        self._put(sentence_q, _DONE, stop)
+
+    # -------------------- entry point -------------------- #
+
+    def run(self, token_stream, emit_audio, on_sentence=None, cancel=None, trace=None):
+        """
+        Consume `token_stream`, emit audio frames in sentence order through
+        `emit_audio(frame)`, and return the full response text.
+        Raises TurnCancelled if `cancel` fires before the response is complete.
+        """
+        cancel = cancel or CancelToken()
+        trace = trace or NULL_TRACE
+        token_q = queue.Queue(maxsize=self.token_queue_size)
+        sentence_q = queue.Queue(maxsize=self.lookahead)
+        stop = threading.Event()
+        unregister = cancel.on_cancel(stop.set)
+        full_text = []
+
+        reader = threading.Thread(target=self._read_tokens, args=(token_stream, token_q, stop, trace), daemon=True)
+        segmenter = threading.Thread(target=self._segment, args=(token_q, sentence_q, full_text, stop, cancel, trace),
+                                     daemon=True)
+        reader.start()
+        segmenter.start()
+
+        try:
+            for job in self._drain(sentence_q, cancel):
+                if on_sentence:
+                    on_sentence(job.sentence)
+                for frame in self._drain(job.frames, cancel):
+                    cancel.raise_if_cancelled()
+                    emit_audio(frame)
+                    trace.mark("first_audio_emit")
+        finally:
+            stop.set()
+            unregister()
+
+        return "".join(full_text)
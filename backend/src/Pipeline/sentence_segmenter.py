@@ -0,0 +1,119 @@
+# src/Pipeline/sentence_segmenter.py
+TERMINATORS = ".!?"
+CLOSERS = "\"')]}”’"
+CLAUSE_BREAKS = ",;:—"
+
+DEFAULT_ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e",
+    "approx", "dept", "univ", "inc", "ltd", "co", "no", "fig", "jan", "feb", "mar",
+    "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec", "b.tech", "m.tech",
+    "b.sc", "m.sc", "ph.d",
+})
+
+
+class SentenceSegmenter:
+    """
+    Incremental sentence segmenter for streamed LLM tokens.
+
+    Each feed() only scans characters that have not been scanned before, and a
+    chunk is cut right after its terminator so trailing text stays in the
+    buffer for the next sentence. Handles abbreviations ("Dr.", "e.g."),
+    initials, decimals ("3.5"), minimum/maximum chunk lengths and, when
+    `first_chunk_early` is set, cuts the very first chunk at a clause break
+    (comma, colon, ...) so TTS can start before the first sentence finishes.
+    """
+
+    def __init__(self, min_length=12, max_length=220, first_chunk_early=True,
+                 first_chunk_min=20, abbreviations=DEFAULT_ABBREVIATIONS):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.first_chunk_early = first_chunk_early
+        self.first_chunk_min = first_chunk_min
+        self.abbreviations = abbreviations
+
+        self._pending = ""
+        self._scan = 0          # first character of _pending not scanned yet
+        self._soft_break = -1   # last whitespace seen, used when a chunk hits max_length
+        self.chunks_emitted = 0
+
+    def _is_abbreviation(self, text, dot_index):
+        start = dot_index
+        while start > 0 and (text[start - 1].isalpha() or text[start - 1] == "."):
+            start -= 1
+        word = text[start:dot_index]
+        if not word:
+            return False
+        if len(word) == 1 and word.isupper():
+            return True  # initials, e.g. "J. K. Rowling"
+        return word.lower() in self.abbreviations
+
+    def _cut(self, end, chunks):
+        chunk = self._pending[:end].strip()
+        self._pending = self._pending[end:]
+        self._soft_break = -1
+        if chunk:
+            chunks.append(chunk)
+            self.chunks_emitted += 1
+
+    def feed(self, text):
+        """Add streamed text; return the list of chunks completed by it."""
+        self._pending += text
+        chunks = []
+        i = self._scan
+
+        while i < len(self._pending):
+            pending = self._pending
+            ch = pending[i]
+            end = None
+
+            if ch == "\n":
+                end = i + 1
+            elif ch in TERMINATORS:
+                j = i + 1
+                while j < len(pending) and (pending[j] in CLOSERS or pending[j] in TERMINATORS):
+                    j += 1
+                if j >= len(pending):
+                    break  # need the next character to decide
+                if pending[j].isspace() and not (ch == "." and self._is_abbreviation(pending, i)):
+                    end = j
+                i = j - 1
+            elif ch in CLAUSE_BREAKS and self.first_chunk_early and self.chunks_emitted == 0:
+                if i + 1 >= len(pending):
+                    break
+                if pending[i + 1].isspace() and i + 1 >= self.first_chunk_min:
+                    end = i + 1
+            elif ch.isspace():
+                self._soft_break = i
+
+            if end is not None and len(pending[:end].strip()) >= self.min_length:
+                self._cut(end, chunks)
+                i = 0
+                continue
+
+            if i + 1 >= self.max_length:
+                # No sentence boundary in sight: cut at the last whitespace instead
+                self._cut(self._soft_break + 1 if self._soft_break > 0 else i + 1, chunks)
+                i = 0
+                continue
+
+            i += 1
+
+        self._scan = i
+        return chunks
+
+    def flush(self):
+        """Return whatever is left once the token stream has ended."""
+        chunks = []
+        if self._pending.strip():
+            self._cut(len(self._pending), chunks)
+        self._pending = ""
+        self._scan = 0
+        return chunks
+
+
+def segment_stream(tokens, **options):
+    """Yield TTS-ready chunks from a token iterator."""
+    segmenter = SentenceSegmenter(**options)
+    for token in tokens:
+        yield from segmenter.feed(token)
+    yield from segmenter.flush()
@@ -0,0 +1,277 @@
+# src/Pipeline/sessions.py
+import threading
+import time
+
+from src.Pipeline.turns import TurnTracker
+
+
+def _flush(ingest):
+    """Send the partial packet still buffered in `ingest` before its STT client is closed."""
+    if ingest is not None:
+        try:
+            ingest.flush()
+        except Exception as e:
+            print(f"⚠️ Audio ingest flush error: {e}")
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, amount=1):
+        """Spend `amount` tokens if available; False (nothing spent) if the bucket is short."""
+        if self.rate <= 0:
+            return True  # unlimited
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < amount:
+                return False
+            self._tokens -= amount
+            return True
+
+
+class Session:
+    """
+    Everything one connected client owns in this worker: its outbox, STT
+    client and audio ingest, in-flight turn(s) and pending speculation, plus
+    the rate-limit buckets and activity timestamps the manager polices.
+    """
+
+    def __init__(self, sid, outbox, audio_bucket, turn_bucket):
+        self.sid = sid
+        self.outbox = outbox
+        self.tracker = TurnTracker()
+        self.stt = None
+        self.ingest = None
+        self.speculation = None
+        self.audio_bucket = audio_bucket
+        self.turn_bucket = turn_bucket
+        self.turns_in_flight = 0  # started and not yet unwound (a cancelled turn counts until it returns)
+        self.created_at = time.monotonic()
+        self.last_active = self.created_at
+        self.last_audio_at = None
+        self.closed = False
+        self.stt_slot = False  # holds one of the manager's max_stt slots
+        self.claiming = False  # an STT client is being claimed for it
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def close(self):
+        self.closed = True
+        ingest, self.ingest = self.ingest, None
+        stt, self.stt = self.stt, None
+        if stt is not None:
+            _flush(ingest)
+            stt.close()
+        self.speculation = None
+        self.tracker.cancel("disconnect")
+        self.outbox.close()
+
+
+class SessionManager:
+    """
+    Owns the lifecycle of every session in this worker and bounds the work
+    each one can cause.
+
+    - at most `max_sessions` sessions and `max_stt` live STT clients per worker
+    - at most `max_turns` LLM/TTS turns in flight per worker, and
+      `max_turns_per_session` per session (a cancelled turn holds its slot
+      until its threads have unwound)
+    - token buckets per session on inbound audio bytes (`audio_rate` bytes/s,
+      `audio_burst`) and on turns (`turn_rate` turns/s, `turn_burst`);
+      a rate of 0 disables the limit
+
+    A reaper closes sessions idle for `idle_timeout` seconds, and zombies
+    whose socket is gone (`is_alive(sid)` false) without a disconnect event
+    ever arriving. `on_close(session, reason)` runs after every close.
+    """
+
+    def __init__(self, max_sessions=500, max_stt=500, max_turns=64, max_turns_per_session=2,
+                 audio_rate=192000, audio_burst=192000, turn_rate=0.5, turn_burst=5,
+                 idle_timeout=600.0, reap_interval=30.0, is_alive=None, on_close=None):
+        self.max_sessions = max_sessions
+        self.max_stt = max_stt
+        self.max_turns = max_turns
+        self.max_turns_per_session = max_turns_per_session
+        self.audio_rate = audio_rate
+        self.audio_burst = audio_burst
+        self.turn_rate = turn_rate
+        self.turn_burst = turn_burst
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self.is_alive = is_alive
+        self.on_close = on_close
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._turns = 0
+        self._stt = 0
+        self._reaper = None
+        self.stats = {"rejected_sessions": 0, "rejected_stt": 0, "rejected_turns": 0, "rate_limited_turns": 0,
+                      "rate_limited_audio_bytes": 0, "reaped_idle": 0, "reaped_zombie": 0}
+
+    # -------------------- lifecycle -------------------- #
+
+    def open(self, sid, outbox):
+        """Register a new session, or return None when the worker is at capacity."""
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                self.stats["rejected_sessions"] += 1
+                return None
+            session = self._sessions[sid] = Session(
+                sid, outbox,
+                audio_bucket=TokenBucket(self.audio_rate, self.audio_burst),
+                turn_bucket=TokenBucket(self.turn_rate, self.turn_burst),
+            )
+        return session
+
+    def get(self, sid):
+        return self._sessions.get(sid)
+
+    def close(self, sid, reason="disconnect"):
+        with self._lock:
+            session = self._sessions.pop(sid, None)
+            if session is not None:
+                session.closed = True
+                if session.stt_slot:
+                    session.stt_slot = False
+                    self._stt -= 1
+        if session is None:
+            return None
+        session.close()
+        if self.on_close:
+            try:
+                self.on_close(session, reason)
+            except Exception as e:
+                print(f"⚠️ Session close callback error: {e}")
+        return session
+
+    def attach_stt(self, session, create):
+        """
+        Give `session` a new STT client built by `create()` (-> (stt, ingest)),
+        closing the one it replaces (a repeated start_session). Returns False
+        when the worker already runs `max_stt` of them or the session is
+        closed; a claim already in flight for the session is not repeated.
+        """
+        with self._lock:
+            if session.closed:
+                return False
+            if session.claiming:
+                return True
+            if not session.stt_slot:
+                if self._stt >= self.max_stt:
+                    self.stats["rejected_stt"] += 1
+                    return False
+                self._stt += 1
+                session.stt_slot = True
+            session.claiming = True
+        try:
+            stt, ingest = create()
+        except Exception:
+            with self._lock:
+                session.claiming = False
+                if session.stt is None and session.stt_slot:
+                    session.stt_slot = False
+                    self._stt -= 1
+            raise
+        with self._lock:
+            session.claiming = False
+            if session.closed:
+                previous, previous_ingest, orphan = None, None, stt
+            else:
+                previous, previous_ingest, orphan = session.stt, session.ingest, None
+                session.stt, session.ingest = stt, ingest
+        if previous is not None:
+            _flush(previous_ingest)
+        for client in (previous, orphan):
+            if client is not None:
+                client.close()
+        return orphan is None
+
+    # -------------------- limits -------------------- #
+
+    def admit_audio(self, session, nbytes):
+        """Charge `nbytes` of inbound audio to the session's bucket; False means drop the chunk."""
+        if session.audio_bucket.take(nbytes):
+            session.last_audio_at = session.last_active = time.monotonic()
+            return True
+        self.stats["rate_limited_audio_bytes"] += nbytes
+        return False
+
+    def begin_turn(self, session):
+        """
+        Reserve a turn slot. Returns None on success, else why the turn was
+        refused ("rate_limited" or "busy"); every successful call must be
+        paired with end_turn().
+        """
+        if not session.turn_bucket.take():
+            self.stats["rate_limited_turns"] += 1
+            return "rate_limited"
+        with self._lock:
+            if self._turns >= self.max_turns or session.turns_in_flight >= self.max_turns_per_session:
+                self.stats["rejected_turns"] += 1
+                return "busy"
+            self._turns += 1
+            session.turns_in_flight += 1
+        session.touch()
+        return None
+
+    def end_turn(self, session):
+        with self._lock:
+            self._turns -= 1
+            session.turns_in_flight -= 1
+        session.touch()
+
+    # -------------------- reaper -------------------- #
+
+    def reap(self):
+        """Close idle and zombie sessions; returns how many were closed."""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            sessions = list(self._sessions.values())
+        reaped = 0
+        for session in sessions:
+            if self.is_alive is not None and not self.is_alive(session.sid):
+                reason = "zombie"
+            elif session.last_active < cutoff and not session.turns_in_flight:
+                reason = "idle"
+            else:
+                continue
+            if self.close(session.sid, reason) is not None:
+                self.stats[f"reaped_{reason}"] += 1
+                reaped += 1
+        return reaped
+
+    def _reap(self):
+        while True:
+            time.sleep(self.reap_interval)
+            try:
+                reaped = self.reap()
+            except Exception as e:
+                print(f"⚠️ Session reaper error: {e}")
+                continue
+            if reaped:
+                print(f"🧹 Reaped {reaped} idle/zombie session(s)")
+
+    def start(self):
+        """Start the idle/zombie session reaper."""
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap, daemon=True)
+            self._reaper.start()
+        return self
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, sessions=len(self._sessions), stt_clients=self._stt, turns_in_flight=self._turns)
+
+    def __len__(self):
+        return len(self._sessions)
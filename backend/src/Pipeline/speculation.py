@@ -0,0 +1,90 @@
+# src/Pipeline/speculation.py
+import re
+import threading
+
+from src.Pipeline.turns import TurnCancelled
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def normalize_transcript(text):
+    """Case/punctuation-insensitive form used to compare speculative and final text."""
+    return " ".join(_NON_WORD.sub("", text.lower()).split())
+
+
+class SpeculativeGate:
+    """
+    Stands in for a session outbox while a turn runs on an interim transcript.
+    Everything put() is held back until commit() flushes it (and lets later
+    items through directly); a discarded speculation is simply never committed.
+
+    At most `max_buffered` events are held: put() then waits for commit() or
+    discard() (which makes it raise TurnCancelled). Events are handed to the
+    outbox outside the lock, since outbox.put() may block on a slow client;
+    for the same reason commit() belongs in a background task, not on the STT
+    callback that confirmed the speculation.
+    """
+
+    def __init__(self, outbox, max_buffered=256):
+        self.outbox = outbox
+        self.max_buffered = max_buffered
+        self._cond = threading.Condition()
+        self._buffer = []
+        self._commit_started = False
+        self._committed = False
+        self._discarded = False
+
+    @property
+    def committed(self):
+        """True once commit() has started: some of the held output may have reached the client."""
+        return self._commit_started
+
+    def put(self, event, data):
+        with self._cond:
+            while not self._committed:
+                if self._discarded:
+                    raise TurnCancelled("speculation discarded")
+                if len(self._buffer) < self.max_buffered:
+                    self._buffer.append((event, data))
+                    self._cond.notify_all()
+                    return
+                self._cond.wait(0.1)
+        self.outbox.put(event, data)
+
+    def commit(self):
+        """Flush the held events in order (later puts queue behind them until the flush is done)."""
+        with self._cond:
+            if self._commit_started or self._discarded:
+                return
+            self._commit_started = True
+        while True:
+            with self._cond:
+                if self._discarded:  # barge-in during the flush: drop the rest
+                    return
+                batch, self._buffer = self._buffer, []
+                if not batch:
+                    self._committed = True
+                    self._cond.notify_all()
+                    return
+                self._cond.notify_all()  # room again for a put() waiting on a full buffer
+            for event, data in batch:
+                if self._discarded:
+                    break
+                self.outbox.put(event, data)
+
+    def discard(self):
+        with self._cond:
+            self._discarded = True
+            self._buffer = []
+            self._cond.notify_all()
+
+
+class SpeculativeTurn:
+    def __init__(self, text, cancel, gate, trace=None):
+        self.text = text
+        self.cancel = cancel
+        self.gate = gate
+        self.trace = trace
+
+    def matches(self, final_text):
+        return normalize_transcript(self.text) == normalize_transcript(final_text)
@@ -0,0 +1,93 @@
+# src/Pipeline/turns.py
+import threading
+
+
+class TurnCancelled(Exception):
+    """Raised inside a turn once its CancelToken has been cancelled."""
+
+
+class CancelToken:
+    """
+    Cancellation flag shared by every stage of one turn (LLM stream, TTS,
+    emit loop). Stages either poll `cancelled` between items or register an
+    on_cancel() callback to interrupt a blocking call (closing the HTTP
+    stream, stopping the synthesizer).
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.reason = None
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason="cancelled"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Cancel callback error: {e}")
+
+    def on_cancel(self, callback):
+        """Run `callback` on cancel (immediately if already cancelled). Returns an unregister function."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def unregister():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+                return unregister
+        callback()
+        return lambda: None
+
+    def wait(self, timeout=None):
+        """Sleep up to `timeout` seconds, returning early (True) if cancelled."""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise TurnCancelled(self.reason)
+
+
+class TurnTracker:
+    """Tracks the single in-flight turn of one session; starting a new turn cancels the old one."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = None
+        self.turn_id = 0
+
+    def start_turn(self):
+        with self._lock:
+            previous = self._current
+            self.turn_id += 1
+            self._current = CancelToken()
+            token = self._current
+        if previous:
+            previous.cancel("new turn")
+        return self.turn_id, token
+
+    def cancel(self, reason="barge-in"):
+        """Cancel the in-flight turn, if any. Returns True if one was running."""
+        with self._lock:
+            current, self._current = self._current, None
+        if current and not current.cancelled:
+            current.cancel(reason)
+            return True
+        return False
+
+    def finish(self, token):
+        with self._lock:
+            if self._current is token:
+                self._current = None
@@ -0,0 +1,155 @@
+# src/STT/deepgram_pool.py
+import threading
+import time
+
+from deepgram_client import DeepgramStreamClient
+
+
+class DeepgramPool:
+    """
+    Pool of pre-opened Deepgram live sockets so a new session can start
+    streaming immediately instead of paying the WebSocket/TLS handshake.
+
+    Every client sends a KeepAlive after `keepalive_interval` seconds without
+    audio (Deepgram closes streams that see neither for ~10 s), idle and claimed
+    alike; closed idle sockets are dropped, and the pool is refilled in the
+    background after each claim.
+    If the pool is empty, claim() falls back to a fresh connection whose
+    pre-connect buffer holds audio until it opens.
+
+    Idle sockets that fail without ever opening (bad or expired key, Deepgram
+    unreachable) are refilled with exponential backoff, up to `backoff_max`
+    seconds, and the error is kept in `last_error` for /readyz until a socket
+    opens again.
+    """
+
+    def __init__(self, api_key, size=2, keepalive_interval=5.0, url=None, client_factory=DeepgramStreamClient,
+                 backoff_max=300.0):
+        self.api_key = api_key
+        self.size = size
+        self.keepalive_interval = keepalive_interval
+        self.url = url
+        self.client_factory = client_factory
+        self.backoff_max = backoff_max
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._closed = False
+        self._thread = None
+        self._ready = False
+        self._failures = 0  # idle sockets in a row that never opened
+        self._retry_at = 0.0
+        self.last_error = None
+        self.stats = {"claimed_warm": 0, "claimed_cold": 0, "opened": 0, "dropped": 0}
+
+    def _new_client(self):
+        client = self.client_factory(api_key=self.api_key, url=self.url, keepalive_interval=self.keepalive_interval)
+        client.connect()
+        with self._lock:
+            self.stats["opened"] += 1
+        return client
+
+    def _refill(self):
+        try:
+            while not self._closed:
+                with self._lock:
+                    if len(self._idle) >= self.size:
+                        return
+                client = self._new_client()
+                with self._lock:
+                    self._idle.append(client)
+        except Exception as e:
+            print(f"❌ Deepgram pool refill failed: {e}")
+        finally:
+            with self._lock:
+                self._refilling = False
+
+    def _schedule_refill(self):
+        with self._lock:
+            if self._refilling or self._closed or time.monotonic() < self._retry_at:
+                return
+            self._refilling = True
+        threading.Thread(target=self._refill, daemon=True).start()
+
+    def _maintain(self):
+        while not self._closed:
+            time.sleep(self.keepalive_interval)
+            with self._lock:
+                idle = list(self._idle)
+            failed = None
+            for client in idle:
+                if client.is_open:
+                    self._connected()
+                elif not client.is_alive:
+                    with self._lock:
+                        if client in self._idle:
+                            self._idle.remove(client)
+                            self.stats["dropped"] += 1
+                    if not client.opens:
+                        failed = client
+            if failed is not None:
+                self._failed(failed)
+            self._schedule_refill()
+
+    def _connected(self):
+        with self._lock:
+            self._failures = 0
+            self._retry_at = 0.0
+            self.last_error = None
+
+    def _failed(self, client):
+        """An idle socket never opened: back off before opening replacements."""
+        with self._lock:
+            self._failures += 1
+            delay = min(self.backoff_max, self.keepalive_interval * 2 ** (self._failures - 1))
+            self._retry_at = time.monotonic() + delay
+            self.last_error = client.last_error or "Deepgram socket closed before opening"
+        print(f"❌ Deepgram pool: socket failed to open ({self.last_error}), retrying in {delay:.1f}s")
+
+    @property
+    def ready(self):
+        """True once a pre-opened socket has actually connected (so the key and URL work)."""
+        if not self._ready:
+            with self._lock:
+                self._ready = any(client.is_open for client in self._idle)
+        return self._ready
+
+    def start(self):
+        """Open `size` sockets in the background and start the keep-alive loop."""
+        self._schedule_refill()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._maintain, daemon=True)
+            self._thread.start()
+        return self
+
+    def claim(self, on_transcript, on_speech_started=None, turn_detector=None):
+        """Hand out a connected (or at least connecting) client bound to the caller's callbacks."""
+        client = None
+        with self._lock:
+            # Prefer sockets that are already open, newest first
+            for candidate in reversed(self._idle):
+                if candidate.is_open:
+                    client = candidate
+                    break
+            if client is None:
+                client = next((c for c in reversed(self._idle) if c.is_alive), None)
+            if client is not None:
+                self._idle.remove(client)
+                self.stats["claimed_warm"] += 1
+
+        if client is None:
+            client = self._new_client()
+            with self._lock:
+                self.stats["claimed_cold"] += 1
+
+        client.bind(on_transcript, on_speech_started=on_speech_started, turn_detector=turn_detector)
+        self._schedule_refill()
+        return client
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for client in idle:
+            client.close()
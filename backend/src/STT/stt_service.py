@@ -1,23 +1,30 @@
-from faster_whisper import WhisperModel
-import tempfile
 import os
+import threading
+from src.Utils.audio_decoder import decode_audio
 
-# Load Whisper model once
-model = WhisperModel("small")  # small, medium, large
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """Load the Whisper model once, on first use rather than at import (small, medium, large)."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            from faster_whisper import WhisperModel
+            _model = WhisperModel(os.environ.get("WHISPER_MODEL", "small"),
+                                  compute_type=os.environ.get("WHISPER_COMPUTE_TYPE", "int8"))
+    return _model
 
 def transcribe_audio(file_obj) -> str:
     """
     Transcribe uploaded audio file to text.
     file_obj: file-like object (e.g., Flask file)
     """
-    # Save temporary file
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-    file_obj.save(temp_file.name)
+    # Decode in memory (no temp file) to the 16 kHz mono float32 Whisper takes directly
+    audio = decode_audio(file_obj.read(), target_rate=16000)
 
     # Transcribe
-    segments, info = model.transcribe(temp_file.name)
+    segments, info = get_model().transcribe(audio.samples)
     text = " ".join([segment.text for segment in segments])
-
-    # Delete temp file
-    os.unlink(temp_file.name)
     return text
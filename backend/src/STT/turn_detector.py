@@ -0,0 +1,121 @@
+# src/STT/turn_detector.py
+import threading
+
+
+class TurnDetector:
+    """
+    Server-side end-of-turn detection on top of Deepgram's streaming results.
+
+    Finalized (`is_final`) segments are aggregated into one utterance, which is
+    handed to `on_turn(text)` as soon as Deepgram marks `speech_final`, sends
+    `UtteranceEnd`, or no new speech arrives for `silence_timeout` seconds.
+
+    With `on_speculate(text)` set, an interim hypothesis that stays unchanged
+    for `min_stable_interims` results at >= `speculative_confidence` is handed
+    out early so the LLM can start before the turn is final; the caller is
+    expected to compare it against the final text passed to on_turn().
+    """
+
+    def __init__(self, on_turn, silence_timeout=0.7, on_speculate=None,
+                 speculative_confidence=0.9, min_stable_interims=2):
+        self.on_turn = on_turn
+        self.silence_timeout = silence_timeout
+        self.on_speculate = on_speculate
+        self.speculative_confidence = speculative_confidence
+        self.min_stable_interims = min_stable_interims
+
+        self._lock = threading.Lock()
+        self._segments = []
+        self._timer = None
+        self._timer_generation = 0  # bumped on every cancel/re-arm; a stale timer sees a newer value and backs off
+        self._last_interim = None
+        self._stable_count = 0
+        self._speculated = None
+
+    def _cancel_timer(self):
+        self._timer_generation += 1
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def _arm_timer(self, restart=False):
+        """Start the silence timeout (caller holds the lock); a running one is kept unless `restart`."""
+        if self._timer and not restart:
+            return
+        self._cancel_timer()
+        self._timer = threading.Timer(self.silence_timeout, self._on_silence, args=(self._timer_generation,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _take_turn(self):
+        """Pop the aggregated utterance (caller holds the lock)."""
+        self._cancel_timer()
+        text = " ".join(self._segments).strip()
+        self._segments = []
+        self._last_interim = None
+        self._stable_count = 0
+        self._speculated = None
+        return text
+
+    def _fire(self, text):
+        if text:
+            self.on_turn(text)
+
+    def _on_silence(self, generation):
+        with self._lock:
+            if generation != self._timer_generation:
+                return  # cancelled or restarted while this callback waited for the lock
+            self._timer = None
+            text = self._take_turn()
+        self._fire(text)
+
+    def on_result(self, transcript, is_final, speech_final=False, confidence=1.0):
+        transcript = transcript.strip()
+        turn_text = None
+        speculation = None
+
+        with self._lock:
+            if transcript:
+                self._cancel_timer()  # new speech: the user is still talking
+            if is_final:
+                if transcript:
+                    self._segments.append(transcript)
+                self._last_interim = None
+                self._stable_count = 0
+                if speech_final:
+                    turn_text = self._take_turn()
+                elif self._segments:
+                    self._arm_timer()
+            elif not transcript:
+                # Silence after pending finals: make sure the fallback is running
+                if self._segments:
+                    self._arm_timer()
+            elif self.on_speculate:
+                candidate = " ".join(self._segments + [transcript])
+                self._stable_count = self._stable_count + 1 if candidate == self._last_interim else 1
+                self._last_interim = candidate
+                if (self._stable_count >= self.min_stable_interims
+                        and confidence >= self.speculative_confidence
+                        and candidate != self._speculated):
+                    self._speculated = candidate
+                    speculation = candidate
+
+        if speculation:
+            self.on_speculate(speculation)
+        if turn_text:
+            self._fire(turn_text)
+
+    def on_utterance_end(self):
+        with self._lock:
+            text = self._take_turn()
+        self._fire(text)
+
+    def on_speech_started(self):
+        # The user may keep talking: hold off (restart) the silence timeout, but keep it armed
+        with self._lock:
+            if self._segments:
+                self._arm_timer(restart=True)
+
+    def close(self):
+        with self._lock:
+            self._cancel_timer()
@@ -0,0 +1,493 @@
+# src/STT/whisper_stream.py
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from src.Utils.concurrency import run_blocking
+from src.Utils.structured_log import log
+
+SAMPLE_RATE = 16000  # Whisper's native rate; the ingest layer resamples to it
+MAX_CONTEXT_TOKENS = 64  # previous-segment text fed back as the decoder prompt
+
+
+class WhisperEngine:
+    """
+    faster-whisper model (CTranslate2, int8 on CPU by default) loaded on first
+    use. transcribe_batch() runs several sessions' clips through one batched
+    encode + generate call instead of one transcribe() per clip.
+    """
+
+    def __init__(self, model_size="small", device="cpu", compute_type="int8", cpu_threads=0,
+                 language="en", beam_size=1, no_speech_threshold=0.6):
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.language = language
+        self.beam_size = beam_size
+        self.no_speech_threshold = no_speech_threshold
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def load(self):
+        with self._lock:
+            if self._model is not None:
+                return
+            from faster_whisper import WhisperModel
+            from faster_whisper.audio import pad_or_trim
+            from faster_whisper.tokenizer import Tokenizer
+            from faster_whisper.transcribe import get_suppressed_tokens
+
+            model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type,
+                                 cpu_threads=self.cpu_threads)
+            multilingual = model.model.is_multilingual
+            self._tokenizer = Tokenizer(model.hf_tokenizer, multilingual, task="transcribe",
+                                        language=self.language if multilingual else None)
+            self._suppress_tokens = get_suppressed_tokens(self._tokenizer, [-1])
+            self._pad_or_trim = pad_or_trim
+            self._model = model
+            print(f"✅ Whisper model loaded: {self.model_size} ({self.device}, {self.compute_type})")
+
+    def _prompt(self, context):
+        previous = self._tokenizer.encode(" " + context.strip())[-MAX_CONTEXT_TOKENS:] if context else []
+        return self._model.get_prompt(self._tokenizer, previous, without_timestamps=True)
+
+    def transcribe_batch(self, clips, contexts=None):
+        """
+        clips: float32 mono arrays at 16 kHz (each <= 30 s).
+        Returns one (text, confidence) per clip; confidence is exp(mean token logprob).
+        """
+        self.load()
+        model = self._model
+        contexts = contexts or [""] * len(clips)
+        features = np.stack([
+            self._pad_or_trim(model.feature_extractor(clip)[:, :model.feature_extractor.nb_max_frames])
+            for clip in clips
+        ])
+        encoder_output = model.encode(features)
+        prompts = [self._prompt(context) for context in contexts]
+        max_prompt = max(len(p) for p in prompts)
+        results = model.model.generate(
+            encoder_output,
+            prompts,
+            beam_size=self.beam_size,
+            max_length=min(model.max_length, max_prompt + 224),
+            suppress_blank=True,
+            suppress_tokens=self._suppress_tokens,
+            return_scores=True,
+            return_no_speech_prob=True,
+        )
+
+        output = []
+        for result in results:
+            if result.no_speech_prob > self.no_speech_threshold:
+                output.append(("", 0.0))
+                continue
+            tokens = [t for t in result.sequences_ids[0] if t < self._tokenizer.eot]
+            output.append((self._tokenizer.decode(tokens).strip(), math.exp(result.scores[0])))
+        return output
+
+
+class _Job:
+    __slots__ = ("client", "audio", "final", "speech_final", "seq", "context")
+
+    def __init__(self, client, audio, final, speech_final, seq, context):
+        self.client = client
+        self.audio = audio
+        self.final = final
+        self.speech_final = speech_final
+        self.seq = seq
+        self.context = context
+
+
+class WhisperStreamPool:
+    """
+    Shared, batched Whisper inference for every WhisperStreamClient in this
+    worker, and the claim()/start() front door main.py uses for DeepgramPool.
+
+    Sessions submit their current speech window; each of `workers` dispatcher
+    threads takes up to `max_batch` jobs (finals first) and runs them as one
+    batched call in the native thread pool, so the event loop keeps serving
+    sockets. A session has at most one queued interim: a newer window
+    replaces it, so slow inference costs interims, never a growing backlog.
+    """
+
+    def __init__(self, engine, workers=1, max_batch=8, batch_wait=0.01, client_options=None):
+        self.engine = engine
+        self.workers = workers
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.client_options = client_options or {}
+
+        self._finals = deque()
+        self._interims = OrderedDict()  # client -> latest interim job
+        self._cond = threading.Condition()
+        self._threads = []
+        self._closed = False
+        self.last_error = None
+        self.stats = {"sessions": 0, "batches": 0, "jobs": 0, "finals": 0, "interims_replaced": 0,
+                      "audio_seconds": 0.0, "inference_seconds": 0.0, "errors": 0}
+
+    # -------------------- lifecycle -------------------- #
+
+    def start(self):
+        """Load the model in the background and start the dispatchers."""
+        threading.Thread(target=self._load, daemon=True).start()
+        for _ in range(self.workers - len(self._threads)):
+            thread = threading.Thread(target=self._dispatch, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _load(self):
+        self.last_error = None
+        try:
+            run_blocking(self.engine.load)
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Whisper model load failed: {e}")
+
+    @property
+    def ready(self):
+        return self.engine.loaded
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def claim(self, on_transcript, on_speech_started=None, turn_detector=None):
+        """Hand out a session client bound to the caller's callbacks (same contract as DeepgramPool)."""
+        client = WhisperStreamClient(self, **self.client_options)
+        client.bind(on_transcript, on_speech_started=on_speech_started, turn_detector=turn_detector)
+        self.stats["sessions"] += 1
+        return client
+
+    # -------------------- batching -------------------- #
+
+    def submit(self, job):
+        with self._cond:
+            if job.final:
+                self._finals.append(job)
+                # A final supersedes any interim still waiting for the same audio
+                self._interims.pop(job.client, None)
+            else:
+                if self._interims.pop(job.client, None) is not None:
+                    self.stats["interims_replaced"] += 1
+                self._interims[job.client] = job
+            self._cond.notify()
+
+    def discard(self, client):
+        with self._cond:
+            self._interims.pop(client, None)
+            self._finals = deque(job for job in self._finals if job.client is not client)
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._finals and not self._interims and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+            if len(self._finals) + len(self._interims) < self.max_batch and self.batch_wait:
+                self._cond.wait(self.batch_wait)  # let concurrent sessions join the batch
+            batch = []
+            while self._finals and len(batch) < self.max_batch:
+                batch.append(self._finals.popleft())
+            while self._interims and len(batch) < self.max_batch:
+                batch.append(self._interims.popitem(last=False)[1])
+            return batch
+
+    def _dispatch(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            started = time.perf_counter()
+            try:
+                results = run_blocking(self.engine.transcribe_batch,
+                                       [job.audio for job in batch], [job.context for job in batch])
+            except Exception as e:
+                print(f"❌ Whisper inference error: {e}")
+                self.stats["errors"] += 1
+                results = [("", 0.0)] * len(batch)
+            elapsed = time.perf_counter() - started
+
+            self.stats["batches"] += 1
+            self.stats["jobs"] += len(batch)
+            self.stats["finals"] += sum(job.final for job in batch)
+            self.stats["audio_seconds"] += sum(len(job.audio) for job in batch) / SAMPLE_RATE
+            self.stats["inference_seconds"] += elapsed
+            log.event("whisper_batch", every=10.0, size=len(batch), ms=round(elapsed * 1000, 1))
+
+            for job, (text, confidence) in zip(batch, results):
+                try:
+                    job.client._on_result(job, text, confidence)
+                except Exception as e:
+                    print(f"❌ Whisper result delivery error: {e}")
+
+
+class WhisperStreamClient:
+    """
+    Local drop-in for DeepgramStreamClient: same send_audio()/on_transcript
+    (text, is_final)/on_speech_started/turn_detector contract, fed with 16 kHz
+    linear16 PCM from AudioIngest.
+
+    An energy VAD gates a rolling window of in-memory PCM. While speech is
+    active the window is re-transcribed every `interim_ms` (interim results).
+    Once the window is longer than `commit_after_ms`, the first short pause
+    commits everything before it as a final segment and the window restarts
+    there, so only the still-unstable tail is transcribed again. A pause of
+    `endpointing_ms` ends the segment with speech_final, and `utterance_end_ms`
+    of silence sends UtteranceEnd to the turn detector (after any finals still
+    being transcribed), mirroring Deepgram's event order.
+    """
+
+    def __init__(self, pool, on_transcript=None, on_speech_started=None, turn_detector=None,
+                 frame_ms=30, vad_threshold=500, noise_ratio=3.0, start_ms=90, pre_roll_ms=240,
+                 interim_ms=500, commit_after_ms=3000, gap_ms=150, max_window_ms=10000,
+                 endpointing_ms=300, utterance_end_ms=1000):
+        self.pool = pool
+        self.on_transcript = on_transcript
+        self.on_speech_started = on_speech_started
+        self.turn_detector = turn_detector
+
+        ms = SAMPLE_RATE // 1000
+        self.frame_ms = frame_ms
+        self.frame_samples = frame_ms * ms
+        self.vad_threshold = vad_threshold
+        self.noise_ratio = noise_ratio
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.pre_roll_frames = pre_roll_ms // frame_ms
+        self.interim_samples = interim_ms * ms
+        self.commit_after_samples = commit_after_ms * ms
+        self.gap_frames = max(1, gap_ms // frame_ms)
+        self.max_window_samples = max_window_ms * ms
+        self.endpointing_frames = max(1, endpointing_ms // frame_ms)
+        self.utterance_end_frames = max(1, utterance_end_ms // frame_ms)
+
+        self._lock = threading.Lock()
+        self._carry = bytearray()
+        self._pre_roll = deque(maxlen=max(self.pre_roll_frames, 1))
+        self._window = []  # int16 frames of the current segment
+        self._window_samples = 0
+        self._since_submit = 0
+        self._in_speech = False
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._utterance_open = False  # words heard since the last UtteranceEnd
+        self._noise = float(vad_threshold) / noise_ratio
+        self._closed = False
+
+        self._context = ""
+        self._seq = 0  # segment number; interims for older segments are ignored
+        self._next_final = 0
+        self._finals_ready = {}
+        self._finals_pending = 0
+        self._utterance_end_due = False
+        self.last_send = 0.0
+
+    def bind(self, on_transcript, on_speech_started=None, turn_detector=None):
+        self.on_transcript = on_transcript
+        self.on_speech_started = on_speech_started
+        self.turn_detector = turn_detector
+
+    @property
+    def is_open(self):
+        return not self._closed
+
+    @property
+    def is_alive(self):
+        return not self._closed
+
+    def connect(self):
+        """Nothing to open: inference runs on the shared pool."""
+
+    def send_keepalive(self):
+        """No idle timeout locally."""
+
+    # -------------------- audio path -------------------- #
+
+    def send_audio(self, chunk_bytes):
+        if self._closed:
+            return
+        events = []
+        with self._lock:
+            self._carry += chunk_bytes
+            frame_bytes = self.frame_samples * 2
+            usable = len(self._carry) - len(self._carry) % frame_bytes
+            if not usable:
+                return
+            pcm = np.frombuffer(bytes(self._carry[:usable]), dtype="<i2")
+            del self._carry[:usable]
+            for frame in pcm.reshape(-1, self.frame_samples):
+                self._process_frame(frame, events)
+        self._fire(events)
+
+    def _is_voiced(self, frame):
+        rms = math.sqrt(float(np.dot(frame.astype(np.float32), frame.astype(np.float32))) / len(frame))
+        voiced = rms > max(self.vad_threshold, self._noise * self.noise_ratio)
+        if not voiced:
+            self._noise = 0.95 * self._noise + 0.05 * rms  # track the background level
+        return voiced
+
+    def _process_frame(self, frame, events):
+        voiced = self._is_voiced(frame)
+        if not self._in_speech:
+            self._pre_roll.append(frame)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if voiced:
+                self._silent_run = 0
+            else:
+                self._silent_run += 1
+                if self._utterance_open and self._silent_run >= self.utterance_end_frames:
+                    self._utterance_open = False
+                    events.append(("utterance_end",))
+            if self._voiced_run >= self.start_frames:
+                self._in_speech = True
+                self._utterance_open = True
+                self._silent_run = 0
+                self._window = list(self._pre_roll)
+                self._window_samples = sum(len(f) for f in self._window)
+                self._since_submit = self._window_samples
+                self._pre_roll.clear()
+                events.append(("speech_started",))
+            return
+
+        self._window.append(frame)
+        self._window_samples += len(frame)
+        self._since_submit += len(frame)
+        self._silent_run = 0 if voiced else self._silent_run + 1
+
+        if self._silent_run >= self.endpointing_frames:
+            # End of segment: drop most of the trailing silence and finalize
+            keep = max(0, len(self._window) - self._silent_run + self.gap_frames)
+            self._commit(self._window[:keep], speech_final=True, events=events)
+            self._in_speech = False
+            self._voiced_run = 0
+            self._pre_roll.clear()
+            return
+        if self._window_samples >= self.commit_after_samples and self._silent_run >= self.gap_frames:
+            # Short pause inside a long segment: commit the stable head
+            self._commit(self._window, speech_final=False, events=events)
+            return
+        if self._window_samples >= self.max_window_samples:
+            # No pause at all: cut at the quietest frame of the last second
+            tail = min(len(self._window) - 1, 1000 // self.frame_ms)
+            energies = [float(np.abs(f).mean()) for f in self._window[-tail:]]
+            cut = len(self._window) - tail + int(np.argmin(energies)) + 1
+            head, rest = self._window[:cut], self._window[cut:]
+            self._commit(head, speech_final=False, events=events)
+            self._window = rest
+            self._window_samples = self._since_submit = sum(len(f) for f in rest)
+            return
+        if self._since_submit >= self.interim_samples:
+            self._since_submit = 0
+            self._submit(self._window, final=False)
+
+    def _commit(self, frames, speech_final, events):
+        self._finals_pending += 1
+        if frames:
+            self._submit(frames, final=True, speech_final=speech_final)
+        else:
+            # Nothing left to transcribe (the head was committed at a pause), but the
+            # turn detector still needs this segment's speech_final, in order
+            self._final_ready(self._seq, "", speech_final, 0.0, events)
+        self._seq += 1
+        self._window = []
+        self._window_samples = 0
+        self._since_submit = 0
+
+    def _submit(self, frames, final, speech_final=False):
+        audio = np.concatenate(frames).astype(np.float32) / 32768.0
+        self.pool.submit(_Job(self, audio, final, speech_final, self._seq, self._context))
+
+    # -------------------- results -------------------- #
+
+    def _on_result(self, job, text, confidence):
+        events = []
+        with self._lock:
+            if self._closed:
+                return
+            if not job.final:
+                if job.seq == self._seq and text:
+                    events.append(("result", text, False, False, confidence))
+            else:
+                self._final_ready(job.seq, text, job.speech_final, confidence, events)
+        self._fire(events)
+
+    def _final_ready(self, seq, text, speech_final, confidence, events):
+        """Deliver finals in segment order even if batches complete out of order (caller holds the lock)."""
+        self._finals_ready[seq] = (text, speech_final, confidence)
+        while self._next_final in self._finals_ready:
+            text, speech_final, confidence = self._finals_ready.pop(self._next_final)
+            self._next_final += 1
+            self._finals_pending -= 1
+            if text:
+                self._context = (self._context + " " + text)[-400:]
+            events.append(("result", text, True, speech_final, confidence))
+        if self._finals_pending == 0 and self._utterance_end_due:
+            self._utterance_end_due = False
+            events.append(("utterance_end_now",))
+
+    def _fire(self, events):
+        for event in events:
+            kind = event[0]
+            if kind == "speech_started":
+                log.event("speech_started", every=1.0)
+                if self.turn_detector:
+                    self.turn_detector.on_speech_started()
+                if self.on_speech_started:
+                    self.on_speech_started()
+            elif kind == "result":
+                _, text, is_final, speech_final, confidence = event
+                if text.strip() and self.on_transcript:
+                    self.on_transcript(text, is_final)
+                if self.turn_detector:
+                    self.turn_detector.on_result(text, is_final, speech_final=speech_final, confidence=confidence)
+            elif kind == "utterance_end":
+                with self._lock:
+                    if self._finals_pending:
+                        self._utterance_end_due = True  # wait for the last final
+                        continue
+                if self.turn_detector:
+                    self.turn_detector.on_utterance_end()
+            elif kind == "utterance_end_now":
+                if self.turn_detector:
+                    self.turn_detector.on_utterance_end()
+
+    def close(self):
+        self._closed = True
+        self.pool.discard(self)
+        if self.turn_detector:
+            self.turn_detector.close()
+
+
+def create_whisper_pool_from_env():
+    """Shared Whisper pool configured by WHISPER_* env vars (STT_BACKEND=whisper)."""
+    engine = WhisperEngine(
+        model_size=os.environ.get("WHISPER_MODEL", "small"),
+        device=os.environ.get("WHISPER_DEVICE", "cpu"),
+        compute_type=os.environ.get("WHISPER_COMPUTE_TYPE", "int8"),
+        cpu_threads=int(os.environ.get("WHISPER_CPU_THREADS", "0")),
+        language=os.environ.get("WHISPER_LANGUAGE", "en"),
+    )
+    return WhisperStreamPool(
+        engine,
+        workers=int(os.environ.get("WHISPER_WORKERS", "1")),
+        max_batch=int(os.environ.get("WHISPER_MAX_BATCH", "8")),
+        batch_wait=float(os.environ.get("WHISPER_BATCH_WAIT_MS", "10")) / 1000,
+        client_options={
+            "vad_threshold": int(os.environ.get("WHISPER_VAD_THRESHOLD", "500")),
+            "interim_ms": int(os.environ.get("WHISPER_INTERIM_MS", "500")),
+            "endpointing_ms": int(os.environ.get("WHISPER_ENDPOINTING_MS", "300")),
+            "utterance_end_ms": int(os.environ.get("WHISPER_UTTERANCE_END_MS", "1000")),
+        },
+    )
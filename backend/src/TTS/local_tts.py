@@ -0,0 +1,346 @@
+# src/TTS/local_tts.py
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from xml.sax.saxutils import unescape
+
+import numpy as np
+
+from src.Pipeline.turns import CancelToken
+from src.TTS.synthesizer_pool import DEFAULT_FRAME_BYTES, SynthesisError, _fixed_frames
+from src.Utils.audio_decoder import Resampler
+from src.Utils.concurrency import run_blocking
+from src.Utils.structured_log import log
+
+OUTPUT_RATE = 16000  # what the frontend plays: 16 kHz / 32 kbps mono MP3, same as Azure's output
+OUTPUT_BITRATE = 32
+_TAG = re.compile(r"<[^>]+>")
+
+
+def ssml_text(ssml):
+    """The spoken text inside build_ssml()'s markup."""
+    return unescape(_TAG.sub("", ssml)).strip()
+
+
+class PiperEngine:
+    """
+    Piper (VITS) voice on onnxruntime, loaded on first use. phonemize() turns
+    text into one phoneme-id sequence per sentence; synthesize_batch() runs
+    several sequences, from any number of sessions, through one padded
+    batched inference call.
+    """
+
+    def __init__(self, model_path, cpu_threads=0, length_scale=None, noise_scale=None, noise_w_scale=None,
+                 speaker_id=None):
+        self.model_path = model_path
+        self.cpu_threads = cpu_threads
+        self.length_scale = length_scale
+        self.noise_scale = noise_scale
+        self.noise_w_scale = noise_w_scale
+        self.speaker_id = speaker_id
+        self.sample_rate = None
+        self._voice = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._voice is not None
+
+    def load(self):
+        with self._lock:
+            if self._voice is not None:
+                return
+            if not self.model_path:
+                raise SynthesisError("LOCAL_TTS_MODEL is not set")
+            import onnxruntime
+            from piper import PiperVoice
+            from piper.config import PiperConfig
+
+            with open(f"{self.model_path}.json", encoding="utf-8") as f:
+                config = PiperConfig.from_dict(json.load(f))
+            options = onnxruntime.SessionOptions()
+            if self.cpu_threads:
+                options.intra_op_num_threads = self.cpu_threads
+            session = onnxruntime.InferenceSession(str(self.model_path), sess_options=options,
+                                                   providers=["CPUExecutionProvider"])
+            self._config = config
+            self._pad_id = config.phoneme_id_map.get("_", [0])[0]
+            self._has_durations = len(session.get_outputs()) > 1
+            self.sample_rate = config.sample_rate
+            self._voice = PiperVoice(config=config, session=session)
+            print(f"✅ Piper voice loaded: {os.path.basename(self.model_path)} ({self.sample_rate} Hz)")
+
+    def phonemize(self, text):
+        self.load()
+        return [self._voice.phonemes_to_ids(phonemes) for phonemes in self._voice.phonemize(text) if phonemes]
+
+    def synthesize_batch(self, id_lists):
+        """Float32 mono audio at `sample_rate` for each phoneme-id sequence, peak-normalized like Piper's own."""
+        self.load()
+        config = self._config
+        lengths = np.array([len(ids) for ids in id_lists], dtype=np.int64)
+        batch = np.full((len(id_lists), lengths.max()), self._pad_id, dtype=np.int64)
+        for row, ids in enumerate(id_lists):
+            batch[row, :len(ids)] = ids
+        scales = np.array([
+            config.noise_scale if self.noise_scale is None else self.noise_scale,
+            config.length_scale if self.length_scale is None else self.length_scale,
+            config.noise_w_scale if self.noise_w_scale is None else self.noise_w_scale,
+        ], dtype=np.float32)
+        args = {"input": batch, "input_lengths": lengths, "scales": scales}
+        if config.num_speakers > 1:
+            speaker = config.default_speaker_id if self.speaker_id is None else self.speaker_id
+            args["sid"] = np.full(len(id_lists), speaker, dtype=np.int64)
+
+        result = self._voice.session.run(None, args)
+        audio = result[0].reshape(len(id_lists), -1)
+        clips = []
+        for row, length in enumerate(lengths):
+            clip = audio[row]
+            if self._has_durations:
+                # Models patched with alignments report frames per phoneme: the exact clip length
+                clip = clip[:int(result[1].reshape(len(id_lists), -1)[row, :length].sum() * config.hop_length)]
+            else:
+                # Shorter clips are padded with near-silence up to the longest one in the batch
+                loud = np.flatnonzero(np.abs(clip) > 1e-3 * max(float(np.abs(clip).max()), 1e-8))
+                clip = clip[:loud[-1] + 1] if len(loud) else clip[:0]
+            peak = float(np.abs(clip).max()) if len(clip) else 0.0
+            clips.append(np.clip(clip / peak, -1.0, 1.0).astype(np.float32) if peak > 1e-8 else clip.astype(np.float32))
+        return clips
+
+
+class _Phrase:
+    __slots__ = ("ids", "audio", "error", "done", "cancelled")
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.audio = None
+        self.error = None
+        self.done = threading.Event()
+        self.cancelled = False
+
+
+class LocalTTSPool:
+    """
+    Shared, batched local TTS for every session in this worker.
+
+    stream() phonemizes a phrase, queues each sentence as a job, and yields
+    MP3 frames (the same 16 kHz / 32 kbps mono format Azure produces) as
+    sentences finish, so playback starts after the first one. `workers`
+    dispatcher threads each take up to `max_batch` queued sentences (opening
+    sentences of streams ahead of, and apart from, the rest) and run them as
+    one batched inference call in the native thread pool, so concurrent
+    sessions share the model instead of queueing behind each other.
+    """
+
+    def __init__(self, engine, workers=1, max_batch=8, batch_wait=0.01):
+        self.engine = engine
+        self.workers = workers
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+
+        self._first = deque()  # opening sentence of each stream: decides its time to first audio
+        self._rest = deque()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._loader = None
+        self._closed = False
+        self.last_error = None
+        self.stats = {"streams": 0, "batches": 0, "jobs": 0, "audio_seconds": 0.0, "inference_seconds": 0.0,
+                      "errors": 0}
+
+    # -------------------- lifecycle -------------------- #
+
+    def start(self):
+        """Load the voice in the background and start the dispatchers."""
+        if self._loader is None or (self.last_error and not self._loader.is_alive()):
+            self._loader = threading.Thread(target=self._load, daemon=True)
+            self._loader.start()
+        for _ in range(self.workers - len(self._threads)):
+            thread = threading.Thread(target=self._dispatch, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _load(self):
+        self.last_error = None
+        try:
+            run_blocking(self.engine.load)
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Local TTS voice load failed: {e}")
+
+    @property
+    def ready(self):
+        return self.engine.loaded
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # -------------------- batching -------------------- #
+
+    def _submit(self, phrases):
+        with self._cond:
+            self._first.append(phrases[0])
+            self._rest.extend(phrases[1:])
+            self._cond.notify()
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._first and not self._rest and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+            if len(self._first) + len(self._rest) < self.max_batch and self.batch_wait:
+                self._cond.wait(self.batch_wait)  # let concurrent sessions join the batch
+            # Opening sentences are batched on their own: a long follow-up sentence in
+            # the same call would hold back every stream's first audio
+            queue = self._first if self._first else self._rest
+            batch = []
+            while queue and len(batch) < self.max_batch:
+                phrase = queue.popleft()
+                if not phrase.cancelled:
+                    batch.append(phrase)
+            return batch
+
+    def _dispatch(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            if not batch:
+                continue
+            started = time.perf_counter()
+            try:
+                clips = run_blocking(self.engine.synthesize_batch, [phrase.ids for phrase in batch])
+            except Exception as e:
+                print(f"❌ Local TTS inference error: {e}")
+                self.stats["errors"] += 1
+                for phrase in batch:
+                    phrase.error = SynthesisError(f"local TTS failed: {e}")
+                    phrase.done.set()
+                continue
+            elapsed = time.perf_counter() - started
+
+            self.stats["batches"] += 1
+            self.stats["jobs"] += len(batch)
+            self.stats["audio_seconds"] += sum(len(clip) for clip in clips) / self.engine.sample_rate
+            self.stats["inference_seconds"] += elapsed
+            log.event("local_tts_batch", every=10.0, size=len(batch), ms=round(elapsed * 1000, 1))
+
+            for phrase, clip in zip(batch, clips):
+                phrase.audio = clip
+                phrase.done.set()
+
+    # -------------------- streaming -------------------- #
+
+    def stream_pcm(self, text, cancel=None):
+        """Yield 16 kHz mono int16 PCM, one chunk per sentence, as each is synthesized."""
+        id_lists = run_blocking(self.engine.phonemize, text)
+        if not id_lists:
+            return
+        phrases = [_Phrase(ids) for ids in id_lists]
+        self.stats["streams"] += 1
+        self._submit(phrases)
+        resampler = Resampler(self.engine.sample_rate, OUTPUT_RATE)
+        try:
+            for phrase in phrases:
+                while not phrase.done.wait(0.02):
+                    if cancel is not None and cancel.cancelled:
+                        return
+                if phrase.error is not None:
+                    raise phrase.error
+                yield _to_int16(resampler.process(phrase.audio))
+            yield _to_int16(resampler.flush())
+        finally:
+            for phrase in phrases:
+                phrase.cancelled = True  # skipped by the dispatcher if still queued
+
+    def stream(self, text, frame_bytes=DEFAULT_FRAME_BYTES, cancel=None):
+        """Yield MP3 frames of `frame_bytes` for `text` (the stream_tts_audio contract)."""
+        import lameenc
+
+        encoder = lameenc.Encoder()
+        encoder.set_bit_rate(OUTPUT_BITRATE)
+        encoder.set_in_sample_rate(OUTPUT_RATE)
+        encoder.set_channels(1)
+        encoder.set_quality(7)  # fast; at 32 kbps the higher settings are inaudible
+
+        def mp3_chunks():
+            for pcm in self.stream_pcm(text, cancel):
+                yield encoder.encode(pcm)
+            if not (cancel is not None and cancel.cancelled):
+                yield encoder.flush()
+
+        yield from _fixed_frames(mp3_chunks(), frame_bytes)
+
+
+def _to_int16(samples):
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+class LocalSynthesizer:
+    """
+    SynthesizerPool member backed by the shared LocalTTSPool, so
+    TTS_BACKEND=local runs the whole pipeline (cache, pool, stream_tts_audio)
+    without a remote service.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._cancel = None
+
+    def warm_up(self):
+        self.pool.start()
+        run_blocking(self.pool.engine.load)
+
+    def is_healthy(self):
+        return self.pool.ready
+
+    def speak(self, ssml):
+        return b"".join(self.stream(ssml))
+
+    def stream(self, ssml, frame_bytes=DEFAULT_FRAME_BYTES):
+        self._cancel = CancelToken()
+        yield from self.pool.stream(ssml_text(ssml), frame_bytes, self._cancel)
+
+    def stop(self):
+        if self._cancel is not None:
+            self._cancel.cancel("stopped")
+
+    def close(self):
+        pass
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_local_tts_pool():
+    """Return the per-worker local TTS pool, creating (and starting) it on first use."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = create_local_tts_from_env().start()
+    return _default_pool
+
+
+def create_local_tts_from_env():
+    """Local TTS configured by LOCAL_TTS_* (LOCAL_TTS_MODEL: path to a Piper .onnx voice with its .json)."""
+    length_scale = os.environ.get("LOCAL_TTS_LENGTH_SCALE")
+    engine = PiperEngine(
+        os.environ.get("LOCAL_TTS_MODEL", ""),
+        cpu_threads=int(os.environ.get("LOCAL_TTS_CPU_THREADS", "0")),
+        length_scale=float(length_scale) if length_scale else None,
+    )
+    return LocalTTSPool(
+        engine,
+        workers=int(os.environ.get("LOCAL_TTS_WORKERS", "1")),
+        max_batch=int(os.environ.get("LOCAL_TTS_MAX_BATCH", "8")),
+        batch_wait=float(os.environ.get("LOCAL_TTS_BATCH_WAIT_MS", "10")) / 1000,
+    )
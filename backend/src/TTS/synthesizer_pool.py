@@ -0,0 +1,363 @@
+# src/TTS/synthesizer_pool.py
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from src.Utils.concurrency import run_blocking
+
+
+# 16 kHz / 32 kbps MPEG-2 Layer III frames are 144 bytes; six of them ≈ 216 ms of audio.
+DEFAULT_FRAME_BYTES = 864
+
+
+class SynthesisError(Exception):
+    """Raised when a synthesizer fails to produce audio."""
+
+
+def _fixed_frames(chunks, frame_bytes):
+    """Re-slice an iterable of byte chunks into frames of exactly `frame_bytes` (last may be short)."""
+    pending = bytearray()
+    for chunk in chunks:
+        pending += chunk
+        while len(pending) >= frame_bytes:
+            yield bytes(pending[:frame_bytes])
+            del pending[:frame_bytes]
+    if pending:
+        yield bytes(pending)
+
+
+class AzureSynthesizer:
+    """
+    Long-lived Azure SpeechSynthesizer with a pre-opened service connection.
+    Building SpeechConfig/SpeechSynthesizer and opening the connection is the
+    expensive part, so it happens once here instead of once per sentence.
+    """
+
+    def __init__(self, speech_key, speech_region, output_format=None):
+        import azure.cognitiveservices.speech as speechsdk
+
+        self._sdk = speechsdk
+        speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=speech_region)
+        speech_config.set_speech_synthesis_output_format(
+            output_format or speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3
+        )
+        self.synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+        self.connection = speechsdk.Connection.from_speech_synthesizer(self.synthesizer)
+        self.connection.connected.connect(lambda evt: self._set_connected(True))
+        self.connection.disconnected.connect(lambda evt: self._set_connected(False))
+        self._connected = False
+        self._broken = False
+
+    def _set_connected(self, value):
+        self._connected = value
+
+    def warm_up(self):
+        """Open the service connection ahead of the first request."""
+        run_blocking(self.connection.open, True)
+
+    def is_healthy(self):
+        if self._broken:
+            return False
+        if not self._connected:
+            # Azure drops idle connections after a while; reopen instead of evicting.
+            try:
+                run_blocking(self.connection.open, True)
+            except Exception:
+                return False
+        return True
+
+    def _raise_canceled(self, cancellation_details):
+        error_msg = f"TTS canceled: {cancellation_details.reason}"
+        if cancellation_details.reason == self._sdk.CancellationReason.Error:
+            error_msg += f" - {cancellation_details.error_details}"
+            self._broken = True
+        raise SynthesisError(error_msg)
+
+    def speak(self, ssml):
+        """Synthesize SSML and return the complete audio data."""
+        speechsdk = self._sdk
+        result = run_blocking(lambda: self.synthesizer.speak_ssml_async(ssml).get())
+
+        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+            return result.audio_data
+        if result.reason == speechsdk.ResultReason.Canceled:
+            self._raise_canceled(result.cancellation_details)
+        raise SynthesisError(f"TTS failed: {result.reason}")
+
+    def _read_stream(self, audio_stream, read_bytes):
+        buffer = bytes(read_bytes)
+        while True:
+            filled = run_blocking(audio_stream.read_data, buffer)
+            if filled == 0:
+                return
+            yield buffer[:filled]
+
+    def stream(self, ssml, frame_bytes=DEFAULT_FRAME_BYTES):
+        """
+        Synthesize SSML and yield fixed-size audio frames as soon as the service
+        produces them, using start_speaking + a pull AudioDataStream.
+        """
+        speechsdk = self._sdk
+        result = run_blocking(lambda: self.synthesizer.start_speaking_ssml_async(ssml).get())
+        if result.reason == speechsdk.ResultReason.Canceled:
+            self._raise_canceled(result.cancellation_details)
+
+        audio_stream = speechsdk.AudioDataStream(result)
+        finished = False
+        try:
+            yield from _fixed_frames(self._read_stream(audio_stream, frame_bytes), frame_bytes)
+            finished = True
+        finally:
+            if not finished:
+                # Consumer stopped early: free the synthesizer for the next borrower.
+                run_blocking(lambda: self.synthesizer.stop_speaking_async().get())
+
+        if audio_stream.status == speechsdk.StreamStatus.Canceled:
+            details = audio_stream.cancellation_details
+            if details.reason != speechsdk.CancellationReason.CancelledByUser:  # stop() is not an error
+                self._raise_canceled(details)
+
+    def stop(self):
+        """Interrupt an in-flight stream() from another thread (barge-in)."""
+        self.synthesizer.stop_speaking_async()
+
+    def close(self):
+        try:
+            self.connection.close()
+        except Exception as e:
+            print(f"⚠️ Error closing Azure synthesizer connection: {e}")
+
+
+class FakeSynthesizer:
+    """
+    Offline stand-in for AzureSynthesizer with configurable latencies, used to
+    benchmark the pool (and the rest of the pipeline) without the service.
+    """
+
+    def __init__(self, setup_delay=0.15, connect_delay=0.1, first_byte_delay=0.08,
+                 bytes_per_char=60, bytes_per_second=16000, fail_rate=0.0):
+        time.sleep(setup_delay)
+        self.connect_delay = connect_delay
+        self.first_byte_delay = first_byte_delay
+        self.bytes_per_char = bytes_per_char
+        self.bytes_per_second = bytes_per_second
+        self.fail_rate = fail_rate
+        self._stopped = False
+        self._connected = False
+        self._broken = False
+
+    def warm_up(self):
+        if not self._connected:
+            time.sleep(self.connect_delay)
+            self._connected = True
+
+    def is_healthy(self):
+        return not self._broken
+
+    def speak(self, ssml):
+        self.warm_up()
+        if random.random() < self.fail_rate:
+            self._broken = True
+            raise SynthesisError("TTS canceled: fake synthesizer failure")
+        time.sleep(self.first_byte_delay)
+        return b"\x00" * (len(ssml) * self.bytes_per_char)
+
+    def stop(self):
+        self._stopped = True
+
+    def _paced_chunks(self, total, chunk_bytes=320):
+        sent = 0
+        while sent < total and not self._stopped:
+            size = min(chunk_bytes, total - sent)
+            time.sleep(size / self.bytes_per_second)
+            sent += size
+            yield b"\x00" * size
+
+    def stream(self, ssml, frame_bytes=DEFAULT_FRAME_BYTES):
+        self.warm_up()
+        if random.random() < self.fail_rate:
+            self._broken = True
+            raise SynthesisError("TTS canceled: fake synthesizer failure")
+        self._stopped = False
+        time.sleep(self.first_byte_delay)
+        total = len(ssml) * self.bytes_per_char
+        yield from _fixed_frames(self._paced_chunks(total), frame_bytes)
+
+    def close(self):
+        self._connected = False
+
+
+class SynthesizerPool:
+    """
+    Pool of pre-connected synthesizers, one per worker process.
+
+    borrow() hands out an idle synthesizer (creating one if the pool is below
+    max_size), health checks run on idle instances in the background, and any
+    synthesizer that fails while borrowed is evicted and replaced.
+    """
+
+    def __init__(self, factory, size=2, max_size=8, borrow_timeout=5.0, health_interval=30.0):
+        self.factory = factory
+        self.size = size
+        self.max_size = max(max_size, size)
+        self.borrow_timeout = borrow_timeout
+        self.health_interval = health_interval
+
+        self._idle = queue.LifoQueue()  # LIFO keeps the most recently used (warmest) connections busy
+        self._lock = threading.Lock()
+        self._total = 0
+        self._closed = False
+        self._health_thread = None
+        self.last_error = None
+        self.stats = {"created": 0, "borrowed": 0, "evicted": 0, "waited": 0}
+
+    # -------------------- lifecycle -------------------- #
+
+    def _create(self):
+        synth = self.factory()
+        synth.warm_up()
+        with self._lock:
+            self.stats["created"] += 1
+        return synth
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._total >= self.max_size:
+                return False
+            self._total += 1
+            return True
+
+    def _release_slot(self):
+        with self._lock:
+            self._total -= 1
+
+    def _add_new(self):
+        if not self._reserve_slot():
+            return
+        try:
+            self._idle.put(self._create())
+        except Exception as e:
+            self._release_slot()
+            self.last_error = str(e)
+            print(f"❌ Failed to create synthesizer: {e}")
+
+    def warm_up(self):
+        """Create and connect `size` synthesizers in parallel."""
+        missing = self.size - self._total
+        threads = [threading.Thread(target=self._add_new, daemon=True) for _ in range(max(missing, 0))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        print(f"🔥 TTS pool warm: {self._idle.qsize()} synthesizer(s) ready")
+
+        if self.health_interval and self._health_thread is None:
+            self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+            self._health_thread.start()
+
+    @property
+    def ready(self):
+        """At least one synthesizer is connected (idle or in use)."""
+        return self._total > 0
+
+    def _evict(self, synth):
+        with self._lock:
+            self.stats["evicted"] += 1
+        self._release_slot()
+        try:
+            synth.close()
+        except Exception:
+            pass
+        if not self._closed and self._total < self.size:
+            threading.Thread(target=self._add_new, daemon=True).start()
+
+    def _health_loop(self):
+        while not self._closed:
+            time.sleep(self.health_interval)
+            for _ in range(self._idle.qsize()):
+                try:
+                    synth = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                if synth.is_healthy():
+                    self._idle.put(synth)
+                else:
+                    print("⚠️ Evicting unhealthy synthesizer")
+                    self._evict(synth)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                synth = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            synth.close()
+
+    # -------------------- borrowing -------------------- #
+
+    @contextmanager
+    def borrow(self):
+        """Borrow a synthesizer; it is returned (or evicted on error) on exit."""
+        synth = None
+        try:
+            synth = self._idle.get_nowait()
+        except queue.Empty:
+            if self._reserve_slot():
+                try:
+                    synth = self._create()
+                except Exception:
+                    self._release_slot()
+                    raise
+            else:
+                with self._lock:
+                    self.stats["waited"] += 1
+                try:
+                    synth = self._idle.get(timeout=self.borrow_timeout)
+                except queue.Empty:
+                    raise SynthesisError("No synthesizer available in pool")
+
+        with self._lock:
+            self.stats["borrowed"] += 1
+        try:
+            yield synth
+        finally:
+            # Also runs on GeneratorExit, when a consumer abandons a stream mid-phrase
+            if synth.is_healthy():
+                self._idle.put(synth)
+            else:
+                self._evict(synth)
+
+
+def create_pool_from_env(speech_key=None, speech_region=None):
+    """
+    Build the synthesizer pool selected by TTS_BACKEND: azure, local (Piper on
+    this machine, see local_tts.py) or fake (FAKE_TTS_* set its latencies).
+    """
+    backend = os.environ.get("TTS_BACKEND", "azure").lower()
+    size = int(os.environ.get("TTS_POOL_SIZE", "2"))
+    max_size = int(os.environ.get("TTS_POOL_MAX", "8"))
+
+    if backend == "fake":
+        # Latencies are tunable so replay benchmarks can mimic the measured Azure profile
+        def factory():
+            return FakeSynthesizer(
+                first_byte_delay=float(os.environ.get("FAKE_TTS_FIRST_BYTE_MS", "80")) / 1000,
+                bytes_per_second=int(os.environ.get("FAKE_TTS_BYTES_PER_SECOND", "16000")),
+            )
+    elif backend == "local":
+        def factory():
+            from src.TTS.local_tts import LocalSynthesizer, get_local_tts_pool
+            return LocalSynthesizer(get_local_tts_pool())
+    else:
+        def factory():
+            key = speech_key or os.environ.get("AZURE_SPEECH_KEY")
+            region = speech_region or os.environ.get("AZURE_SPEECH_REGION")
+            if not key or not region:
+                raise SynthesisError("AZURE_SPEECH_KEY / AZURE_SPEECH_REGION are not set")
+            return AzureSynthesizer(key, region)
+
+    return SynthesizerPool(factory, size=size, max_size=max_size)
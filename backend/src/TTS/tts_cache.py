@@ -0,0 +1,199 @@
+# src/TTS/tts_cache.py
+import hashlib
+import mmap
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """Whitespace/unicode-insensitive form of a phrase, so trivially different LLM output still hits."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TTSCache:
+    """
+    Content-addressed cache of synthesized audio, keyed by normalized text +
+    voice + style + rate + output format.
+
+    Tier 1 is an in-memory LRU bounded by `max_bytes`. Entries evicted from it
+    spill to an optional on-disk tier under `disk_dir` (bounded by
+    `disk_max_bytes`, least recently used files removed first) that is read
+    back through mmap; a disk hit is promoted back to memory. Only phrases up
+    to `max_text_chars` (well below the segmenter's sentence cap) are stored
+    on their own: one-off LLM sentences would only churn the LRU. Longer
+    known prompts are stored when the caller pins them (prewarming does),
+    and every phrase is looked up.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, disk_dir=None, disk_max_bytes=512 * 1024 * 1024,
+                 max_text_chars=80):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.max_text_chars = max_text_chars
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "spills": 0, "skipped": 0,
+                      "promoted": 0}
+
+        # Disk tier size is tracked as files are written, not by walking the tree on every spill
+        self._disk_files = OrderedDict()  # path -> size, least recently used first
+        self._disk_bytes = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._index_disk()
+
+    # -------------------- keys -------------------- #
+
+    @staticmethod
+    def key(text, voice, style, rate, output_format):
+        raw = "\x1f".join([normalize_text(text), voice, style, rate, output_format])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def cacheable(self, text):
+        if len(text) <= self.max_text_chars:
+            return True
+        with self._lock:
+            self.stats["skipped"] += 1
+        return False
+
+    # -------------------- disk tier -------------------- #
+
+    def _index_disk(self):
+        """Load the existing disk tier (left by an earlier run) into the size index, oldest first."""
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith(".audio"):
+                    path = os.path.join(root, name)
+                    st = os.stat(path)
+                    entries.append((st.st_mtime, st.st_size, path))
+        for _, size, path in sorted(entries):
+            self._disk_files[path] = size
+            self._disk_bytes += size
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.audio")
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"⚠️ TTS cache read error: {e}")
+            return None
+
+    def _write_disk(self, key, audio):
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ TTS cache write error: {e}")
+            return
+        with self._lock:
+            self._disk_files[path] = len(audio)
+            self._disk_bytes += len(audio)
+            doomed = []
+            while self._disk_bytes > self.disk_max_bytes and len(self._disk_files) > 1:
+                old_path, size = self._disk_files.popitem(last=False)
+                self._disk_bytes -= size
+                doomed.append(old_path)
+        for old_path in doomed:
+            try:
+                os.unlink(old_path)
+            except FileNotFoundError:
+                pass
+
+    # -------------------- public API -------------------- #
+
+    def get(self, key):
+        """Return cached audio (bytes, or a read-only mmap for disk hits too large for memory) or None."""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return audio
+
+        if self.disk_dir:
+            audio = self._read_disk(key)
+            if audio is not None:
+                path = self._disk_path(key)
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                    if path in self._disk_files:
+                        self._disk_files.move_to_end(path)
+                if len(audio) <= self.max_bytes:
+                    data = audio[:]
+                    audio.close()
+                    self._store_memory(key, data)
+                    with self._lock:
+                        self.stats["promoted"] += 1
+                    return data
+                return audio
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key, audio):
+        if len(audio) > self.max_bytes:
+            if self.disk_dir:
+                self._write_disk(key, audio)
+                with self._lock:
+                    self.stats["stores"] += 1
+            return
+        if self._store_memory(key, audio):
+            with self._lock:
+                self.stats["stores"] += 1
+
+    def _store_memory(self, key, audio):
+        spilled = []
+        with self._lock:
+            if key in self._memory:
+                return False
+            self._memory[key] = audio
+            self._memory_bytes += len(audio)
+            while self._memory_bytes > self.max_bytes:
+                old_key, old_audio = self._memory.popitem(last=False)
+                self._memory_bytes -= len(old_audio)
+                spilled.append((old_key, old_audio))
+
+        if self.disk_dir:
+            for old_key, old_audio in spilled:
+                self._write_disk(old_key, old_audio)
+                with self._lock:
+                    self.stats["spills"] += 1
+        return True
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return dict(self.stats, entries=len(self._memory), memory_bytes=self._memory_bytes,
+                        disk_bytes=self._disk_bytes, hit_rate=hits / lookups if lookups else 0.0)
+
+
+def create_cache_from_env():
+    """Build the TTS cache from TTS_CACHE_MB / TTS_CACHE_DIR / TTS_CACHE_DISK_MB / TTS_CACHE_MAX_CHARS."""
+    return TTSCache(
+        max_bytes=int(float(os.environ.get("TTS_CACHE_MB", "32")) * 1024 * 1024),
+        disk_dir=os.environ.get("TTS_CACHE_DIR") or None,
+        disk_max_bytes=int(float(os.environ.get("TTS_CACHE_DISK_MB", "512")) * 1024 * 1024),
+        max_text_chars=int(os.environ.get("TTS_CACHE_MAX_CHARS", "80")),
+    )
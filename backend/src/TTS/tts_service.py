@@ -1,19 +1,17 @@
-import pyttsx3
 import tempfile
 from flask import send_file
 import os
 
-# Initialize pyttsx3 engine
-tts_engine = pyttsx3.init()
-tts_engine.setProperty('rate', 150)  # speech speed
+from src.TTS.local_tts import get_local_tts_pool
+
 
 def text_to_speech(text: str) -> str:
     """
-    Convert text to speech and return temp audio file path.
+    Convert text to speech with the local (Piper) voice and return temp audio file path.
     """
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-    tts_engine.save_to_file(text, temp_file.name)
-    tts_engine.runAndWait()
+    audio = b"".join(get_local_tts_pool().stream(text))
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
+        temp_file.write(audio)
     return temp_file.name
 
 def send_audio_file(file_path):
@@ -0,0 +1,332 @@
+# src/Utils/audio_decoder.py
+import io
+import os
+import shutil
+import subprocess
+import threading
+import time
+from math import gcd
+
+import numpy as np
+
+from src.Utils.concurrency import native_module
+
+try:
+    import av  # PyAV: in-process libavformat/libavcodec, no subprocess or temp files
+except ImportError:
+    av = None
+
+TARGET_RATE = 16000
+
+
+class AudioDecodeError(Exception):
+    """Raised when a blob cannot be decoded by any available backend."""
+
+
+def available_backend():
+    """"pyav" when PyAV is installed, else "ffmpeg" if the binary is on PATH, else None."""
+    if av is not None:
+        return "pyav"
+    if shutil.which("ffmpeg"):
+        return "ffmpeg"
+    return None
+
+
+class Resampler:
+    """
+    Streaming band-limited resampler for any rational rate ratio.
+
+    Each output sample is a windowed-sinc interpolation of `2 * half_taps`
+    input samples; the weights for every fractional phase are precomputed, so
+    process() is a few vectorized matrix-vector products per call. Input history
+    is carried between calls, so chunked and one-shot resampling give the
+    same samples. flush() drains the tail once the stream has ended.
+    """
+
+    def __init__(self, input_rate, output_rate, half_taps=16):
+        common = gcd(input_rate, output_rate)
+        self.up = output_rate // common
+        self.down = input_rate // common
+        self.half_taps = half_taps
+        self.passthrough = self.up == self.down
+
+        # Cut off at 90% of the lower Nyquist (relative to the input rate)
+        cutoff = 0.9 * min(1.0, self.up / self.down)
+        offsets = np.arange(-half_taps + 1, half_taps + 1)
+        phases = np.arange(self.up)[:, None] / self.up
+        t = offsets[None, :] - phases
+        window = np.cos(np.pi * t / (2 * half_taps)) ** 2  # Hann, zero at +-half_taps
+        table = cutoff * np.sinc(cutoff * t) * window
+        self._table = (table / table.sum(axis=1, keepdims=True)).astype(np.float32)
+        self._offsets = offsets
+
+        self._buffer = np.zeros(half_taps, dtype=np.float32)  # left context is silence
+        self._base = -half_taps  # absolute input index of _buffer[0]
+        self._next = 0  # next absolute output index
+
+    def process(self, samples):
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.passthrough:
+            return samples
+        self._buffer = np.concatenate((self._buffer, samples))
+        end = self._base + len(self._buffer)
+        # Output n needs input up to floor(n * down / up) + half_taps
+        stop = ((end - self.half_taps) * self.up - 1) // self.down + 1
+        if stop <= self._next:
+            return np.zeros(0, dtype=np.float32)
+
+        # Outputs n and n + up share a phase and sit exactly `down` inputs apart, so each
+        # phase is one strided window view times its tap row (a BLAS matvec, no gather copy)
+        windows = np.lib.stride_tricks.sliding_window_view(self._buffer, len(self._offsets))
+        out = np.empty(stop - self._next, dtype=np.float32)
+        for r in range(min(self.up, len(out))):
+            n0 = self._next + r
+            first = (n0 * self.down) // self.up - self._base - self.half_taps + 1
+            count = len(range(r, len(out), self.up))
+            rows = windows[first:first + (count - 1) * self.down + 1:self.down]
+            out[r::self.up] = rows @ self._table[(n0 * self.down) % self.up]
+        self._next = stop
+
+        # Keep only the history the next output still needs
+        keep_from = (self._next * self.down) // self.up - self.half_taps + 1 - self._base
+        if keep_from > 0:
+            self._buffer = self._buffer[keep_from:]
+            self._base += keep_from
+        return out
+
+    def flush(self):
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        return self.process(np.zeros(self.half_taps, dtype=np.float32))
+
+
+class DecodedAudio:
+    """Mono float32 samples plus peak/RMS, accumulated chunk by chunk as they are produced."""
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.chunks = []
+        self.num_samples = 0
+        self.peak = 0.0
+        self._sum_squares = 0.0
+
+    def add(self, chunk):
+        if len(chunk):
+            self.chunks.append(chunk)
+            self.num_samples += len(chunk)
+            self.peak = max(self.peak, float(chunk.max()), -float(chunk.min()))
+            self._sum_squares += float(np.dot(chunk, chunk))
+        return chunk
+
+    @property
+    def samples(self):
+        if len(self.chunks) != 1:
+            self.chunks = [np.concatenate(self.chunks) if self.chunks else np.zeros(0, dtype=np.float32)]
+        return self.chunks[0]
+
+    @property
+    def duration(self):
+        return self.num_samples / self.sample_rate
+
+    @property
+    def rms(self):
+        return (self._sum_squares / self.num_samples) ** 0.5 if self.num_samples else 0.0
+
+    def is_silent(self, threshold=0.001):
+        return self.peak < threshold
+
+
+def _frame_to_mono(frame):
+    """One PyAV AudioFrame as mono float32 in [-1, 1], whatever its sample format/layout."""
+    pcm = frame.to_ndarray()
+    if pcm.dtype == np.int16:
+        pcm = pcm.astype(np.float32) / 32768.0
+    elif pcm.dtype == np.int32:
+        pcm = pcm.astype(np.float32) / 2147483648.0
+    elif pcm.dtype != np.float32:
+        pcm = pcm.astype(np.float32)
+    channels = len(frame.layout.channels)
+    if frame.format.is_planar:
+        return pcm[0] if channels == 1 else pcm.mean(axis=0)
+    pcm = pcm.reshape(-1)
+    return pcm if channels == 1 else pcm.reshape(-1, channels).mean(axis=1)
+
+
+def _decode_pyav(source, target_rate, result, block_seconds=1.0):
+    resampler = None
+    pending, pending_samples = [], 0
+    with av.open(source, mode="r") as container:
+        if not container.streams.audio:
+            raise AudioDecodeError("no audio stream")
+        stream = container.streams.audio[0]
+        for frame in container.decode(stream):
+            if resampler is None:
+                resampler = Resampler(frame.sample_rate, target_rate)
+            pending.append(_frame_to_mono(frame))
+            pending_samples += frame.samples
+            # Opus frames are 20 ms; resampling ~1 s blocks keeps per-call overhead negligible
+            if pending_samples >= frame.sample_rate * block_seconds:
+                result.add(resampler.process(np.concatenate(pending)))
+                pending, pending_samples = [], 0
+    if resampler is not None:
+        if pending:
+            result.add(resampler.process(np.concatenate(pending)))
+        result.add(resampler.flush())
+    return result
+
+
+def _ffmpeg_command(target_rate):
+    return ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-ar", str(target_rate), "pipe:1"]
+
+
+def decode_audio(data, target_rate=TARGET_RATE, backend=None, timeout=30):
+    """
+    Decode a complete encoded blob (WebM/Opus, WAV, MP3...) to mono float32 at
+    `target_rate`, entirely in memory. Uses PyAV when installed, else one
+    ffmpeg process fed through stdin/stdout pipes.
+    """
+    backend = backend or available_backend()
+    result = DecodedAudio(target_rate)
+    try:
+        if backend == "pyav":
+            return _decode_pyav(io.BytesIO(data), target_rate, result)
+        if backend == "ffmpeg":
+            process = subprocess.run(_ffmpeg_command(target_rate), input=bytes(data),
+                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+            if process.returncode != 0:
+                raise AudioDecodeError(process.stderr.decode(errors="replace").strip())
+            result.add(np.frombuffer(process.stdout, dtype="<i2").astype(np.float32) / 32768.0)
+            return result
+    except AudioDecodeError:
+        raise
+    except Exception as e:
+        raise AudioDecodeError(f"{type(e).__name__}: {e}") from e
+    raise AudioDecodeError("no audio decoder available (install PyAV or ffmpeg)")
+
+
+class StreamDecoder:
+    """
+    Incremental decoder for one growing encoded stream (e.g. MediaRecorder
+    WebM chunks). feed() pushes bytes into a long-lived decoder through a pipe
+    and returns whatever new mono float32 samples are ready (possibly none);
+    close() ends the stream and returns the rest. Running totals (peak, RMS,
+    duration) are kept on `.audio` as samples come out.
+
+    The decoder is PyAV on a native OS thread reading the pipe, or an ffmpeg
+    process when PyAV is missing; either way the caller never blocks on it.
+    The pipe's write end is non-blocking: whatever does not fit while the
+    decoder is behind stays in `_pending` and goes out on the next feed() or
+    at close().
+    """
+
+    def __init__(self, target_rate=TARGET_RATE, backend=None, keep_samples=False):
+        self.target_rate = target_rate
+        self.backend = backend or available_backend()
+        self.keep_samples = keep_samples
+        self.audio = DecodedAudio(target_rate)
+        self.error = None
+
+        native_threading = native_module("threading")
+        self._os = native_module("os")  # green os.write would wait on a full pipe instead of raising
+        self._pending = bytearray()
+        self._lock = native_threading.Lock()
+        self._ready = []  # native-rate mono chunks waiting to be resampled
+        self._rate = None
+        self._resampler = None
+
+        if self.backend == "pyav":
+            read_fd, self._write_fd = os.pipe()
+            # libav blocks in read(): a real OS thread, so the eventlet hub is never stalled
+            self._thread = native_threading.Thread(target=self._run_pyav, args=(read_fd,), daemon=True)
+            self._process = None
+        elif self.backend == "ffmpeg":
+            self._process = subprocess.Popen(_ffmpeg_command(target_rate), stdin=subprocess.PIPE,
+                                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            self._write_fd = self._process.stdin.fileno()
+            self._rate = target_rate
+            # Popen pipes are green under eventlet, so the reader must be an ordinary (green) thread
+            self._thread = threading.Thread(target=self._run_ffmpeg, daemon=True)
+        else:
+            raise AudioDecodeError("no audio decoder available (install PyAV or ffmpeg)")
+        os.set_blocking(self._write_fd, False)
+        self._thread.start()
+
+    def _push(self, chunk, rate):
+        with self._lock:
+            self._rate = rate
+            self._ready.append(chunk)
+
+    def _run_pyav(self, read_fd):
+        try:
+            with os.fdopen(read_fd, "rb", buffering=0) as pipe:
+                with av.open(pipe, mode="r") as container:
+                    for frame in container.decode(container.streams.audio[0]):
+                        self._push(_frame_to_mono(frame), frame.sample_rate)
+        except Exception as e:
+            self.error = AudioDecodeError(f"{type(e).__name__}: {e}")
+
+    def _run_ffmpeg(self):
+        stdout = self._process.stdout
+        while True:
+            data = stdout.read1(65536) if hasattr(stdout, "read1") else stdout.read(65536)
+            if not data:
+                return
+            usable = len(data) - len(data) % 2  # s16le; ffmpeg writes whole samples
+            self._push(np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0, self.target_rate)
+
+    def _drain(self):
+        with self._lock:
+            ready, self._ready = self._ready, []
+            rate = self._rate
+        if not ready:
+            return np.zeros(0, dtype=np.float32)
+        if self._resampler is None:
+            self._resampler = Resampler(rate, self.target_rate)
+        return self._track(self._resampler.process(np.concatenate(ready)))
+
+    def _track(self, chunk):
+        """Update peak/RMS/duration; the samples are only kept with keep_samples=True."""
+        self.audio.add(chunk)
+        if not self.keep_samples:
+            self.audio.chunks.clear()
+        return chunk
+
+    def _write_pending(self):
+        """Write as much of `_pending` as the pipe takes now; True once it is all out."""
+        while self._pending:
+            try:
+                written = self._os.write(self._write_fd, self._pending)
+            except BlockingIOError:
+                return False
+            del self._pending[:written]
+        return True
+
+    def feed(self, data):
+        if data:
+            self._pending += data
+            self._write_pending()
+        return self._drain()
+
+    def close(self, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        try:
+            while not self._write_pending() and self._thread.is_alive() and time.monotonic() < deadline:
+                time.sleep(0.005)
+        except OSError:
+            pass
+        try:
+            if self._process is None:
+                os.close(self._write_fd)
+            else:
+                self._process.stdin.close()
+        except OSError:
+            pass
+        while self._thread.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.005)  # polled rather than join(): cooperative under eventlet
+        tail = self._drain()
+        if self._resampler is not None:
+            tail = np.concatenate((tail, self._track(self._resampler.flush())))
+        if self._process is not None:
+            self._process.wait(timeout)
+        return tail
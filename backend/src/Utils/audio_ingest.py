@@ -0,0 +1,142 @@
+# src/Utils/audio_ingest.py
+import numpy as np
+
+SUPPORTED_ENCODINGS = ("linear16", "mulaw")
+
+
+def _build_mulaw_table():
+    """G.711 μ-law code for every int16 value, so encoding is one table lookup per sample."""
+    bias, clip = 0x84, 32635
+    x = np.arange(-32768, 32768, dtype=np.int32)
+    sign = (x < 0).astype(np.int32) << 7
+    magnitude = np.minimum(np.abs(x), clip) + bias
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    codes = (~(sign | (exponent << 4) | mantissa)) & 0xFF
+    # Re-order so the table is indexed by the sample's uint16 bit pattern
+    return np.roll(codes.astype(np.uint8), -32768)
+
+
+_MULAW_TABLE = _build_mulaw_table()
+
+
+def _lowpass_taps(input_rate, output_rate, num_taps=63):
+    """Hamming-windowed sinc anti-aliasing filter with cutoff at 90% of the output Nyquist."""
+    cutoff = 0.9 * (output_rate / 2) / input_rate
+    n = np.arange(num_taps) - (num_taps - 1) / 2
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(num_taps)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+class AudioIngest:
+    """
+    Per-session audio ingest between the browser and the STT socket.
+
+    Incoming Int16 PCM frames (any size) are copied once into a preallocated
+    ring buffer; every `packet_ms` of audio is low-pass filtered and decimated
+    to `output_rate` with vectorized NumPy, optionally μ-law encoded, and handed
+    to `send(packet_bytes)` as a single WebSocket message.
+    """
+
+    def __init__(self, send, input_rate=48000, output_rate=16000, packet_ms=80, encoding="linear16",
+                 ring_packets=8):
+        if input_rate % output_rate:
+            raise ValueError(f"input_rate {input_rate} must be a multiple of output_rate {output_rate}")
+        if encoding not in SUPPORTED_ENCODINGS:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+        self.send = send
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.encoding = encoding
+        self.factor = input_rate // output_rate
+
+        # Whole output samples per packet keeps decimation phase aligned across packets
+        self.packet_samples = (input_rate * packet_ms // 1000) // self.factor * self.factor
+        self._ring = np.zeros(self.packet_samples * ring_packets, dtype=np.int16)
+        self._read = 0
+        self._count = 0
+
+        self._taps = _lowpass_taps(input_rate, output_rate) if self.factor > 1 else None
+        history = len(self._taps) - 1 if self._taps is not None else 0
+        self._work = np.zeros(history + self.packet_samples, dtype=np.float32)
+
+        self._odd_byte = b""  # a frame split mid-sample leaves its first byte for the next push
+
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.packets_out = 0
+
+    def _write(self, samples):
+        capacity = len(self._ring)
+        if len(samples) > capacity:
+            samples = samples[-capacity:]  # only the newest ring-full can be kept
+            self._read, self._count = 0, 0
+        if len(samples) > capacity - self._count:
+            # Consumer fell far behind (should not happen: packets are drained on every push)
+            drop = len(samples) - (capacity - self._count)
+            self._read = (self._read + drop) % capacity
+            self._count -= drop
+        start = (self._read + self._count) % capacity
+        first = min(len(samples), capacity - start)
+        self._ring[start:start + first] = samples[:first]
+        self._ring[:len(samples) - first] = samples[first:]
+        self._count += len(samples)
+
+    def _take_packet(self):
+        """Move one packet from the ring into the filter's work buffer (after the history tail)."""
+        capacity = len(self._ring)
+        history = len(self._work) - self.packet_samples
+        out = self._work[history:]
+        first = min(self.packet_samples, capacity - self._read)
+        out[:first] = self._ring[self._read:self._read + first]
+        out[first:] = self._ring[:self.packet_samples - first]
+        self._read = (self._read + self.packet_samples) % capacity
+        self._count -= self.packet_samples
+
+    def _downsample(self):
+        if self._taps is None:
+            return self._work.astype(np.int16)
+        windows = np.lib.stride_tricks.sliding_window_view(self._work, len(self._taps))[::self.factor]
+        filtered = windows @ self._taps
+        history = len(self._taps) - 1
+        self._work[:history] = self._work[-history:]  # keep the tail for the next packet's filter
+        return np.clip(filtered, -32768, 32767).astype(np.int16)
+
+    def _encode(self, pcm16):
+        if self.encoding == "mulaw":
+            return _MULAW_TABLE[pcm16.view(np.uint16)].tobytes()
+        return pcm16.tobytes()
+
+    def _emit(self, pcm16):
+        packet = self._encode(pcm16)
+        self.bytes_out += len(packet)
+        self.packets_out += 1
+        self.send(packet)
+
+    def push(self, blob):
+        """Accept a bytes-like Int16 PCM frame (any length); sends every packet it completes."""
+        data = memoryview(blob).cast("B")
+        if self._odd_byte:
+            data = memoryview(self._odd_byte + bytes(data))
+            self._odd_byte = b""
+        if len(data) % 2:
+            self._odd_byte = bytes(data[-1:])
+            data = data[:-1]
+        samples = np.frombuffer(data, dtype=np.int16)  # view, no copy
+        self.bytes_in += samples.nbytes
+        # Blobs larger than the ring go through in ring-sized pieces, draining between them
+        step = len(self._ring) - self.packet_samples
+        for start in range(0, len(samples), step):
+            self._write(samples[start:start + step])
+            while self._count >= self.packet_samples:
+                self._take_packet()
+                self._emit(self._downsample())
+
+    def flush(self):
+        """Send whatever is buffered, zero-padded to a full packet (on stop, so the last words reach STT)."""
+        if self._count:
+            pad = self.packet_samples - self._count
+            self._write(np.zeros(pad, dtype=np.int16))
+            self._take_packet()
+            self._emit(self._downsample())
@@ -0,0 +1,33 @@
+# src/Utils/concurrency.py
+import sys
+
+
+def green_threads_enabled():
+    """True when eventlet has monkey-patched threading (SOCKETIO_ASYNC_MODE=eventlet)."""
+    eventlet = sys.modules.get("eventlet")
+    return bool(eventlet) and eventlet.patcher.is_monkey_patched("thread")
+
+
+def run_blocking(fn, *args, **kwargs):
+    """
+    Run a call that blocks inside native code (e.g. the Azure Speech SDK).
+    Under eventlet it is moved to the native thread pool so the event loop keeps
+    serving other sessions; otherwise it is simply called.
+    """
+    if green_threads_enabled():
+        from eventlet import tpool
+        return tpool.execute(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+def native_module(name):
+    """
+    The unpatched stdlib module `name` (e.g. "threading", "time", "queue"),
+    for OS threads that block inside native code or must keep running while
+    the eventlet hub is busy. Without eventlet it is the normal module.
+    """
+    if green_threads_enabled():
+        from eventlet import patcher
+        return patcher.original(name)
+    import importlib
+    return importlib.import_module(name)
@@ -0,0 +1,186 @@
+# src/Utils/metrics.py
+import bisect
+import threading
+import time
+
+# Default latency buckets (seconds): fine-grained around the 100 ms - 2 s range voice turns live in
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+# Per-turn span marks, in pipeline order
+TURN_SPANS = (
+    "last_audio_chunk",   # last audio chunk received from the browser before the turn (not the end of speech:
+                          # the browser streams continuously, so this lands just before stt_final)
+    "stt_final",          # Deepgram final / end of turn detected
+    "llm_request",        # LLM request sent
+    "llm_first_token",
+    "first_sentence",     # first sentence segmented
+    "tts_first_byte",
+    "first_audio_emit",   # first tts_chunk handed to the session outbox
+    "tts_done",
+)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{v}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                    cumulative += count
+                    le = _labels(self.labelnames + ("le",), labels + (bound,))
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                suffix = _labels(self.labelnames, labels)
+                lines.append(f"{self.name}_sum{suffix} {series[-1]:.6f}")
+                lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    Holds this worker's metrics and renders them in the Prometheus text format.
+    Collectors are callables returning {metric_name: value} (gauges), used to
+    expose stats dicts the subsystems already keep (TTS pool/cache, Deepgram
+    pool, LLM router, HTTP pool) without coupling them to this module.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collect):
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            try:
+                values = collect()
+            except Exception as e:
+                lines.append(f"# collector error: {e}")
+                continue
+            for name, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TURN_LATENCY = REGISTRY.histogram(
+    "hivoys_turn_span_seconds",
+    "Time from the last received audio chunk (else the STT final) to each span of the response turn",
+    labelnames=("span",),
+)
+TURNS_TOTAL = REGISTRY.counter("hivoys_turns_total", "Response turns by outcome", labelnames=("outcome",))
+AUDIO_CHUNKS_TOTAL = REGISTRY.counter("hivoys_audio_chunks_total", "Audio frames received from browsers")
+AUDIO_BYTES_TOTAL = REGISTRY.counter("hivoys_audio_bytes_total", "Audio bytes received from browsers")
+TTS_FRAMES_TOTAL = REGISTRY.counter("hivoys_tts_frames_total", "Audio frames sent to browsers")
+TTS_FRAME_BYTES_TOTAL = REGISTRY.counter("hivoys_tts_frame_bytes_total", "Audio bytes sent to browsers")
+TTS_FRAMES_MERGED_TOTAL = REGISTRY.counter("hivoys_tts_frames_merged_total",
+                                           "Outbound frames merged from several synthesizer buffers")
+TTS_DROPPED_MS_TOTAL = REGISTRY.counter("hivoys_tts_dropped_ms_total",
+                                        "Milliseconds of audio dropped for sessions that fell behind")
+STT_RECONNECTS_TOTAL = REGISTRY.counter("hivoys_stt_reconnects_total",
+                                        "Dropped Deepgram streams reopened mid-session, by outcome",
+                                        labelnames=("outcome",))
+STT_REPLAYED_BYTES_TOTAL = REGISTRY.counter("hivoys_stt_replayed_bytes_total",
+                                            "Audio bytes replayed to Deepgram after a reconnect")
+
+
+class TurnTrace:
+    """
+    Monotonic timestamps of one turn's spans (first occurrence wins, so
+    pipeline stages can call mark() on every item cheaply). finish() observes
+    every recorded span relative to the earliest anchor available.
+    """
+
+    def __init__(self, sid, turn_id=None):
+        self.sid = sid
+        self.turn_id = turn_id
+        self.marks = {}
+
+    def mark(self, span, at=None):
+        if span not in self.marks:
+            self.marks[span] = at if at is not None else time.monotonic()
+
+    def relative(self):
+        """{span: seconds since anchor} in pipeline order."""
+        anchor = next((self.marks[s] for s in ("last_audio_chunk", "stt_final", "llm_request") if s in self.marks), None)
+        if anchor is None:
+            return {}
+        return {span: self.marks[span] - anchor for span in TURN_SPANS if span in self.marks}
+
+    def finish(self, outcome):
+        TURNS_TOTAL.inc(1, outcome)
+        relative = self.relative()
+        if outcome == "completed":
+            for span, seconds in relative.items():
+                TURN_LATENCY.observe(max(0.0, seconds), span)
+        return relative
+
+
+class _NullTrace:
+    def mark(self, span, at=None):
+        pass
+
+
+NULL_TRACE = _NullTrace()
@@ -0,0 +1,75 @@
+# src/Utils/startup.py
+import time
+
+
+class Startup:
+    """
+    Background warm-up of this worker's engines, and the state behind
+    /healthz and /readyz.
+
+    Each registered component has a warm-up callable (run once, concurrently
+    with the others, after the server is already accepting connections) and
+    an optional `check` polled afterwards until the engine reports itself
+    usable, e.g. a pool whose sockets connect asynchronously. A warm-up that
+    raises, returns False, or whose check stays false past `timeout` marks
+    the component failed; failed components are retried every
+    `retry_interval` seconds, so a worker recovers from a transient outage
+    without a restart. The worker is ready once every required component is.
+    """
+
+    def __init__(self, timeout=60.0, retry_interval=30.0):
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.started_at = time.monotonic()
+        self.components = {}
+
+    def register(self, name, warm_up, check=None, required=True):
+        self.components[name] = {
+            "warm_up": warm_up, "check": check, "required": required,
+            "state": "pending", "error": None, "seconds": None, "attempts": 0,
+        }
+
+    def start(self, spawn, sleep=time.sleep):
+        """Run every warm-up concurrently; `spawn` starts a background task (socketio.start_background_task)."""
+        self._sleep = sleep
+        for name in self.components:
+            spawn(self._run, name)
+
+    def _warm(self, component):
+        started = time.monotonic()
+        component["state"] = "warming"
+        component["attempts"] += 1
+        try:
+            if component["warm_up"]() is False:
+                raise RuntimeError("warm-up failed")
+            check = component["check"]
+            while check and not check():
+                if time.monotonic() - started > self.timeout:
+                    raise TimeoutError(f"not ready after {self.timeout:.0f}s")
+                self._sleep(0.1)
+        except Exception as e:
+            component.update(state="failed", error=str(e) or type(e).__name__)
+            return False
+        component.update(state="ready", error=None, seconds=round(time.monotonic() - started, 3))
+        return True
+
+    def _run(self, name):
+        component = self.components[name]
+        while not self._warm(component):
+            print(f"⚠️ Startup: {name} not ready ({component['error']}), retrying in {self.retry_interval:.0f}s")
+            self._sleep(self.retry_interval)
+        print(f"🔥 Startup: {name} ready in {component['seconds']}s")
+
+    @property
+    def ready(self):
+        return all(c["state"] == "ready" for c in self.components.values() if c["required"])
+
+    def report(self):
+        return {
+            "ready": self.ready,
+            "uptime_s": round(time.monotonic() - self.started_at, 3),
+            "components": {
+                name: {k: c[k] for k in ("state", "required", "error", "seconds", "attempts")}
+                for name, c in self.components.items()
+            },
+        }
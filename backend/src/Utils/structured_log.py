@@ -0,0 +1,85 @@
+# src/Utils/structured_log.py
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from src.Utils.concurrency import native_module
+
+
+class StructuredLogger:
+    """
+    JSON-lines event log for hot paths (per audio chunk, per sentence, per frame).
+
+    event() only appends to an in-memory deque; a native writer thread does
+    the stdout writes, so a slow terminal or pipe never blocks socket threads
+    (or the eventlet hub). Each event name (plus optional `key`, e.g. a sid)
+    is rate-limited to one line per `every` seconds; the line carries how many
+    occurrences were suppressed since the last one. LOG_LEVEL=quiet drops
+    hot-path events entirely.
+    """
+
+    def __init__(self, stream=None, max_pending=10000, default_every=5.0):
+        self.stream = stream or sys.stdout
+        self.default_every = default_every
+        self.enabled = os.environ.get("LOG_LEVEL", "info") != "quiet"
+        self._pending = deque(maxlen=max_pending)
+        self._last = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+        self._writer = None
+
+    def _start_writer(self):
+        thread_cls, sleep = native_module("threading").Thread, native_module("time").sleep
+
+        def run():
+            while True:
+                if not self._pending:
+                    sleep(0.05)
+                    continue
+                lines = []
+                while self._pending and len(lines) < 500:
+                    lines.append(self._pending.popleft())
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except Exception:
+                    pass
+
+        self._writer = thread_cls(target=run, daemon=True)
+        self._writer.start()
+
+    def event(self, name, key=None, every=None, **fields):
+        if not self.enabled:
+            return
+        every = self.default_every if every is None else every
+        now = time.monotonic()
+        limit_key = (name, key)
+        with self._lock:
+            if every and now - self._last.get(limit_key, -every) < every:
+                self._suppressed[limit_key] = self._suppressed.get(limit_key, 0) + 1
+                return
+            self._last[limit_key] = now
+            suppressed = self._suppressed.pop(limit_key, 0)
+            if self._writer is None:
+                self._start_writer()
+
+        record = {"ts": round(time.time(), 3), "event": name}
+        if key is not None:
+            record["key"] = key
+        record.update(fields)
+        if suppressed:
+            record["suppressed"] = suppressed
+        self._pending.append(json.dumps(record, default=str))
+
+    def forget(self, key):
+        """Drop rate-limit state for `key` (e.g. on disconnect) so it cannot grow without bound."""
+        with self._lock:
+            for limit_key in [k for k in self._last if k[1] == key]:
+                self._last.pop(limit_key, None)
+                self._suppressed.pop(limit_key, None)
+
+
+log = StructuredLogger()
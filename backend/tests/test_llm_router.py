@@ -0,0 +1,105 @@
+# tests/test_llm_router.py
+import time
+
+from src.LLM.base import BaseLLM
+from src.LLM.llm_router import CircuitBreaker, LLMRouter
+from src.Pipeline.turns import CancelToken
+
+
+class FakeLLM(BaseLLM):
+    """Streams `tokens` after `first_token_delay`; raises instead while `failing` is set."""
+
+    def __init__(self, name, first_token_delay=0.0, tokens=("hello ", "there"), failing=False):
+        super().__init__(name)
+        self.name = name
+        self.first_token_delay = first_token_delay
+        self.tokens = tokens
+        self.failing = failing
+        self.calls = 0
+
+    def stream(self, user_message, cancel=None, history=None):
+        self.calls += 1
+        if cancel:
+            cancel.wait(self.first_token_delay)
+        if self.failing:
+            raise RuntimeError(f"{self.name} down")
+        for token in self.tokens:
+            if cancel and cancel.cancelled:
+                return
+            yield token
+            time.sleep(0.01)
+
+
+def _trip(router, provider):
+    """Open `provider`'s breaker and let its reset timeout pass, leaving it half-open."""
+    breaker = router.breakers[provider.name]
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.opened_at -= breaker.reset_timeout
+    assert breaker.state == "half-open"
+
+
+def test_breaker_allows_one_trial_when_half_open():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failed_trial_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure()
+    breaker.opened_at -= 30.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_cancelled_trial_releases_breaker():
+    a, b = FakeLLM("a", tokens=("x",) * 50), FakeLLM("b")
+    router = LLMRouter([a, b], hedge_after=5.0)
+    _trip(router, a)
+
+    cancel = CancelToken()
+    stream = router.stream("hi", cancel=cancel)
+    assert next(stream) == "x"
+    cancel.cancel("barge-in")
+    assert list(stream) == []
+
+    assert not router.breakers[a.name]._trial_running
+    assert "".join(router.stream("hi")) == "x" * 50
+    assert a.calls == 2
+
+
+def test_abandoned_trial_releases_breaker():
+    a, b = FakeLLM("a", tokens=("x",) * 50), FakeLLM("b")
+    router = LLMRouter([a, b], hedge_after=5.0)
+    _trip(router, a)
+
+    stream = router.stream("hi")
+    next(stream)
+    stream.close()
+
+    assert not router.breakers[a.name]._trial_running
+    next(router.stream("hi"))
+    assert a.calls == 2
+
+
+def test_fails_over_when_primary_errors():
+    a, b = FakeLLM("a", failing=True), FakeLLM("b")
+    router = LLMRouter([a, b], hedge_after=5.0)
+    assert "".join(router.stream("hi")) == "hello there"
+    assert router.counters["failovers"] == 1
+    assert router.stats["a"].failures == 1
+
+
+def test_hedge_wins_and_demotes_slow_provider():
+    a, b = FakeLLM("a", first_token_delay=1.0), FakeLLM("b")
+    router = LLMRouter([a, b], hedge_after=0.05)
+    assert "".join(router.stream("hi")) == "hello there"
+    assert router.counters["hedge_wins"] == 1
+    assert [p.name for p in router._ranked()] == ["b", "a"]
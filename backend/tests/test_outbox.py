@@ -0,0 +1,109 @@
+# tests/test_outbox.py
+import threading
+import time
+
+import pytest
+
+from src.Pipeline.outbox import SessionClosed, SessionOutbox
+
+CHUNK = bytes(864)  # 216 ms of 16 kHz / 32 kbps MP3, six whole MPEG frames
+
+
+class FakeSocketIO:
+    """Records emits (and their ack callbacks) instead of writing to a socket."""
+
+    def __init__(self):
+        self.emitted = []
+        self.callbacks = []
+        self._lock = threading.Lock()
+
+    def start_background_task(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def emit(self, event, data, room=None, ignore_queue=False, callback=None):
+        with self._lock:
+            self.emitted.append((event, data))
+            if callback:
+                self.callbacks.append(callback)
+
+    def frames(self):
+        with self._lock:
+            return [data for event, data in self.emitted if event == "tts_chunk"]
+
+    def ack_all(self):
+        with self._lock:
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def _stable_count(socketio, settle=0.1):
+    count = len(socketio.frames())
+    while True:
+        time.sleep(settle)
+        latest = len(socketio.frames())
+        if latest == count:
+            return count
+        count = latest
+
+
+def test_sender_holds_off_until_frames_are_acked():
+    socketio = FakeSocketIO()
+    outbox = SessionOutbox(socketio, "sid", high_water=2).start()
+    for _ in range(20):
+        outbox.put("tts_chunk", CHUNK)
+    outbox.put("tts_done", {"text": "hi"})
+
+    assert _stable_count(socketio) == 3  # high_water + the frame that crossed it
+    socketio.ack_all()
+    assert _wait_for(lambda: len(socketio.frames()) > 3)
+
+    def finished():
+        socketio.ack_all()
+        return any(event == "tts_done" for event, _ in socketio.emitted)
+
+    assert _wait_for(finished)
+    frames = socketio.frames()
+    assert [frame["seq"] for frame in frames] == list(range(len(frames)))
+    assert sum(len(frame["audio"]) for frame in frames) == 20 * len(CHUNK)
+    outbox.close()
+
+
+def test_client_without_acks_gets_no_back_pressure():
+    socketio = FakeSocketIO()
+    outbox = SessionOutbox(socketio, "sid", high_water=2, ack_timeout=0.05).start()
+    for _ in range(20):
+        outbox.put("tts_chunk", CHUNK)
+    outbox.put("tts_done", {"text": "hi"})
+
+    assert _wait_for(lambda: any(event == "tts_done" for event, _ in socketio.emitted))
+    assert outbox._acks is False
+    outbox.close()
+
+
+def test_put_after_close_raises():
+    outbox = SessionOutbox(FakeSocketIO(), "sid").start()
+    outbox.close()
+    with pytest.raises(SessionClosed):
+        outbox.put("tts_chunk", CHUNK)
+
+
+def test_full_queue_times_out_as_closed():
+    outbox = SessionOutbox(FakeSocketIO(), "sid", max_pending=1, put_timeout=0.05)  # no sender running
+    outbox.put("tts_chunk", CHUNK)
+    with pytest.raises(SessionClosed):
+        outbox.put("tts_chunk", CHUNK)
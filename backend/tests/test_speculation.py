@@ -0,0 +1,109 @@
+# tests/test_speculation.py
+import threading
+import time
+
+import pytest
+
+from src.Pipeline.speculation import SpeculativeGate, normalize_transcript
+from src.Pipeline.turns import TurnCancelled
+
+
+class ListOutbox:
+    def __init__(self, delay=0.0):
+        self.items = []
+        self.delay = delay
+
+    def put(self, event, data):
+        time.sleep(self.delay)
+        self.items.append(data)
+
+
+def test_holds_events_until_commit():
+    outbox = ListOutbox()
+    gate = SpeculativeGate(outbox)
+    gate.put("tts_chunk", 1)
+    gate.put("tts_chunk", 2)
+    assert outbox.items == []
+
+    gate.commit()
+    gate.put("tts_chunk", 3)
+    assert outbox.items == [1, 2, 3]
+    assert gate.committed
+
+
+def test_discard_drops_events_and_cancels_producer():
+    outbox = ListOutbox()
+    gate = SpeculativeGate(outbox)
+    gate.put("tts_chunk", 1)
+    gate.discard()
+    with pytest.raises(TurnCancelled):
+        gate.put("tts_chunk", 2)
+    gate.commit()
+    assert outbox.items == []
+    assert not gate.committed
+
+
+def test_full_gate_blocks_producer_until_commit():
+    outbox = ListOutbox()
+    gate = SpeculativeGate(outbox, max_buffered=3)
+    producer = threading.Thread(target=lambda: [gate.put("tts_chunk", i) for i in range(10)])
+    producer.start()
+    time.sleep(0.05)
+    assert producer.is_alive()
+    assert len(gate._buffer) == 3
+
+    gate.commit()
+    producer.join(2.0)
+    assert not producer.is_alive()
+    assert outbox.items == list(range(10))
+
+
+def test_full_gate_unblocks_on_discard():
+    gate = SpeculativeGate(ListOutbox(), max_buffered=1)
+    errors = []
+
+    def produce():
+        try:
+            for i in range(3):
+                gate.put("tts_chunk", i)
+        except TurnCancelled as e:
+            errors.append(e)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    time.sleep(0.05)
+    gate.discard()
+    producer.join(2.0)
+    assert len(errors) == 1
+
+
+def test_puts_during_a_slow_flush_keep_their_order():
+    outbox = ListOutbox(delay=0.005)
+    gate = SpeculativeGate(outbox, max_buffered=5)
+    producer = threading.Thread(target=lambda: [gate.put("tts_chunk", i) for i in range(20)])
+    producer.start()
+    time.sleep(0.02)
+    threading.Thread(target=gate.commit).start()
+    producer.join(2.0)
+    deadline = time.monotonic() + 2.0
+    while len(outbox.items) < 20 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert outbox.items == list(range(20))
+
+
+def test_discard_during_flush_stops_it():
+    outbox = ListOutbox(delay=0.01)
+    gate = SpeculativeGate(outbox)
+    for i in range(50):
+        gate.put("tts_chunk", i)
+    flush = threading.Thread(target=gate.commit)
+    flush.start()
+    time.sleep(0.05)
+    gate.discard()
+    flush.join(2.0)
+    assert not flush.is_alive()
+    assert 0 < len(outbox.items) < 50
+
+
+def test_normalize_transcript_ignores_case_and_punctuation():
+    assert normalize_transcript("Hello,  World!") == normalize_transcript("hello world")
@@ -0,0 +1,90 @@
+# tests/test_turn_detector.py
+import time
+
+from src.STT.turn_detector import TurnDetector
+
+
+def _detector(silence_timeout=0.05, **kwargs):
+    turns = []
+    return TurnDetector(on_turn=turns.append, silence_timeout=silence_timeout, **kwargs), turns
+
+
+def test_restarted_timer_ignores_stale_callback():
+    detector, turns = _detector(silence_timeout=5.0)
+    detector.on_result("hello there", is_final=True)
+    stale = detector._timer_generation
+
+    # The old timer already fired and is waiting for the lock when speech restarts it
+    detector.on_speech_started()
+    detector._on_silence(stale)
+
+    assert turns == []
+    assert detector._segments == ["hello there"]
+    detector.close()
+
+
+def test_speech_final_ends_turn_with_all_segments():
+    detector, turns = _detector(silence_timeout=5.0)
+    detector.on_result("I studied", is_final=True)
+    detector.on_result("at NIT", is_final=True, speech_final=True)
+    assert turns == ["I studied at NIT"]
+    detector.close()
+
+
+def test_utterance_end_ends_turn():
+    detector, turns = _detector(silence_timeout=5.0)
+    detector.on_result("hello", is_final=True)
+    detector.on_utterance_end()
+    detector.on_utterance_end()
+    assert turns == ["hello"]
+
+
+def test_silence_timeout_ends_turn_after_empty_interims():
+    detector, turns = _detector()
+    detector.on_result("hello there", is_final=True)
+    detector.on_result("", is_final=False)
+    time.sleep(0.2)
+    assert turns == ["hello there"]
+
+
+def test_new_speech_holds_off_silence_timeout():
+    detector, turns = _detector(silence_timeout=0.1)
+    detector.on_result("hello", is_final=True)
+    time.sleep(0.06)
+    detector.on_result("hello there", is_final=False)
+    time.sleep(0.06)
+    assert turns == []
+    detector.on_result("there", is_final=True)
+    time.sleep(0.2)
+    assert turns == ["hello there"]
+
+
+def test_speech_started_restarts_timeout():
+    detector, turns = _detector(silence_timeout=0.1)
+    detector.on_result("hello", is_final=True)
+    time.sleep(0.06)
+    detector.on_speech_started()
+    time.sleep(0.06)
+    assert turns == []
+    time.sleep(0.1)
+    assert turns == ["hello"]
+
+
+def test_speculates_on_stable_confident_interims():
+    speculated = []
+    detector, turns = _detector(silence_timeout=5.0, on_speculate=speculated.append)
+    detector.on_result("tell me", is_final=False, confidence=0.95)
+    detector.on_result("tell me", is_final=False, confidence=0.95)
+    detector.on_result("tell me", is_final=False, confidence=0.95)
+    detector.on_result("unsure", is_final=False, confidence=0.5)
+    detector.on_result("unsure", is_final=False, confidence=0.5)
+    assert speculated == ["tell me"]
+    detector.close()
+
+
+def test_close_cancels_pending_timeout():
+    detector, turns = _detector()
+    detector.on_result("hello", is_final=True)
+    detector.close()
+    time.sleep(0.15)
+    assert turns == []
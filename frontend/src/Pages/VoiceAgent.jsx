@@ -11,6 +11,9 @@ const VoiceAgent = () => {
   const audioQueueRef = useRef([]);
   const currentAudioRef = useRef(null);
   const isPlayingRef = useRef(false);
+  const streamPlayerRef = useRef(null);
+  const serverEndpointingRef = useRef(false);
+  const lastFrameRef = useRef(null);
   const [isRecording, setIsRecording] = useState(false);
   const [transcript, setTranscript] = useState("");
   const [aiReply, setAiReply] = useState("");
@@ -101,6 +104,55 @@ const VoiceAgent = () => {
     }
   };
 
+  // Streaming playback: append MP3 frames to a MediaSource as they arrive
+  const supportsStreamingPlayback =
+    typeof window !== "undefined" &&
+    window.MediaSource &&
+    MediaSource.isTypeSupported("audio/mpeg");
+
+  const flushStreamPlayer = () => {
+    const player = streamPlayerRef.current;
+    if (!player || !player.sourceBuffer || player.sourceBuffer.updating) return;
+
+    if (player.pending.length > 0) {
+      player.sourceBuffer.appendBuffer(player.pending.shift());
+    } else if (player.ended && player.mediaSource.readyState === "open") {
+      player.mediaSource.endOfStream();
+    }
+  };
+
+  const resetStreamPlayer = () => {
+    const player = streamPlayerRef.current;
+    if (!player) return;
+    player.audio.pause();
+    URL.revokeObjectURL(player.url);
+    streamPlayerRef.current = null;
+    setIsSpeaking(false);
+  };
+
+  const ensureStreamPlayer = () => {
+    if (streamPlayerRef.current) return streamPlayerRef.current;
+
+    const mediaSource = new MediaSource();
+    const url = URL.createObjectURL(mediaSource);
+    const audio = new Audio(url);
+    const player = { mediaSource, audio, url, sourceBuffer: null, pending: [], ended: false };
+    streamPlayerRef.current = player;
+
+    mediaSource.addEventListener("sourceopen", () => {
+      player.sourceBuffer = mediaSource.addSourceBuffer("audio/mpeg");
+      player.sourceBuffer.mode = "sequence";
+      player.sourceBuffer.addEventListener("updateend", flushStreamPlayer);
+      flushStreamPlayer();
+    });
+    audio.onended = () => {
+      if (streamPlayerRef.current === player) resetStreamPlayer();
+    };
+    audio.play().catch((err) => console.error("Error playing audio:", err));
+    setIsSpeaking(true);
+    return player;
+  };
+
   useEffect(() => {
     // Initialize socket connection
     socketRef.current = io(SOCKET_URL, {
@@ -116,35 +168,58 @@ const VoiceAgent = () => {
       console.log("Server:", data.text);
     });
 
+    socketRef.current.on("session_config", (data) => {
+      // When the server detects end of turn itself, don't echo finals back
+      serverEndpointingRef.current = !!data.server_endpointing;
+    });
+
     socketRef.current.on("transcript", (data) => {
       console.log("Transcript:", data.text, "Final:", data.is_final);
 
       if (data.is_final) {
         setTranscript((prev) => prev + "\n" + data.text);
-        // Send to backend immediately for LLM + TTS
-        socketRef.current.emit("final_transcript", { text: data.text });
+        if (!serverEndpointingRef.current) {
+          // Send to backend immediately for LLM + TTS
+          socketRef.current.emit("final_transcript", { text: data.text });
+        }
       }
       // Remove interim display for faster response
     });
 
-    socketRef.current.on("tts_chunk", (chunk) => {
-      console.log(
-        "Received TTS chunk - Type:",
-        typeof chunk,
-        "Size:",
-        chunk?.byteLength || chunk?.length
-      );
-
+    socketRef.current.on("tts_chunk", (frame, ack) => {
+      // Acknowledge on receipt: the server paces audio by frames not yet acknowledged
+      if (typeof ack === "function") ack();
+      // Frames are { seq, stream, t, ms, ts, audio }: whole MP3 frames, in order,
+      // t/ms being the slice's offset and duration within the spoken response
+      const chunk = frame?.audio ?? frame;
       if (!chunk) {
         console.error("Received empty chunk");
         return;
       }
 
+      const last = lastFrameRef.current;
+      if (last && frame.seq !== undefined) {
+        if (frame.seq !== last.seq + 1) {
+          console.warn("TTS frames missing:", last.seq + 1, "to", frame.seq - 1);
+        } else if (frame.stream === last.stream && frame.t > last.t + last.ms + 1) {
+          console.warn(`Server dropped ${Math.round(frame.t - last.t - last.ms)} ms of late audio`);
+        }
+      }
+      lastFrameRef.current = frame;
+
       // Stop recording when AI starts speaking
       if (isRecording) {
         stopRecording();
       }
 
+      if (supportsStreamingPlayback) {
+        // Frames are appended to the live MediaSource so playback starts on the first one
+        const player = ensureStreamPlayer();
+        player.pending.push(chunk);
+        flushStreamPlayer();
+        return;
+      }
+
       // Add to queue
       audioQueueRef.current.push(chunk);
 
@@ -157,6 +232,22 @@ const VoiceAgent = () => {
     socketRef.current.on("tts_done", (data) => {
       console.log("AI Reply complete:", data.text);
       setAiReply(data.text);
+      if (streamPlayerRef.current) {
+        streamPlayerRef.current.ended = true;
+        flushStreamPlayer();
+      }
+    });
+
+    socketRef.current.on("tts_cancel", (data) => {
+      // Barge-in: the server aborted the response, drop any audio still queued
+      console.log("TTS cancelled:", data.reason);
+      audioQueueRef.current = [];
+      if (currentAudioRef.current) {
+        currentAudioRef.current.pause();
+        currentAudioRef.current = null;
+      }
+      isPlayingRef.current = false;
+      resetStreamPlayer();
     });
 
     socketRef.current.on("error", (data) => {
@@ -171,6 +262,7 @@ const VoiceAgent = () => {
         currentAudioRef.current.pause();
       }
       audioQueueRef.current = [];
+      resetStreamPlayer();
     };
   }, []);
 
@@ -183,6 +275,7 @@ const VoiceAgent = () => {
         currentAudioRef.current = null;
       }
       isPlayingRef.current = false;
+      resetStreamPlayer();
       setIsSpeaking(false);
 
       const stream = await navigator.mediaDevices.getUserMedia({